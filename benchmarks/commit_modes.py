@@ -0,0 +1,63 @@
+"""
+Compare load throughput when committing every batch, every N rows, once, or without synchronous commit.
+Loads to a scratch table using the default DSN profile
+
+    python -m benchmarks.commit_modes --features 100000
+"""
+
+import tempfile
+from argparse import ArgumentParser
+from pathlib import Path
+from time import perf_counter
+from uuid import uuid4
+
+from psycopg2.sql import SQL, Identifier
+
+from sherpa.bench import BenchFormat, write_synthetic_file
+from sherpa.pg_client import LoadOptions, PgClient
+from sherpa.utils import read_dsn_file
+
+BENCH_TABLE = "sherpa_bench_commit_modes"
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--features", type=int, default=100000)
+    parser.add_argument("--vertices", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    modes = {
+        "commit every batch": LoadOptions(batch_size=args.batch_size),
+        "commit every 50k rows": LoadOptions(batch_size=args.batch_size, commit_every=50000),
+        "single transaction": LoadOptions(batch_size=args.batch_size, single_transaction=True),
+        "every batch, async commit": LoadOptions(batch_size=args.batch_size, async_commit=True),
+    }
+
+    # A scratch table of its own, so an existing table is never dropped and concurrent runs don't collide
+    table_name = f"{BENCH_TABLE}_{uuid4().hex[:12]}"
+    client = PgClient(read_dsn_file()["default"])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_file(Path(tmp), BenchFormat.GPKG, args.features, vertices=args.vertices)
+        client.create_table(path, "public", table_name)
+
+        print(f"{args.features} features, {args.batch_size} rows per batch")
+        try:
+            table = client.get_insert_table_info(table_name)
+            assert table is not None
+
+            for name, options in modes.items():
+                with client.conn.cursor() as cursor:
+                    cursor.execute(SQL("TRUNCATE {};").format(Identifier("public", table_name)))
+                client.conn.commit()
+
+                started = perf_counter()
+                client.load(path, table, options, on_batch=lambda rows: None)
+                print(f"{name:<28}{args.features / (perf_counter() - started):>12,.0f} f/s")
+        finally:
+            client.drop_table("public", table_name)
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
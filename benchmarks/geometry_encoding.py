@@ -0,0 +1,66 @@
+"""
+Compare encoding fiona geometries to WKB through Shapely against sherpa's direct encoder
+
+    python -m benchmarks.geometry_encoding --features 20000 --vertices 200
+"""
+
+import tempfile
+from argparse import ArgumentParser
+from collections.abc import Callable
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+import fiona
+from shapely.geometry import shape
+
+from sherpa.bench import BenchFormat, BenchGeometry, write_synthetic_file
+from sherpa.geometry import geojson_to_wkb
+
+
+def shapely_wkb(geometry: Any) -> bytes:
+    return bytes(shape(geometry).wkb)
+
+
+def time_file(path: Path, encode: Callable[[Any], Any]) -> float:
+    started = perf_counter()
+    with fiona.open(path) as collection:
+        for feature in collection:
+            encode(feature["geometry"])
+
+    return perf_counter() - started
+
+
+def time_encode(geometries: list[Any], encode: Callable[[Any], Any]) -> float:
+    started = perf_counter()
+    for geometry in geometries:
+        encode(geometry)
+
+    return perf_counter() - started
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--features", type=int, default=20000)
+    parser.add_argument("--vertices", type=int, default=200)
+    parser.add_argument("--holes", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_file(
+            Path(tmp), BenchFormat.GPKG, args.features, BenchGeometry.POLYGON, args.vertices, holes=args.holes
+        )
+
+        with fiona.open(path) as collection:
+            geometries = [feature["geometry"] for feature in collection]
+
+        print(f"{args.features} polygons, {args.vertices} vertices per ring, {args.holes} hole(s)")
+        print(f"{'':<24}{'encode only':>16}{'read + encode':>16}")
+        for name, encode in [("shapely shape().wkb", shapely_wkb), ("geojson_to_wkb", geojson_to_wkb)]:
+            encode_rate = args.features / time_encode(geometries, encode)
+            file_rate = args.features / time_file(path, encode)
+            print(f"{name:<24}{encode_rate:>12,.0f} f/s{file_rate:>12,.0f} f/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Load synthetic files of each format under each installed driver, engine, batch size and worker count, to catch
+regressions in the load path. Loads to a scratch table using the default DSN profile
+
+    python -m benchmarks.load_matrix --features 100000 --save baseline.json
+    python -m benchmarks.load_matrix --features 100000 --compare baseline.json
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+from sherpa.bench import BenchFormat, BenchGeometry
+from sherpa.cmd.bench import run_benchmarks
+from sherpa.constants import LoadEngine
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--features", type=int, default=100000)
+    parser.add_argument("--geometry", type=BenchGeometry, default=BenchGeometry.POLYGON)
+    parser.add_argument("--vertices", type=int, default=20)
+    parser.add_argument("--save", type=Path)
+    parser.add_argument("--compare", type=Path)
+    args = parser.parse_args()
+
+    run_benchmarks(
+        features=args.features,
+        file_formats=list(BenchFormat),
+        geometry=args.geometry,
+        vertices=args.vertices,
+        properties=4,
+        drivers=None,
+        engines=list(LoadEngine),
+        batch_sizes=[1000, 10000],
+        workers=[1, 4],
+        save=args.save,
+        compare=args.compare,
+        tolerance=0.1,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
-from sherpa.main import app
+from sherpa.daemon import main
 
-app(prog_name="sherpa")
+if __name__ == "__main__":
+    main()
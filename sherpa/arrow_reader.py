@@ -0,0 +1,115 @@
+from collections.abc import Generator
+from datetime import datetime, time, timedelta
+from itertools import repeat
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Optional, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import shapely
+from pyogrio.raw import open_arrow
+
+from sherpa.constants import HASH_COLUMN
+from sherpa.pg_client import PgTable, hash_row
+from sherpa.stats import LoadStats
+
+# Name pyogrio gives the geometry column of formats that don't name it themselves
+DEFAULT_GEOMETRY_COLUMN = "wkb_geometry"
+
+# Shapely type ids of single geometries and the function wrapping each in its multi type
+MULTI_CONSTRUCTORS = {0: shapely.multipoints, 1: shapely.multilinestrings, 3: shapely.multipolygons}
+
+
+def generate_arrow_row_data(
+    file: Union[Path, str],
+    table_info: PgTable,
+    file_srid: Optional[int],
+    start: int = 0,
+    stop: Optional[int] = None,
+    batch_size: int = 10000,
+    stats: Optional[LoadStats] = None,
+) -> Generator[tuple[Any, ...], None, None]:
+    """
+    Yield the same rows as generate_row_data, but read as Arrow record batches and converted a column at a time, so
+    no dict is built per feature. Given stats, the time spent reading, encoding and building each batch is added to
+    its stages
+    """
+    property_columns = table_info.row_columns[:-1]
+    hash_index = property_columns.index(HASH_COLUMN) if HASH_COLUMN in property_columns else None
+    remaining = None if stop is None else stop - start
+    with open_arrow(file, skip_features=start, batch_size=batch_size, use_pyarrow=True) as (meta, reader):
+        geometry_column = meta["geometry_name"] or DEFAULT_GEOMETRY_COLUMN
+        batches = iter(reader)
+        while remaining is None or remaining > 0:
+            started = perf_counter()
+            batch = next(batches, None)
+            if batch is None:
+                return
+
+            # pyogrio can't limit the features an Arrow stream reads, so stop once the last batch is reached
+            if remaining is not None:
+                batch = batch.slice(0, remaining)
+                remaining -= batch.num_rows
+
+            encoded = perf_counter()
+            geometries = encode_geometries(batch.column(geometry_column), table_info.multi_geometry)
+            built = perf_counter()
+            columns = [repeat(None) if x == HASH_COLUMN else column_values(batch.column(x)) for x in property_columns]
+            if hash_index is None:
+                rows = list(zip(*columns, geometries, repeat(file_srid)))
+            else:
+                rows = [hash_values(row, hash_index) for row in zip(*columns, geometries, repeat(file_srid))]
+
+            if stats is not None:
+                stats.add_stage("read", encoded - started)
+                stats.add_stage("encode", built - encoded)
+                stats.add_stage("row build", perf_counter() - built)
+
+            yield from rows
+
+
+def column_values(column: pa.Array) -> list[Any]:
+    # Dates and times are read as strings, as fiona reads them. Arrow formats dates the same way, skipping building a
+    # Python object for each, but not times, so they're formatted as fiona does to keep row hashes the same
+    if pa.types.is_date(column.type):
+        column = pc.cast(column, pa.string())
+    elif pa.types.is_temporal(column.type):
+        return [None if x is None else format_temporal(x) for x in column.to_pylist()]
+
+    values: list[Any] = column.to_pylist()
+    return values
+
+
+def format_temporal(value: Any) -> str:
+    """
+    Format a time or datetime as fiona does, in ISO 8601 with microseconds only if there are any. pyogrio reads some
+    formats' datetimes as UTC, which fiona reads without an offset
+    """
+    if isinstance(value, datetime) and value.utcoffset() == timedelta(0):
+        value = value.replace(tzinfo=None)
+
+    return value.isoformat() if isinstance(value, (datetime, time)) else str(value)
+
+
+def encode_geometries(column: pa.Array, multi_geometry: bool) -> list[Optional[bytes]]:
+    """
+    Convert a batch's WKB geometries to the WKB generate_row_data yields, wrapping single geometries in their multi
+    type if the table has one
+    """
+    geometries = shapely.from_wkb(column.to_numpy(zero_copy_only=False))
+    if multi_geometry:
+        type_ids = shapely.get_type_id(geometries)
+        for type_id, constructor in MULTI_CONSTRUCTORS.items():
+            mask = type_ids == type_id
+            if mask.any():
+                geometries[mask] = constructor(geometries[mask][:, np.newaxis])
+
+    return [None if x is None else bytes(x) for x in shapely.to_wkb(geometries)]
+
+
+def hash_values(row: tuple[Any, ...], hash_index: int) -> tuple[Any, ...]:
+    values = list(row[:-2])
+    values[hash_index] = hash_row(values, row[-2:])
+    return (*values, *row[-2:])
@@ -0,0 +1,228 @@
+import json
+import math
+import random
+import resource
+from collections.abc import Generator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+from uuid import uuid4
+
+import fiona
+
+from sherpa.constants import BenchFormat, BenchGeometry, LoadDriver, LoadReader
+from sherpa.parallel import MP_CONTEXT, load_parallel
+from sherpa.pg_client import LoadOptions, PgClient
+from sherpa.stats import LoadStats, PoolStats, SyncCounts
+
+BENCH_TABLE = "sherpa_bench"
+
+BENCH_FORMAT_DRIVERS = {
+    BenchFormat.GEOJSON: ("GeoJSON", ".geojson"),
+    BenchFormat.GPKG: ("GPKG", ".gpkg"),
+    BenchFormat.SHP: ("ESRI Shapefile", ".shp"),
+}
+
+BENCH_GEOMETRY_TYPES = {
+    BenchGeometry.POINT: "Point",
+    BenchGeometry.LINE: "LineString",
+    BenchGeometry.POLYGON: "Polygon",
+}
+
+# Property types cycled through for synthetic attributes, all supported by each format
+BENCH_PROPERTY_TYPES = ["str", "int", "float"]
+
+
+@dataclass
+class BenchResult:
+    file_format: str
+    engine: str
+    batch_size: int
+    workers: int
+    features: int
+    file_bytes: int
+    seconds: float
+    peak_rss: int
+    stats: LoadStats = field(default_factory=LoadStats)
+    driver: str = LoadDriver.PSYCOPG2.value
+    reader: str = LoadReader.FIONA.value
+
+    @property
+    def features_per_second(self) -> float:
+        return self.features / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.file_bytes / 1024**2 / self.seconds if self.seconds else 0.0
+
+    @property
+    def read_seconds(self) -> float:
+        # Time each reader spent decoding features rather than waiting for the database to take a batch
+        return max(self.seconds - self.stats.reader_stall / self.workers, 0.0)
+
+    @property
+    def write_seconds(self) -> float:
+        # Time each writer spent sending batches rather than waiting for the reader to produce one
+        return max(self.seconds - self.stats.writer_stall / self.workers, 0.0)
+
+    @property
+    def key(self) -> str:
+        return f"{self.file_format}/{self.reader}/{self.driver}/{self.engine}/{self.batch_size}/{self.workers}"
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BenchResult":
+        stats = data["stats"]
+        # Counts nested in the stats are saved as dicts of their own
+        nested = {
+            "sync": SyncCounts(**stats["sync"]) if stats.get("sync") else None,
+            "pool": PoolStats(**stats["pool"]) if stats.get("pool") else None,
+        }
+        return cls(**{**data, "stats": LoadStats(**{**stats, **nested})})
+
+
+def generate_ring(x: float, y: float, radius: float, vertices: int) -> list[tuple[float, float]]:
+    return [
+        (x + radius * math.cos(2 * math.pi * i / vertices), y + radius * math.sin(2 * math.pi * i / vertices))
+        for i in range(vertices)
+    ]
+
+
+def generate_geometry(geometry: BenchGeometry, vertices: int, holes: int = 0) -> dict[str, Any]:
+    x, y = random.uniform(-179, 179), random.uniform(-84, 84)
+    if geometry is BenchGeometry.POINT:
+        return {"type": "Point", "coordinates": (x, y)}
+
+    points = generate_ring(x, y, 0.5, vertices)
+    if geometry is BenchGeometry.LINE:
+        return {"type": "LineString", "coordinates": points}
+
+    rings = [points]
+    for _ in range(holes):
+        rings.append(generate_ring(x + random.uniform(-0.25, 0.25), y + random.uniform(-0.25, 0.25), 0.1, vertices))
+
+    return {"type": "Polygon", "coordinates": [ring + ring[:1] for ring in rings]}
+
+
+def generate_features(
+    count: int, geometry: BenchGeometry, vertices: int, properties: int, holes: int = 0
+) -> Generator[dict[str, Any], None, None]:
+    for i in range(count):
+        values = [f"feature {i}", i, random.random() * i]
+        yield {
+            "type": "Feature",
+            "properties": {f"prop_{x}": values[x % len(values)] for x in range(properties)},
+            "geometry": generate_geometry(geometry, vertices, holes),
+        }
+
+
+def write_synthetic_file(
+    directory: Path,
+    file_format: BenchFormat,
+    features: int,
+    geometry: BenchGeometry = BenchGeometry.POLYGON,
+    vertices: int = 20,
+    properties: int = 4,
+    holes: int = 0,
+) -> Path:
+    """
+    Write randomly placed features with the given geometry complexity and attribute count to a new file. Polygons
+    have holes inner rings besides their outer one
+    """
+    driver, suffix = BENCH_FORMAT_DRIVERS[file_format]
+    path = directory / f"{BENCH_TABLE}_{file_format.value}{suffix}"
+    schema = {
+        "geometry": BENCH_GEOMETRY_TYPES[geometry],
+        "properties": {f"prop_{x}": BENCH_PROPERTY_TYPES[x % len(BENCH_PROPERTY_TYPES)] for x in range(properties)},
+    }
+    with fiona.open(path, "w", driver=driver, schema=schema, crs="EPSG:4326") as collection:
+        collection.writerecords(generate_features(features, geometry, vertices, properties, holes))
+
+    return path
+
+
+def file_size(path: Path) -> int:
+    # Shapefiles are split across sidecar files sharing the same name
+    return sum(x.stat().st_size for x in path.parent.glob(f"{path.stem}.*"))
+
+
+def peak_rss() -> int:
+    # ru_maxrss is in kilobytes on Linux, workers are included through RUSAGE_CHILDREN
+    usage = [resource.getrusage(x).ru_maxrss for x in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    return max(usage) * 1024
+
+
+def run_load(
+    connection_details: dict[str, str], file: Path, file_format: BenchFormat, options: LoadOptions, workers: int
+) -> BenchResult:
+    # A scratch table of its own, so an existing table is never dropped
+    table_name = f"{BENCH_TABLE}_{uuid4().hex[:12]}"
+    client = PgClient(connection_details)
+    created = False
+    try:
+        client.create_table(file, "public", table_name)
+        created = True
+        table_structure = client.get_insert_table_info(table_name)
+        assert table_structure is not None
+
+        stats = LoadStats()
+        started = perf_counter()
+        if workers > 1:
+            features = load_parallel(
+                connection_details, file, table_structure, options, workers, stats, on_batch=lambda rows: None
+            )
+        else:
+            features = client.load(file, table_structure, options, on_batch=lambda rows: None, stats=stats)
+        seconds = perf_counter() - started
+    finally:
+        if created:
+            client.drop_table("public", table_name)
+        client.close()
+
+    return BenchResult(
+        file_format=file_format.value,
+        engine=options.engine.value,
+        batch_size=options.batch_size,
+        workers=workers,
+        features=features,
+        file_bytes=file_size(file),
+        seconds=seconds,
+        peak_rss=peak_rss(),
+        driver=options.driver.value,
+        reader=options.reader.value,
+        stats=stats,
+    )
+
+
+def run_benchmark(
+    connection_details: dict[str, str], file: Path, file_format: BenchFormat, options: LoadOptions, workers: int
+) -> BenchResult:
+    """
+    Time a load in a fresh process, so the peak memory measured belongs to that load alone
+    """
+    connection_details = {k: str(v) for k, v in connection_details.items()}
+    with ProcessPoolExecutor(max_workers=1, mp_context=MP_CONTEXT) as executor:
+        return executor.submit(run_load, connection_details, file, file_format, options, workers).result()
+
+
+def save_results(results: list[BenchResult], path: Path) -> None:
+    with open(path, "w") as f:
+        json.dump([asdict(x) for x in results], f, indent=2)
+
+
+def find_regressions(
+    results: list[BenchResult], baseline_path: Path, tolerance: float
+) -> list[tuple[BenchResult, float]]:
+    """
+    Compare throughput with previously saved results, returning runs that are slower by more than the tolerance
+    along with their baseline features per second
+    """
+    with open(baseline_path) as f:
+        baseline = {x.key: x.features_per_second for x in map(BenchResult.from_dict, json.load(f))}
+
+    return [
+        (x, baseline[x.key])
+        for x in results
+        if x.key in baseline and x.features_per_second < baseline[x.key] * (1 - tolerance)
+    ]
@@ -0,0 +1,219 @@
+import tempfile
+from importlib.util import find_spec
+from itertools import product
+from pathlib import Path
+from typing import Annotated, Optional
+
+from rich.table import Table
+from typer import Typer, Argument, Option
+
+from sherpa.constants import CONSOLE, BenchFormat, BenchGeometry, LoadDriver, LoadEngine, LoadReader
+from sherpa.utils import read_dsn_file, format_error, format_highlight, format_info, format_success
+
+app = Typer()
+
+
+def installed_drivers() -> list[LoadDriver]:
+    return [x for x in LoadDriver if find_spec(x.value) is not None]
+
+
+@app.command("run")
+def run_benchmarks(
+    features: Annotated[
+        int, Option("--features", "-n", min=1, help="Features per generated file", rich_help_panel="Data Options")
+    ] = 100000,
+    file_formats: Annotated[
+        Optional[list[BenchFormat]],
+        Option("--format", "-f", help="File formats to load, repeatable", rich_help_panel="Data Options"),
+    ] = None,
+    geometry: Annotated[
+        BenchGeometry, Option("--geometry", "-g", help="Geometry type to generate", rich_help_panel="Data Options")
+    ] = BenchGeometry.POLYGON,
+    vertices: Annotated[
+        int,
+        Option("--vertices", min=3, help="Vertices per line or polygon ring", rich_help_panel="Data Options"),
+    ] = 20,
+    properties: Annotated[
+        int, Option("--properties", min=0, help="Attribute columns per feature", rich_help_panel="Data Options")
+    ] = 4,
+    readers: Annotated[
+        Optional[list[LoadReader]],
+        Option("--reader", "-r", help="Readers to run, repeatable", rich_help_panel="Load Options"),
+    ] = None,
+    drivers: Annotated[
+        Optional[list[LoadDriver]],
+        Option(
+            "--driver",
+            "-d",
+            help="Drivers to run, repeatable. Defaults to those installed",
+            rich_help_panel="Load Options",
+        ),
+    ] = None,
+    engines: Annotated[
+        Optional[list[LoadEngine]],
+        Option("--engine", "-e", help="Load engines to run, repeatable", rich_help_panel="Load Options"),
+    ] = None,
+    batch_sizes: Annotated[
+        Optional[list[int]],
+        Option("--batch-size", "-b", min=1, help="Batch sizes to run, repeatable", rich_help_panel="Load Options"),
+    ] = None,
+    workers: Annotated[
+        Optional[list[int]],
+        Option("--workers", "-w", min=1, help="Worker counts to run, repeatable", rich_help_panel="Load Options"),
+    ] = None,
+    save: Annotated[
+        Optional[Path],
+        Option("--save", help="Write results to a JSON file", show_default=False, rich_help_panel="Output Options"),
+    ] = None,
+    compare: Annotated[
+        Optional[Path],
+        Option(
+            "--compare",
+            help="Fail if throughput drops against results saved with --save",
+            show_default=False,
+            rich_help_panel="Output Options",
+        ),
+    ] = None,
+    tolerance: Annotated[
+        float,
+        Option(
+            "--tolerance",
+            min=0,
+            max=1,
+            help="Fraction of baseline throughput a run may lose before --compare fails",
+            rich_help_panel="Output Options",
+        ),
+    ] = 0.1,
+) -> None:
+    """
+    Load synthetic files into a scratch table under each combination of settings and report throughput
+    """
+    # Imported here so the rest of the CLI starts without GDAL or libpq
+    from sherpa.bench import BenchResult, find_regressions, run_benchmark, save_results, write_synthetic_file
+    from sherpa.pg_client import LoadOptions
+
+    if compare and not compare.exists():
+        CONSOLE.print(format_error(f"Baseline not found: {format_highlight(str(compare))}"))
+        exit(1)
+
+    missing = [x.value for x in drivers or [] if x not in installed_drivers()]
+    if missing:
+        CONSOLE.print(format_error(f"Driver not installed: {format_highlight(', '.join(missing))}"))
+        exit(1)
+
+    if LoadReader.ARROW in (readers or []) and (find_spec("pyogrio") is None or find_spec("pyarrow") is None):
+        CONSOLE.print(format_error("--reader arrow requires pyogrio and pyarrow, install them with sherpa\\[arrow]"))
+        exit(1)
+
+    dsn_profile = read_dsn_file()
+
+    matrix = list(
+        product(
+            file_formats or [BenchFormat.GEOJSON],
+            readers or [LoadReader.FIONA],
+            drivers or installed_drivers(),
+            engines or list(LoadEngine),
+            batch_sizes or [10000],
+            workers or [1],
+        )
+    )
+
+    results: list[BenchResult] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {}
+        for file_format in dict.fromkeys(x[0] for x in matrix):
+            with CONSOLE.status(f"[cyan]Generating {features} {geometry.value} features as {file_format.value}..."):
+                files[file_format] = write_synthetic_file(
+                    Path(tmp), file_format, features, geometry, vertices, properties
+                )
+
+        for file_format, reader, driver, engine, batch_size, worker_count in matrix:
+            options = LoadOptions(engine=engine, batch_size=batch_size, driver=driver, reader=reader)
+            with CONSOLE.status(
+                f"[cyan]Loading {file_format.value} read by {reader.value} with {driver.value} {engine.value}, "
+                f"batch size {batch_size}, {worker_count} worker(s)..."
+            ):
+                results.append(
+                    run_benchmark(dsn_profile["default"], files[file_format], file_format, options, worker_count)
+                )
+
+    console_table = Table(
+        "FORMAT",
+        "READER",
+        "DRIVER",
+        "ENGINE",
+        "BATCH",
+        "WORKERS",
+        "FEATURES/S",
+        "MB/S",
+        "PEAK RSS (MB)",
+        "READ (S)",
+        "WRITE (S)",
+        "TOTAL (S)",
+        style="cyan",
+    )
+    for result in results:
+        console_table.add_row(
+            result.file_format,
+            result.reader,
+            result.driver,
+            result.engine,
+            str(result.batch_size),
+            str(result.workers),
+            f"{result.features_per_second:,.0f}",
+            f"{result.mb_per_second:.2f}",
+            f"{result.peak_rss / 1024**2:.0f}",
+            f"{result.read_seconds:.2f}",
+            f"{result.write_seconds:.2f}",
+            f"{result.seconds:.2f}",
+        )
+
+    CONSOLE.print(console_table)
+
+    if save:
+        save_results(results, save)
+        CONSOLE.print(format_success(f"Results saved to {format_highlight(str(save))}"))
+
+    if compare:
+        regressions = find_regressions(results, compare, tolerance)
+        if regressions:
+            for result, baseline in regressions:
+                CONSOLE.print(
+                    format_error(
+                        f"{format_highlight(result.key)} regressed to {result.features_per_second:,.0f} "
+                        f"features/s from {baseline:,.0f}"
+                    )
+                )
+            exit(1)
+
+        CONSOLE.print(format_info("No regressions against baseline"))
+
+
+@app.command("generate", no_args_is_help=True)
+def generate_file(
+    directory: Annotated[Path, Argument(help="Directory to write the file to", show_default=False)],
+    file_format: Annotated[BenchFormat, Option("--format", "-f", help="File format to write")] = BenchFormat.GEOJSON,
+    features: Annotated[int, Option("--features", "-n", min=1, help="Number of features")] = 100000,
+    geometry: Annotated[BenchGeometry, Option("--geometry", "-g", help="Geometry type")] = BenchGeometry.POLYGON,
+    vertices: Annotated[int, Option("--vertices", min=3, help="Vertices per line or polygon ring")] = 20,
+    properties: Annotated[int, Option("--properties", min=0, help="Attribute columns per feature")] = 4,
+) -> None:
+    """
+    Write a synthetic file for benchmarking load by hand
+    """
+    from sherpa.bench import write_synthetic_file
+
+    if not directory.is_dir():
+        CONSOLE.print(format_error(f"Directory not found: {format_highlight(str(directory))}"))
+        exit(1)
+
+    path = write_synthetic_file(directory, file_format, features, geometry, vertices, properties)
+
+    CONSOLE.print(format_success(f"Wrote {features} features to {format_highlight(str(path))}"))
+
+
+@app.callback()
+def main() -> None:
+    """
+    Benchmark loading synthetic GIS files to your PostGIS instance
+    """
@@ -1,39 +1,106 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
 from rich.table import Table
 from typer import Typer, Argument, Option
 
 from sherpa.constants import CONSOLE
-from sherpa.utils import read_dsn_file, format_error, format_highlight
+from sherpa.utils import read_dsn_file, format_error, format_highlight, format_size, format_warning
 from sherpa.database import get_pg_client
 
 app = Typer()
 
 
 @app.command("ls")
-def list_tables(schema: Annotated[str, Option("--schema", "-s", help="Schema of tables to target")] = "public") -> None:
+def list_tables(
+    schema: Annotated[str, Option("--schema", "-s", help="Schema of tables to target")] = "public",
+    all_schemas: Annotated[bool, Option("--all-schemas", "-a", help="List the tables of every schema")] = False,
+    exact: Annotated[
+        bool, Option("--exact", help="Count every table's rows, reading them all, in parallel across --workers")
+    ] = False,
+    estimate: Annotated[
+        bool, Option("--estimate", help="Show the planner's row estimates, as of each table's last ANALYZE")
+    ] = False,
+    workers: Annotated[int, Option("--workers", "-w", min=1, help="Connections --exact counts tables over")] = 4,
+    timeout: Annotated[
+        Optional[float],
+        Option("--timeout", min=0, help="Seconds --exact counts each table for before giving up", show_default=False),
+    ] = None,
+    size: Annotated[bool, Option("--size", help="Show each table's size on disk, including its indexes")] = False,
+    extent: Annotated[
+        bool, Option("--extent", help="Show each table's geometry extent, estimated from its statistics")
+    ] = False,
+    json_output: Annotated[bool, Option("--json", help="Print the tables as JSON")] = False,
+) -> None:
     """
-    List tables and their row counts
+    List tables and their row counts, which are the statistics collector's live row counts unless --exact or
+    --estimate is given
     """
+    if exact and estimate:
+        CONSOLE.print(format_error("--exact can't be used with --estimate"))
+        exit(1)
+
     dsn_profile = read_dsn_file()
 
     client = get_pg_client(dsn_profile["default"])
 
-    if not client.schema_exists(schema):
+    if not all_schemas and not client.schema_exists(schema):
         CONSOLE.print(format_error(f"Schema not found: {format_highlight(f'{schema}')}"))
         exit(1)
 
-    table_counts = client.list_table_counts(schema)
+    tables = client.list_tables(None if all_schemas else schema, extent)
+    max_size = client.pool.config.max_size
 
     client.close()
 
-    if not table_counts:
-        CONSOLE.print(format_error(f"No tables found in schema {format_highlight(f'{schema}')}"))
+    if not tables:
+        where = "any schema" if all_schemas else f"schema {format_highlight(f'{schema}')}"
+        CONSOLE.print(format_error(f"No tables found in {where}"))
         exit(1)
 
-    console_table = Table("SCHEMA", "TABLE", "ROWS", style="cyan")
-    for row in table_counts:
-        console_table.add_row(row[0], row[1], str(row[2]))
+    rows: list[Optional[int]] = [x.rows for x in tables]
+    if estimate:
+        rows = [x.estimated_rows for x in tables]
+    elif exact:
+        # Imported here as sherpa.pg_client is slow to import, though get_pg_client has imported it by now
+        from sherpa.pg_client import count_rows_concurrently
+
+        with CONSOLE.status(f"[cyan]Counting the rows of {len(tables)} tables..."):
+            rows = count_rows_concurrently(
+                dsn_profile["default"],
+                [(x.schema, x.table) for x in tables],
+                workers if max_size is None else min(workers, max_size),
+                timeout,
+            )
+
+        uncounted = rows.count(None)
+        if uncounted:
+            CONSOLE.print(
+                format_warning(f"Couldn't count the rows of {uncounted} tables, which took too long or can't be read")
+            )
+
+    if json_output:
+        listing = [
+            {
+                "schema": x.schema,
+                "table": x.table,
+                "rows": row_count,
+                "size": x.size,
+                **({"geometry_column": x.geometry_column, "extent": x.extent} if extent else {}),
+            }
+            for x, row_count in zip(tables, rows)
+        ]
+        CONSOLE.print_json(data=listing)
+        return
+
+    columns = ["SCHEMA", "TABLE", "ROWS"] + (["SIZE"] if size else []) + (["EXTENT"] if extent else [])
+    console_table = Table(*columns, style="cyan")
+    for x, row_count in zip(tables, rows):
+        cells = [x.schema, x.table, "" if row_count is None else str(row_count)]
+        if size:
+            cells.append(format_size(x.size))
+        if extent:
+            cells.append("" if x.extent is None else ", ".join(str(round(value, 6)) for value in x.extent))
+        console_table.add_row(*cells)
 
     CONSOLE.print(console_table)
 
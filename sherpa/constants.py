@@ -1,3 +1,4 @@
+from enum import Enum
 from pathlib import Path
 
 from tomlkit.toml_file import TOMLFile
@@ -9,14 +10,114 @@ CONFIG_FILE = Path(CONFIG_DIR) / "config.toml"
 DSN_FILEPATH = Path(CONFIG_DIR) / "dsn.toml"
 DSN_FILE = TOMLFile(DSN_FILEPATH)
 
+# Unix socket sherpa serve listens on, which the CLI forwards commands to while it's running
+SOCKET_PATH = Path(CONFIG_DIR) / "sherpa.sock"
+
 CONSOLE = Console()
 
 DSN_KEYS = {"user", "password", "dbname", "host", "port"}
 
-# Maps Python data types to PG to infer table schema from a file
+# Maps fiona field types to PG to infer table schema from a file
 DATA_TYPE_MAP = {
     "str": "TEXT",
     "bool": "BOOLEAN",
-    "int": "INTEGER",
+    "int32": "INTEGER",
+    "int": "BIGINT",
+    "int64": "BIGINT",
     "float": "DOUBLE PRECISION",
+    "date": "DATE",
+    "time": "TIME",
+    "datetime": "TIMESTAMPTZ",
+    "json": "JSONB",
+    "bytes": "BYTEA",
 }
+
+# Features read to infer a table's schema unless the whole file is scanned
+INFER_SAMPLE_SIZE = 1000
+
+# Table recording how far resumable loads have committed, created in the schema loaded to
+CHECKPOINT_TABLE = "sherpa_checkpoints"
+
+# Column holding a hash of each feature's loaded values, which --mode sync compares to find changed features
+HASH_COLUMN = "sherpa_hash"
+
+# Seconds a table's columns, once looked up, are reused before checking the table hasn't changed since
+CATALOG_TTL = 5.0
+
+
+class LoadEngine(str, Enum):
+    """
+    Strategies for writing rows to PostgreSQL
+    """
+
+    COPY = "copy"
+    INSERT = "insert"
+
+
+class LoadDriver(str, Enum):
+    """
+    PostgreSQL drivers batches can be written with
+    """
+
+    PSYCOPG2 = "psycopg2"
+    PSYCOPG = "psycopg"
+
+
+class LoadReader(str, Enum):
+    """
+    Libraries features can be read from a file with
+    """
+
+    FIONA = "fiona"
+    ARROW = "arrow"
+
+
+class LoadMode(str, Enum):
+    """
+    How loaded rows are combined with those already in the table
+    """
+
+    APPEND = "append"
+    UPSERT = "upsert"
+    REPLACE = "replace"
+    SYNC = "sync"
+
+
+class TransformMode(str, Enum):
+    """
+    Where geometries are reprojected when forcing an SRID
+    """
+
+    SERVER = "server"
+    CLIENT = "client"
+
+
+class SpatialIndex(str, Enum):
+    """
+    Index access methods that can be built on a geometry column
+    """
+
+    GIST = "gist"
+    SPGIST = "spgist"
+    BRIN = "brin"
+    NONE = "none"
+
+
+class BenchFormat(str, Enum):
+    """
+    File formats synthetic benchmark data can be written as
+    """
+
+    GEOJSON = "geojson"
+    GPKG = "gpkg"
+    SHP = "shp"
+
+
+class BenchGeometry(str, Enum):
+    """
+    Geometry types synthetic benchmark data can be generated with
+    """
+
+    POINT = "point"
+    LINE = "line"
+    POLYGON = "polygon"
@@ -0,0 +1,296 @@
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+from collections.abc import Iterator
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from io import BufferedIOBase, TextIOBase
+from pathlib import Path
+from shutil import get_terminal_size
+from socketserver import StreamRequestHandler, UnixStreamServer
+from typing import Literal, Optional, cast
+
+from rich.console import Console
+from rich.markup import escape
+
+from sherpa.constants import CONSOLE, DSN_FILE, SOCKET_PATH
+from sherpa.utils import format_error, format_highlight, format_info, format_warning
+
+# Commands the CLI forwards to sherpa serve. dsn prompts for input and bench times a fresh process, so both run locally
+DAEMON_COMMANDS = {"load", "validate", "table"}
+
+# Colour systems a rich console renders with, which clients send as their own
+ColorSystem = Literal["auto", "standard", "256", "truecolor", "windows"]
+
+# Set to run commands in the CLI's own process even while sherpa serve is running
+NO_DAEMON_ENV = "SHERPA_NO_DAEMON"
+
+
+class DaemonError(Exception):
+    """
+    Raise when sherpa serve can't start
+    """
+
+
+def main() -> None:
+    """
+    Entry point of the CLI, which forwards commands to sherpa serve while it's running, so they skip importing the GIS
+    libraries and connecting to the database, and runs them itself otherwise
+    """
+    args = sys.argv[1:]
+    if should_forward(args):
+        exit_code = forward_command(args)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    # Imported here as the CLI's commands are only needed when no daemon runs them
+    from sherpa.main import app
+
+    app(prog_name="sherpa")
+
+
+def should_forward(args: list[str], socket_path: Path = SOCKET_PATH) -> bool:
+    # Help is quicker to print here than to ask the daemon for
+    return (
+        bool(args)
+        and args[0] in DAEMON_COMMANDS
+        and not {"--help", "-h"} & set(args)
+        and not os.environ.get(NO_DAEMON_ENV)
+        and socket_path.exists()
+    )
+
+
+def forward_command(args: list[str], socket_path: Path = SOCKET_PATH) -> Optional[int]:
+    """
+    Run a command in the sherpa serve listening on socket_path, writing its output to stdout. Returns the command's
+    exit code, or None if nothing is listening
+    """
+    stdout = sys.stdout
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(socket_path))
+        except OSError:
+            return None
+
+        request = {
+            "args": args,
+            "cwd": os.getcwd(),
+            "columns": get_terminal_size().columns,
+            # The daemon renders output for the client's stdout rather than the terminal it was started from
+            "terminal": CONSOLE.is_terminal,
+            "color_system": CONSOLE.color_system,
+        }
+        client.sendall(json.dumps(request).encode() + b"\n")
+        with client.makefile("r", encoding="utf-8") as responses:
+            for line in responses:
+                message = json.loads(line)
+                if "exit_code" in message:
+                    return int(message["exit_code"])
+                stdout.write(message["output"])
+                stdout.flush()
+
+    CONSOLE.print(format_error("sherpa serve stopped before the command finished"))
+    return 1
+
+
+class OutputWriter(TextIOBase):
+    """
+    Text stream sending what's written to it to the client as output messages
+    """
+
+    def __init__(self, wfile: BufferedIOBase) -> None:
+        self.wfile = wfile
+
+    def write(self, text: str) -> int:
+        # click writes bytes to streams without a binary buffer, such as the newline after typer's help
+        if isinstance(text, (bytes, bytearray)):
+            text = text.decode()
+        if text:
+            self.wfile.write(json.dumps({"output": text}).encode() + b"\n")
+        return len(text)
+
+    def flush(self) -> None:
+        self.wfile.flush()
+
+
+class CommandHandler(StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            # A connection checking whether the daemon is running
+            return
+
+        request = json.loads(line)
+        output = OutputWriter(self.wfile)
+        try:
+            exit_code = run_command(
+                request["args"],
+                request["cwd"],
+                output,
+                request.get("columns"),
+                request.get("terminal", False),
+                request.get("color_system"),
+            )
+            self.wfile.write(json.dumps({"exit_code": exit_code}).encode() + b"\n")
+        except BrokenPipeError:
+            # The client was interrupted, so there's no one left to tell how the command went
+            pass
+
+
+class CommandServer(UnixStreamServer):
+    def service_actions(self) -> None:
+        # Called between requests, so connections left idle for too long are closed even while no commands run
+        from sherpa.pool import close_idle_connections
+
+        close_idle_connections()
+
+
+def run_command(
+    args: list[str],
+    cwd: str,
+    output: TextIOBase,
+    columns: Optional[int] = None,
+    terminal: bool = False,
+    color_system: Optional[str] = None,
+) -> int:
+    """
+    Run a CLI command in this process from cwd, writing what it prints to output, rendered for a terminal with
+    color_system if the client's output is one. Returns its exit code
+    """
+    if not args or args[0] not in DAEMON_COMMANDS:
+        output.write(f"sherpa serve only runs {', '.join(sorted(DAEMON_COMMANDS))} commands\n")
+        return 2
+
+    # Imported here so the CLI can forward commands without importing them
+    from sherpa.main import app
+    from sherpa.pool import reclaim_connections
+
+    previous_cwd = os.getcwd()
+    previous_columns = os.environ.get("COLUMNS")
+    os.chdir(cwd)
+    if columns:
+        # The rich console sizes its output from COLUMNS when it isn't writing to a terminal
+        os.environ["COLUMNS"] = str(columns)
+    try:
+        with redirect_stdout(output), redirect_stderr(output), client_console(terminal, color_system, columns):
+            try:
+                app(args=args, prog_name="sherpa")
+            except SystemExit as ex:
+                return to_exit_code(ex.code)
+            except Exception as ex:
+                traceback.print_exc(file=sys.__stderr__)
+                CONSOLE.print(format_error(escape(f"{type(ex).__name__}: {ex}")))
+                return 1
+    finally:
+        # Commands that exit early leave their client's connection checked out
+        reclaim_connections()
+        os.chdir(previous_cwd)
+        if previous_columns is None:
+            os.environ.pop("COLUMNS", None)
+        else:
+            os.environ["COLUMNS"] = previous_columns
+    return 0
+
+
+@contextmanager
+def client_console(terminal: bool, color_system: Optional[str], columns: Optional[int]) -> Iterator[None]:
+    """
+    Render CONSOLE to a client's output for the duration of a command. Every module shares CONSOLE, and its colour
+    system is fixed when it's created, so its state is swapped for that of a console made for the client
+    """
+    state = CONSOLE.__dict__.copy()
+    # Left to write to sys.stdout, which the command's output is redirected to
+    console = Console(
+        force_terminal=terminal,
+        color_system=cast(ColorSystem, color_system) if terminal else None,
+        width=columns if terminal else None,
+    )
+    CONSOLE.__dict__.update(console.__dict__)
+    try:
+        yield
+    finally:
+        CONSOLE.__dict__.clear()
+        CONSOLE.__dict__.update(state)
+
+
+def to_exit_code(code: object) -> int:
+    # sys.exit takes None for success and prints any other non integer before exiting with 1
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    CONSOLE.print(str(code), markup=False)
+    return 1
+
+
+def make_server(socket_path: Path = SOCKET_PATH) -> CommandServer:
+    """
+    Bind a server running forwarded commands one at a time to socket_path, replacing a socket left by a daemon that
+    didn't shut down cleanly
+    """
+    if socket_path.exists():
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(socket_path))
+            except OSError:
+                socket_path.unlink()
+            else:
+                raise DaemonError(f"sherpa serve is already running on {socket_path}")
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    # Only the user running the daemon may connect, as commands run with their DSN profile
+    umask = os.umask(0o177)
+    try:
+        return CommandServer(str(socket_path), CommandHandler)
+    finally:
+        os.umask(umask)
+
+
+def serve(socket_path: Path = SOCKET_PATH) -> None:
+    """
+    Run commands the CLI forwards to socket_path until interrupted, keeping libraries imported and database
+    connections open between them
+    """
+    # Imported up front so forwarded commands don't pay for them
+    import sherpa.main
+    import sherpa.parallel
+    import sherpa.validate  # noqa: F401
+
+    server = make_server(socket_path)
+    warm_pool()
+    CONSOLE.print(format_info(f"Serving on {format_highlight(str(socket_path))}, press Ctrl+C to stop"))
+    # Stopping the daemon with kill shuts it down as Ctrl+C does, removing its socket
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+
+
+def warm_pool() -> None:
+    """
+    Open the DSN profile's pool, the only one that keeps min_size connections open, and connect once so the first
+    command forwarded reuses the connection
+    """
+    from psycopg2 import Error
+
+    from sherpa.pg_client import PgClient, PgClientError
+    from sherpa.pool import PoolError, get_pool, reclaim_connections
+
+    try:
+        dsn_profile = DSN_FILE.read()
+    except FileNotFoundError:
+        return
+
+    try:
+        get_pool(dsn_profile["default"], keep_warm=True)
+        PgClient(dsn_profile["default"]).close()
+    except (PgClientError, PoolError, Error) as ex:
+        CONSOLE.print(format_warning(f"{escape(str(ex).strip())}, connecting again for the first command"))
+    # Start the stats the first command reports from nothing
+    reclaim_connections()
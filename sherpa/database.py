@@ -1,11 +1,16 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from sherpa.constants import CONSOLE
-from sherpa.pg_client import PgClient, PgClientError
 from sherpa.utils import format_error
 
+if TYPE_CHECKING:
+    from sherpa.pg_client import PgClient
+
+
+def get_pg_client(dsn_profile: dict[str, str]) -> Optional["PgClient"]:
+    # Imported here as psycopg2, fiona and shapely are slow to import and only needed once connecting
+    from sherpa.pg_client import PgClient, PgClientError
 
-def get_pg_client(dsn_profile: dict[str, str]) -> Optional[PgClient]:
     try:
         client = PgClient(dsn_profile)
     except PgClientError as ex:
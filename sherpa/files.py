@@ -0,0 +1,76 @@
+import os
+import re
+from glob import glob
+from hashlib import blake2b
+from pathlib import Path, PurePosixPath
+from typing import Union
+from zipfile import BadZipFile, ZipFile
+
+# Suffixes of files loaded from directories and zip archives. Shapefile sidecars and plain .json are skipped
+LOADABLE_SUFFIXES = {".shp", ".geojson", ".gpkg", ".fgb", ".gml", ".kml"}
+
+GLOB_CHARACTERS = ("*", "?", "[")
+
+VSIZIP_PATH = re.compile(r"^/vsizip/(?P<archive>.+?\.zip)/(?P<member>.+)$", re.IGNORECASE)
+
+# Bytes hashed from each end of a file to fingerprint it
+FINGERPRINT_CHUNK = 1024**2
+
+
+def expand_load_paths(pattern: str) -> list[str]:
+    """
+    Expand a file, glob, directory or zip archive to the paths of the GIS files it holds, in sorted order. Files in
+    zip archives are read in place through GDAL's /vsizip/ file system, so their paths are strings rather than Paths
+    """
+    # A path that exists is taken literally, so files named like parcels[2024].shp still load
+    if any(x in pattern for x in GLOB_CHARACTERS) and not Path(pattern).exists():
+        return [x for match in sorted(glob(pattern, recursive=True)) for x in expand_load_paths(match)]
+
+    path = Path(pattern)
+    if path.is_dir():
+        return [
+            x
+            for child in sorted(path.rglob("*"))
+            if child.is_file() and (child.suffix.lower() in LOADABLE_SUFFIXES or child.suffix.lower() == ".zip")
+            for x in expand_load_paths(str(child))
+        ]
+
+    if path.suffix.lower() == ".zip" and path.is_file():
+        try:
+            with ZipFile(path) as archive:
+                names = sorted(x for x in archive.namelist() if PurePosixPath(x).suffix.lower() in LOADABLE_SUFFIXES)
+        except BadZipFile:
+            return []
+        return [f"/vsizip/{path.resolve()}/{name}" for name in names]
+
+    return [pattern] if path.is_file() else []
+
+
+def load_path_stem(path: str) -> str:
+    return PurePosixPath(path).stem
+
+
+def file_fingerprint(path: Union[Path, str]) -> str:
+    """
+    Identify a file by its size, modification time and a hash of its first and last megabyte, so progress recorded
+    against it isn't applied to a different or changed file. A shapefile includes its sidecar files
+    """
+    match = VSIZIP_PATH.match(str(path))
+    if match:
+        with ZipFile(match["archive"]) as archive:
+            crc = archive.getinfo(match["member"]).CRC
+        return blake2b(f"{match['member']}:{crc}".encode("utf-8"), digest_size=16).hexdigest()
+
+    path = Path(path)
+    files = sorted(path.parent.glob(f"{path.stem}.*")) if path.suffix.lower() == ".shp" else [path]
+    digest = blake2b(digest_size=16)
+    for file in files:
+        stat = os.stat(file)
+        digest.update(f"{file.name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        with open(file, "rb") as f:
+            digest.update(f.read(FINGERPRINT_CHUNK))
+            if stat.st_size > FINGERPRINT_CHUNK:
+                f.seek(max(stat.st_size - FINGERPRINT_CHUNK, FINGERPRINT_CHUNK))
+                digest.update(f.read())
+
+    return digest.hexdigest()
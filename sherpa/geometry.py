@@ -1,21 +1,187 @@
-from typing import Optional
+import sys
+from array import array
+from collections.abc import Sequence
+from functools import lru_cache
+from itertools import chain
+from struct import Struct
+from typing import Any, Optional
 
 from fiona.collection import Collection
-from fiona.crs import CRSError
+import numpy as np
+import shapely
+from numpy.typing import NDArray
+from shapely.geometry import shape
 
 from sherpa.constants import CONSOLE
-from sherpa.utils import format_warning, format_error
+from sherpa.utils import format_warning
 
+# EWKB flag set on the geometry type when an SRID follows the header
+EWKB_SRID_FLAG = 0x20000000
 
-def get_collection_srid(collection: Collection) -> Optional[int]:
-    try:
-        srid = collection.crs.to_epsg()
-    except CRSError as ex:
-        CONSOLE.print(format_error(str(ex)))
-        exit(1)
+# EWKB flag set on the geometry type of geometries with a Z coordinate, as Shapely writes them
+EWKB_Z_FLAG = 0x80000000
+
+WKB_UINT_LE = Struct("<I")
+WKB_UINT_BE = Struct(">I")
+WKB_HEADER = Struct("<BI")
+WKB_EMPTY_POINT = Struct("<dd").pack(float("nan"), float("nan"))
+
+WKB_GEOMETRY_TYPES = {
+    "Point": 1,
+    "LineString": 2,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+    "GeometryCollection": 7,
+}
 
+
+def read_collection_srid(collection: Collection) -> int:
+    """
+    Read the EPSG code of a file's CRS, or 0 if it has none. Raises CRSError if the CRS can't be read
+    """
+    srid: Optional[int] = collection.crs.to_epsg()
     if srid is None:
         CONSOLE.print(format_warning(f"Unable to convert file CRS {collection.crs.data} to an EPSG code"))
         return 0
     else:
         return srid
+
+
+def to_ewkb(wkb: bytes, srid: Optional[int]) -> bytes:
+    """
+    Convert WKB to EWKB, embedding the SRID in the header
+    """
+    if not srid:
+        return wkb
+
+    uint = WKB_UINT_LE if wkb[0] == 1 else WKB_UINT_BE
+    (geometry_type,) = uint.unpack_from(wkb, 1)
+
+    return wkb[:1] + uint.pack(geometry_type | EWKB_SRID_FLAG) + uint.pack(srid) + wkb[5:]
+
+
+def to_hex_ewkb(wkb: bytes, srid: Optional[int]) -> str:
+    """
+    Convert WKB to the hex EWKB representation PostGIS accepts as geometry input, embedding the SRID
+    """
+    return to_ewkb(wkb, srid).hex()
+
+
+def geojson_to_wkb(geometry: Any) -> Optional[bytes]:
+    """
+    Encode a GeoJSON-like geometry mapping, such as a fiona feature's geometry, straight to little endian WKB
+    without building a Shapely geometry. Anything the encoder doesn't handle falls back to Shapely
+    """
+    if geometry is None:
+        return None
+
+    parts: list[bytes] = []
+    try:
+        encode_wkb(parts, geometry, geometry_has_z(geometry))
+    except (KeyError, ValueError, TypeError, IndexError):
+        return bytes(shape(geometry).wkb)
+
+    return b"".join(parts)
+
+
+def promote_to_multi(geometry: Any) -> Any:
+    """
+    Wrap a single point, line or polygon as a multi geometry with one member, so it fits a multi typed column
+    """
+    if geometry is None or geometry["type"] not in ("Point", "LineString", "Polygon"):
+        return geometry
+
+    return {"type": f"Multi{geometry['type']}", "coordinates": [geometry["coordinates"]]}
+
+
+def geometry_has_z(geometry: Any) -> bool:
+    if geometry["type"] == "GeometryCollection":
+        return any(geometry_has_z(member) for member in geometry["geometries"])
+
+    return has_z_coordinates(geometry["coordinates"])
+
+
+def has_z_coordinates(coordinates: Any) -> bool:
+    while coordinates and isinstance(coordinates[0], Sequence):
+        coordinates = coordinates[0]
+
+    return len(coordinates) == 3
+
+
+def encode_wkb(parts: list[bytes], geometry: Any, has_z: bool) -> None:
+    geometry_type = geometry["type"]
+    parts.append(WKB_HEADER.pack(1, WKB_GEOMETRY_TYPES[geometry_type] | (EWKB_Z_FLAG if has_z else 0)))
+
+    if geometry_type == "GeometryCollection":
+        members = geometry["geometries"]
+        parts.append(WKB_UINT_LE.pack(len(members)))
+        for member in members:
+            encode_wkb(parts, member, geometry_has_z(member))
+        return
+
+    coordinates = geometry["coordinates"]
+    if geometry_type == "Point":
+        parts.append(encode_coordinates([coordinates], has_z) if coordinates else WKB_EMPTY_POINT)
+    elif geometry_type == "LineString":
+        parts.append(encode_point_list(coordinates, has_z))
+    elif geometry_type == "Polygon":
+        encode_rings(parts, coordinates, has_z)
+    else:
+        member_type = geometry_type.removeprefix("Multi")
+        parts.append(WKB_UINT_LE.pack(len(coordinates)))
+        for member in coordinates:
+            encode_wkb(parts, {"type": member_type, "coordinates": member}, has_z)
+
+
+def encode_rings(parts: list[bytes], rings: Sequence[Sequence[Sequence[float]]], has_z: bool) -> None:
+    parts.append(WKB_UINT_LE.pack(len(rings)))
+    for ring in rings:
+        if ring and ring[0] != ring[-1]:
+            # Shapely closes rings on construction, so do the same
+            ring = [*ring, ring[0]]
+        parts.append(encode_point_list(ring, has_z))
+
+
+def encode_point_list(points: Sequence[Sequence[float]], has_z: bool) -> bytes:
+    return WKB_UINT_LE.pack(len(points)) + encode_coordinates(points, has_z)
+
+
+def encode_coordinates(points: Sequence[Sequence[float]], has_z: bool) -> bytes:
+    values = array("d", chain.from_iterable(points))
+    if len(values) != len(points) * (3 if has_z else 2):
+        raise ValueError("Coordinates have mixed dimensions")
+
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    return values.tobytes()
+
+
+@lru_cache
+def get_transformer(source_srid: int, target_srid: int) -> Any:
+    # Imported here as pyproj is only needed for client side reprojection
+    from pyproj import Transformer
+
+    return Transformer.from_crs(f"EPSG:{source_srid}", f"EPSG:{target_srid}", always_xy=True)
+
+
+def reproject_wkb(geometries: list[Optional[bytes]], source_srid: int, target_srid: int) -> list[Optional[bytes]]:
+    """
+    Reproject a batch of WKB geometries with pyproj, transforming every coordinate in the batch in one call
+    """
+    transformer = get_transformer(source_srid, target_srid)
+
+    def transform(coordinates: NDArray[np.float64]) -> NDArray[np.float64]:
+        return np.column_stack(transformer.transform(*coordinates.T))
+
+    parsed = shapely.from_wkb(np.array(geometries, dtype=object))
+    has_z = shapely.has_z(parsed)
+    # Transform 2D and 3D geometries separately so neither gains or loses a dimension
+    for include_z in (False, True):
+        mask = has_z == include_z
+        if mask.any():
+            parsed[mask] = shapely.transform(parsed[mask], transform, include_z=include_z)
+
+    return [None if x is None else bytes(x) for x in shapely.to_wkb(parsed)]
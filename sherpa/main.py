@@ -1,25 +1,61 @@
+import json
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Annotated, Optional
+from typing import TYPE_CHECKING, Annotated, Optional
 
+from rich.markup import escape
+from rich.table import Table
 from typer import Typer, Argument, Option
-from psycopg2.errors import lookup
-from fiona.crs import CRS, CRSError
 
-from sherpa.constants import CONSOLE
-from sherpa.utils import read_dsn_file, format_success, format_error, format_warning, format_highlight
+from sherpa.constants import (
+    CONSOLE,
+    HASH_COLUMN,
+    INFER_SAMPLE_SIZE,
+    LoadDriver,
+    LoadEngine,
+    LoadMode,
+    LoadReader,
+    SpatialIndex,
+    TransformMode,
+)
+from sherpa.utils import (
+    read_dsn_file,
+    format_success,
+    format_error,
+    format_warning,
+    format_highlight,
+    format_info,
+    parse_size,
+)
+from sherpa.daemon import DaemonError, serve
 from sherpa.database import get_pg_client
+from sherpa.files import expand_load_paths, file_fingerprint, load_path_stem
+from sherpa.stats import LoadStats
 
+from sherpa.cmd import bench
 from sherpa.cmd import dsn
 from sherpa.cmd import table
 
+if TYPE_CHECKING:
+    from sherpa.parallel import FileResult
+    from sherpa.pg_client import PgClient, PgTable
+    from sherpa.validate import ValidationReport
+
 app = Typer(name="sherpa", no_args_is_help=True)
 app.add_typer(dsn.app, name="dsn", no_args_is_help=True)
 app.add_typer(table.app, name="table", no_args_is_help=True)
+app.add_typer(bench.app, name="bench", no_args_is_help=True)
 
 
 @app.command("load", no_args_is_help=True)
 def load_file_to_pg(
-    file: Annotated[Path, Argument(help="Path of the file to load", show_default=False)],
+    file: Annotated[
+        Path,
+        Argument(
+            help="Path of the file to load, or a directory, zip archive or quoted glob of files to load",
+            show_default=False,
+        ),
+    ],
     table: Annotated[
         Optional[str], Argument(metavar="TEXT", help="Name of the table to load to", show_default=False)
     ] = None,
@@ -35,6 +71,78 @@ def load_file_to_pg(
             rich_help_panel="Database Options",
         ),
     ] = False,
+    infer_full: Annotated[
+        bool,
+        Option(
+            "--infer-full",
+            help=f"With --create, scan every feature to infer column types instead of the first {INFER_SAMPLE_SIZE}",
+            rich_help_panel="Database Options",
+        ),
+    ] = False,
+    fast: Annotated[
+        bool,
+        Option(
+            "--fast",
+            help="With --create, load to an UNLOGGED table, then add keys and indexes and swap it into place",
+            rich_help_panel="Database Options",
+        ),
+    ] = False,
+    index: Annotated[
+        Optional[SpatialIndex],
+        Option(
+            "--index",
+            help="With --create, the index built on the geometry column once loaded [default: gist]",
+            show_default=False,
+            rich_help_panel="Database Options",
+        ),
+    ] = None,
+    cluster: Annotated[
+        bool,
+        Option(
+            "--cluster",
+            help="With --create, physically order the table by its spatial index once loaded",
+            rich_help_panel="Database Options",
+        ),
+    ] = False,
+    maintenance_work_mem: Annotated[
+        Optional[str],
+        Option(
+            "--maintenance-work-mem",
+            help="Memory for building the index and clustering, e.g. 1GB (defaults to the server's setting)",
+            show_default=False,
+            rich_help_panel="Database Options",
+        ),
+    ] = None,
+    hash_column: Annotated[
+        bool,
+        Option(
+            "--hash",
+            help=f"With --create, add a {HASH_COLUMN} column of each feature's content hash for --mode sync",
+            rich_help_panel="Database Options",
+        ),
+    ] = False,
+    mode: Annotated[
+        LoadMode,
+        Option(
+            "--mode",
+            "-m",
+            help=(
+                "Append rows, upsert them on --key, replace the table's rows with the file's in one swap, or sync "
+                f"the table to the file on --key, writing only new and changed features by their {HASH_COLUMN}"
+            ),
+            rich_help_panel="Database Options",
+        ),
+    ] = LoadMode.APPEND,
+    key: Annotated[
+        Optional[str],
+        Option(
+            "--key",
+            "-k",
+            help="With --mode upsert or sync, the column identifying a feature, which needs a unique index",
+            show_default=False,
+            rich_help_panel="Database Options",
+        ),
+    ] = None,
     srid: Annotated[
         Optional[int],
         Option(
@@ -44,21 +152,252 @@ def load_file_to_pg(
             rich_help_panel="Geometry Options",
         ),
     ] = None,
+    transform: Annotated[
+        TransformMode,
+        Option(
+            "--transform",
+            help="Reproject with ST_Transform in the database, or with pyproj in sherpa to spare a busy database",
+            rich_help_panel="Geometry Options",
+        ),
+    ] = TransformMode.SERVER,
+    driver: Annotated[
+        LoadDriver,
+        Option(
+            "--driver",
+            help="Write with psycopg2, or psycopg 3 using binary COPY and pipelined INSERTs (sherpa\\[psycopg])",
+            rich_help_panel="Load Options",
+        ),
+    ] = LoadDriver.PSYCOPG2,
+    reader: Annotated[
+        LoadReader,
+        Option(
+            "--reader",
+            help="Read features one at a time with fiona, or in columnar batches with pyogrio (sherpa\\[arrow])",
+            rich_help_panel="Load Options",
+        ),
+    ] = LoadReader.FIONA,
+    validate: Annotated[
+        bool,
+        Option(
+            "--validate",
+            help="Check every file against its table first, and load nothing if any would fail",
+            rich_help_panel="Load Options",
+        ),
+    ] = False,
+    engine: Annotated[
+        LoadEngine,
+        Option(
+            "--engine",
+            "-e",
+            help="Write rows with COPY ... FROM STDIN or batched INSERT statements",
+            rich_help_panel="Load Options",
+        ),
+    ] = LoadEngine.COPY,
+    batch_size: Annotated[
+        int,
+        Option("--batch-size", "-b", min=1, help="Maximum rows written per batch", rich_help_panel="Load Options"),
+    ] = 10000,
+    batch_bytes: Annotated[
+        Optional[str],
+        Option(
+            "--batch-bytes",
+            "--max-memory",
+            help="Cap the data held per batch, e.g. 64MB (rows are streamed, so this bounds memory use)",
+            show_default=False,
+            rich_help_panel="Load Options",
+        ),
+    ] = None,
+    workers: Annotated[
+        int,
+        Option(
+            "--workers",
+            "-w",
+            min=1,
+            help="Number of processes to load with, each using its own connection and a range of the file's features",
+            rich_help_panel="Load Options",
+        ),
+    ] = 1,
+    queue_size: Annotated[
+        int,
+        Option(
+            "--queue-size",
+            min=1,
+            help="Batches the file reader may decode ahead of the database writer",
+            rich_help_panel="Load Options",
+        ),
+    ] = 2,
+    commit_every: Annotated[
+        Optional[int],
+        Option(
+            "--commit-every",
+            min=1,
+            help="Commit once at least this many rows have been written, instead of after every batch",
+            show_default=False,
+            rich_help_panel="Transaction Options",
+        ),
+    ] = None,
+    single_transaction: Annotated[
+        bool,
+        Option(
+            "--single-transaction",
+            help="Load the whole file in one transaction so a failure leaves the table untouched",
+            rich_help_panel="Transaction Options",
+        ),
+    ] = False,
+    async_commit: Annotated[
+        bool,
+        Option(
+            "--async-commit",
+            help="Don't wait for commits to be flushed to disk (synchronous_commit = off)",
+            rich_help_panel="Transaction Options",
+        ),
+    ] = False,
+    resume: Annotated[
+        bool,
+        Option(
+            "--resume",
+            help="Checkpoint commits, and continue an interrupted load of the same file and table from its last one",
+            rich_help_panel="Transaction Options",
+        ),
+    ] = False,
+    show_stats: Annotated[
+        bool,
+        Option(
+            "--stats",
+            help="Time each stage of the load and print a breakdown with the bytes sent",
+            rich_help_panel="Profiling Options",
+        ),
+    ] = False,
+    stats_json: Annotated[
+        Optional[Path],
+        Option(
+            "--stats-json",
+            help="Time each stage of the load and write the breakdown to a JSON file",
+            show_default=False,
+            rich_help_panel="Profiling Options",
+        ),
+    ] = None,
+    profile: Annotated[
+        Optional[Path],
+        Option(
+            "--profile",
+            help="Write cProfile stats of the load to a file, one per worker suffixed with its first feature",
+            show_default=False,
+            rich_help_panel="Profiling Options",
+        ),
+    ] = None,
 ) -> None:
     """
     Load a file to a PostGIS table
     """
+    # Imported here so commands that don't read files or write to the database start without GDAL, GEOS or libpq
+    import fiona
+    from fiona.crs import CRS, CRSError
+    from psycopg2.errors import lookup
+
+    from sherpa.parallel import FileResult, load_files, load_parallel, partition_features
+    from sherpa.pg_client import LoadOptions, PgClientError, PgTable, identifier_with_suffix
+
     table_name = table  # Avoid shadowing name from outer scope
     dsn_profile = read_dsn_file()
 
-    if not file.exists():
+    files = expand_load_paths(str(file))
+    if not files:
         CONSOLE.print(format_error(f"File not found: {file}"))
         exit(1)
 
+    if len(files) > 1 and (fast or profile is not None):
+        CONSOLE.print(format_error("--fast and --profile can only be used when loading a single file"))
+        exit(1)
+
     if not table_name and create_table is False:
         CONSOLE.print(format_error("You must provide a table to load to or create one with --create/-c"))
         exit(1)
 
+    if infer_full and not create_table:
+        CONSOLE.print(format_error("--infer-full can only be used when creating a table with --create/-c"))
+        exit(1)
+
+    if (index is not None or cluster or maintenance_work_mem is not None) and not create_table:
+        CONSOLE.print(format_error("--index, --cluster and --maintenance-work-mem can only be used with --create/-c"))
+        exit(1)
+
+    if cluster and index in (SpatialIndex.BRIN, SpatialIndex.NONE):
+        CONSOLE.print(format_error(f"--cluster needs a GiST or SP-GiST index, not {index.value}"))
+        exit(1)
+
+    maintenance_work_mem_bytes = None
+    if maintenance_work_mem is not None:
+        maintenance_work_mem_bytes = parse_size(maintenance_work_mem)
+        if maintenance_work_mem_bytes is None:
+            CONSOLE.print(format_error(f"Invalid maintenance_work_mem size: {maintenance_work_mem}"))
+            exit(1)
+
+    if fast and not create_table:
+        CONSOLE.print(format_error("--fast can only be used when creating a table with --create/-c"))
+        exit(1)
+
+    if fast and resume:
+        # A crash empties the UNLOGGED table but keeps the checkpoints, so resuming would skip rows that were lost
+        CONSOLE.print(format_error("--fast loads can't be resumed, the table they load to isn't crash safe"))
+        exit(1)
+
+    if mode is not LoadMode.APPEND and create_table:
+        CONSOLE.print(format_error(f"--mode {mode.value} loads to an existing table, create it with --create/-c first"))
+        exit(1)
+
+    if (mode in (LoadMode.UPSERT, LoadMode.SYNC)) != (key is not None):
+        CONSOLE.print(format_error("--key must be used with --mode upsert or sync, and they need one"))
+        exit(1)
+
+    if mode is LoadMode.SYNC and (len(files) > 1 or workers > 1 or resume):
+        # Features missing from the file are deleted, so it has to see the whole file in one load
+        CONSOLE.print(format_error("--mode sync loads a single file with one worker and can't be resumed"))
+        exit(1)
+
+    if driver is LoadDriver.PSYCOPG:
+        if find_spec("psycopg") is None:
+            CONSOLE.print(format_error("--driver psycopg requires psycopg, install it with sherpa\\[psycopg]"))
+            exit(1)
+
+        # psycopg writes on a connection of its own, so it can't share a transaction with staging or checkpoints
+        if mode is not LoadMode.APPEND or resume or (srid is not None and transform is TransformMode.SERVER):
+            CONSOLE.print(
+                format_error("--driver psycopg only appends, without --resume or --srid unless with --transform client")
+            )
+            exit(1)
+
+    if reader is LoadReader.ARROW and (find_spec("pyogrio") is None or find_spec("pyarrow") is None):
+        CONSOLE.print(
+            format_warning("--reader arrow requires pyogrio and pyarrow from sherpa\\[arrow], reading with fiona")
+        )
+        reader = LoadReader.FIONA
+
+    if validate and create_table:
+        CONSOLE.print(
+            format_error("--validate checks files against an existing table, it can't be used with --create/-c")
+        )
+        exit(1)
+
+    if hash_column and not create_table:
+        CONSOLE.print(format_error("--hash can only be used when creating a table with --create/-c"))
+        exit(1)
+
+    if resume and single_transaction:
+        CONSOLE.print(format_error("--resume can't be used with --single-transaction, there are no commits to resume"))
+        exit(1)
+
+    if single_transaction and workers > 1:
+        CONSOLE.print(format_error("--single-transaction can't be used with --workers, each worker commits separately"))
+        exit(1)
+
+    batch_bytes_limit = None
+    if batch_bytes is not None:
+        batch_bytes_limit = parse_size(batch_bytes)
+        if batch_bytes_limit is None:
+            CONSOLE.print(format_error(f"Invalid batch size in bytes: {batch_bytes}"))
+            exit(1)
+
     if srid is not None:
         try:
             crs = CRS.from_epsg(srid)
@@ -69,46 +408,386 @@ def load_file_to_pg(
             srid = crs.to_epsg()
             CONSOLE.print(format_warning(f"Forcing geometries to EPSG:{srid}"), highlight=False)
 
+        if transform is TransformMode.CLIENT and find_spec("pyproj") is None:
+            CONSOLE.print(format_error("--transform client requires pyproj, install it with sherpa\\[reproject]"))
+            exit(1)
+
     client = get_pg_client(dsn_profile["default"])
 
+    max_size = client.pool.config.max_size
+    # Each worker connects on its own, plus once more with psycopg, while this process keeps its connections open,
+    # which under sherpa serve are at least min_size
+    worker_connections = 2 if driver is LoadDriver.PSYCOPG else 1
+    held = max(client.pool.size, client.pool.config.min_size)
+    if driver is LoadDriver.PSYCOPG and max_size is not None and held + 1 > max_size:
+        CONSOLE.print(
+            format_error(f"--driver psycopg needs a second connection, the pool's max_size is {max_size} connections")
+        )
+        exit(1)
+
+    if max_size is not None and workers > 1 and held + workers * worker_connections > max_size:
+        workers = max((max_size - held) // worker_connections, 1)
+        CONSOLE.print(format_warning(f"Limiting --workers to {workers}, the pool's max_size is {max_size} connections"))
+
     if not client.schema_exists(schema):
         CONSOLE.print(format_error(f"Schema not found: {format_highlight(f'{schema}')}"))
         exit(1)
 
-    if create_table:
-        if table_name is None:
-            create_table_name = file.name.removesuffix(file.suffix)
+    if create_table and table_name is None:
+        names = format_highlight(load_path_stem(files[0])) if len(files) == 1 else "names"
+        CONSOLE.print(format_warning(f"Table name not provided, using file {names}"))
+
+    # Files are loaded to the table given or one named after each file, looking each table up once
+    targets = {x: table_name or load_path_stem(x) for x in files}
+    tables: dict[str, PgTable] = {}
+    # Files a table couldn't be created from, which a multi file load reports as failed rather than exiting
+    failed: dict[str, FileResult] = {}
+    for path, target in targets.items():
+        if target in tables:
+            continue
+
+        if create_table:
+            sample_size = None if infer_full else INFER_SAMPLE_SIZE
+            # With --fast, load to a staging table that's renamed to the requested table once the load is complete
+            load_table_name = identifier_with_suffix(target, "_sherpa_load") if fast else target
+            try:
+                if resume and can_resume(client, schema, load_table_name):
+                    CONSOLE.print(format_info(f"Resuming load to {format_highlight(f'{schema}.{load_table_name}')}"))
+                elif fast:
+                    if client.get_insert_table_info(target, schema):
+                        CONSOLE.print(format_error(f"Table {format_highlight(f'{schema}.{target}')} already exists"))
+                        exit(1)
+
+                    client.drop_table(schema, load_table_name)
+                    client.create_table(
+                        path,
+                        schema,
+                        load_table_name,
+                        staging=True,
+                        force_srid=srid,
+                        sample_size=sample_size,
+                        hash_column=hash_column,
+                    )
+                else:
+                    load_table_name = client.create_table(
+                        path, schema, target, force_srid=srid, sample_size=sample_size, hash_column=hash_column
+                    )
+                    CONSOLE.print(format_success(f"Created table {format_highlight(f'{schema}.{load_table_name}')}"))
+            except lookup("42P07"):
+                # Catch DuplicateTable errors
+                existing = format_highlight(f"{schema}.{target}")
+                CONSOLE.print(format_error(f"Table {existing} already exists, use the --table/-t option instead"))
+                exit(1)
+            except PgClientError as ex:
+                if len(files) == 1:
+                    CONSOLE.print(format_error(str(ex)))
+                    exit(1)
+
+                # Another file loading to the same table may still create it
+                failed[path] = FileResult(path, f"{schema}.{target}", error=str(ex))
+                continue
+        elif mode is LoadMode.REPLACE:
+            # Load to a copy of the table that replaces it once the load is complete
+            load_table_name = identifier_with_suffix(target, "_sherpa_replace")
+            if not client.get_insert_table_info(target, schema):
+                CONSOLE.print(format_error(f"Table not found: {format_highlight(f'{schema}.{target}')}"))
+                exit(1)
+
+            if resume and can_resume(client, schema, load_table_name):
+                CONSOLE.print(format_info(f"Resuming load to {format_highlight(f'{schema}.{load_table_name}')}"))
+            else:
+                client.create_replacement_table(schema, target, load_table_name)
+        else:
+            load_table_name = target
+
+        table_structure = client.get_insert_table_info(load_table_name, schema)
+        if not table_structure:
+            CONSOLE.print(format_error(f"Table not found: {format_highlight(f'{schema}.{load_table_name}')}"))
+            exit(1)
+
+        if key is not None and key not in table_structure.columns:
+            CONSOLE.print(format_error(f"Column not found: {format_highlight(f'{schema}.{target}.{key}')}"))
+            exit(1)
+
+        if mode is LoadMode.SYNC and HASH_COLUMN not in table_structure.columns:
             CONSOLE.print(
-                format_warning(f"Table name not provided, using file name {format_highlight(create_table_name)}")
+                format_error(f"--mode sync needs a {HASH_COLUMN} BYTEA column, create the table with --hash to add one")
             )
-        else:
-            create_table_name = table_name
+            exit(1)
 
-        try:
-            table_name = client.create_table(file, schema, create_table_name)
-            CONSOLE.print(format_success(f"Created table {format_highlight(f'{schema}.{table_name}')}"))
-        except lookup("42P07"):
-            # Catch DuplicateTable errors
+        if key is not None and not client.has_unique_index(schema, target, key):
             CONSOLE.print(
-                format_error(
-                    f"Table {format_highlight(f'{schema}.{file.name.removesuffix(file.suffix)}')} already exists, use the --table/-t option instead"
-                )
+                format_error(f"Column {format_highlight(key)} of {schema}.{target} needs a unique index to upsert on")
             )
             exit(1)
+        tables[target] = table_structure
 
-    table_structure = client.get_insert_table_info(table_name, schema)
-    if not table_structure:
-        CONSOLE.print(format_error(f"Table not found: {format_highlight(f'{schema}.{table_name}')}"))
+    loadable = [x for x in files if x not in failed]
+    if validate and not validate_files(client, [(x, tables[targets[x]]) for x in loadable], srid, workers):
+        client.close()
         exit(1)
 
-    rows_inserted = client.load(file, table_structure, force_srid=srid)
+    fingerprints = {x: file_fingerprint(x) for x in files} if resume else {}
+    if resume:
+        client.create_checkpoint_table(schema)
+        if len(files) == 1:
+            # Checkpoints are kept per worker's range of features, so the ranges have to be the same to resume
+            ranges = [
+                (x.start, x.stop)
+                for x in client.get_checkpoints(schema, tables[targets[files[0]]].table, fingerprints[files[0]])
+            ]
+            with fiona.open(files[0], mode="r") as collection:
+                feature_count = len(collection)
+            if ranges and not set(ranges) <= set(partition_features(feature_count, workers)):
+                CONSOLE.print(
+                    format_error(
+                        f"The interrupted load used {len(ranges)} workers, resume it with --workers {len(ranges)}"
+                    )
+                )
+                exit(1)
+
+    options = LoadOptions(
+        force_srid=srid,
+        engine=engine,
+        batch_size=batch_size,
+        batch_bytes=batch_bytes_limit,
+        queue_size=queue_size,
+        commit_every=commit_every,
+        single_transaction=single_transaction,
+        async_commit=async_commit,
+        transform=transform,
+        time_stages=show_stats or stats_json is not None,
+        profile_path=profile,
+        resume=resume,
+        mode=mode,
+        key=key,
+        driver=driver,
+        reader=reader,
+    )
+    stats = LoadStats()
+    results: list[FileResult] = []
+    if len(files) > 1:
+        jobs = [(x, tables[targets[x]]) for x in loadable]
+        results = load_files(client, dsn_profile["default"], jobs, options, workers, stats) if jobs else []
+        # Files whose table couldn't be created are listed in their place among those that loaded
+        results = sorted([*failed.values(), *results], key=lambda x: files.index(x.file))
+        rows_inserted = sum(x.rows for x in results)
+    else:
+        try:
+            if workers > 1:
+                rows_inserted = load_parallel(
+                    dsn_profile["default"], files[0], tables[targets[files[0]]], options, workers, stats
+                )
+            else:
+                rows_inserted = client.load(files[0], tables[targets[files[0]]], options, stats=stats)
+        except PgClientError as ex:
+            CONSOLE.print(format_error(str(ex)))
+            exit(1)
+    # Workers add what their pools did to stats, so add what this process's did
+    stats.add_pool(client.pool.stats)
+
+    if resume and not any(x.error is not None for x in results):
+        # Every file loaded, so there's nothing left to resume
+        for path, target in targets.items():
+            client.clear_checkpoints(schema, tables[target].table, fingerprints[path])
+
+    for target, table_structure in tables.items():
+        if mode is LoadMode.REPLACE and not any(x.error is not None for x in results):
+            client.swap_table(schema, table_structure.table, target)
+            table_structure.table = target
+        elif fast:
+            client.finish_staged_load(
+                schema,
+                table_structure.table,
+                target,
+                index or SpatialIndex.GIST,
+                cluster,
+                maintenance_work_mem_bytes,
+            )
+            table_structure.table = target
+            CONSOLE.print(format_success(f"Created table {format_highlight(f'{schema}.{target}')}"))
+        elif create_table:
+            with CONSOLE.status(f"[cyan]Indexing and analyzing {schema}.{target}..."):
+                client.index_table(
+                    schema, table_structure.table, index or SpatialIndex.GIST, cluster, maintenance_work_mem_bytes
+                )
+
     client.close()
 
+    if results:
+        print_file_results(results)
+        loaded = sum(x.error is None for x in results)
+        CONSOLE.print(format_success(f"Loaded {rows_inserted} records from {loaded} of {len(results)} files"))
+    else:
+        loaded_to = format_highlight(f"{schema}.{tables[targets[files[0]]].table}")
+        CONSOLE.print(format_success(f"Loaded {rows_inserted} records to {loaded_to}"))
+    if stats.sync is not None:
+        CONSOLE.print(format_info(f"Synced: {stats.sync.summary()}"), highlight=False)
+    CONSOLE.print(format_info(stats.summary()), highlight=False)
+
+    if show_stats:
+        print_load_stats(stats)
+
+    if stats_json is not None:
+        with open(stats_json, "w") as f:
+            json.dump(stats.to_dict(), f, indent=2)
+        CONSOLE.print(format_success(f"Load stats written to {format_highlight(str(stats_json))}"))
+
+    if profile is not None:
+        profiles = str(profile) if workers == 1 else f"{profile}.*"
+        CONSOLE.print(format_success(f"Profile written to {format_highlight(profiles)}"))
+
+    if any(x.error is not None for x in results):
+        exit(1)
+
+
+@app.command("validate", no_args_is_help=True)
+def validate_file_against_pg(
+    file: Annotated[
+        Path,
+        Argument(
+            help="Path of the file to check, or a directory, zip archive or quoted glob of files to check",
+            show_default=False,
+        ),
+    ],
+    table: Annotated[
+        Optional[str],
+        Argument(metavar="TEXT", help="Name of the table to check against, defaults to each file's name"),
+    ] = None,
+    schema: Annotated[str, Option("--schema", "-s", help="Schema of the table to check against")] = "public",
+    srid: Annotated[
+        Optional[int],
+        Option("--srid", help="The SRID the load will force geometries to", show_default=False),
+    ] = None,
+    workers: Annotated[
+        int, Option("--workers", "-w", min=1, help="Worker processes each file's features are split across")
+    ] = 1,
+) -> None:
+    """
+    Check files against the tables they'd be loaded to without loading anything: that their columns match, each value
+    fits its column's type and geometries are valid and in the table's type and SRID
+    """
+    dsn_profile = read_dsn_file()
+
+    files = expand_load_paths(str(file))
+    if not files:
+        CONSOLE.print(format_error(f"File not found: {file}"))
+        exit(1)
+
+    client = get_pg_client(dsn_profile["default"])
+
+    if not client.schema_exists(schema):
+        CONSOLE.print(format_error(f"Schema not found: {format_highlight(f'{schema}')}"))
+        exit(1)
+
+    jobs = []
+    for path in files:
+        target = table or load_path_stem(path)
+        table_structure = client.get_insert_table_info(target, schema)
+        if not table_structure:
+            CONSOLE.print(format_error(f"Table not found: {format_highlight(f'{schema}.{target}')}"))
+            exit(1)
+        jobs.append((path, table_structure))
+
+    valid = validate_files(client, jobs, srid, workers)
+    client.close()
+
+    if not valid:
+        exit(1)
+
+
+@app.command("serve")
+def serve_commands() -> None:
+    """
+    Run the load, validate and table commands the CLI forwards until interrupted, keeping libraries imported and
+    database connections open between them
+    """
+    try:
+        serve()
+    except DaemonError as ex:
+        CONSOLE.print(format_error(str(ex)))
+        exit(1)
+
+
+def validate_files(client: "PgClient", jobs: list[tuple[str, "PgTable"]], srid: Optional[int], workers: int) -> bool:
+    """
+    Check each file against its table, printing a report of the issues found. Returns whether none were errors
+    """
+    from sherpa.validate import ValidationTarget, validate_file
+
+    reports = []
+    for path, table_structure in jobs:
+        columns = client.get_columns(table_structure.table, table_structure.schema)
+        target = ValidationTarget.from_columns(table_structure, columns, srid)
+        with CONSOLE.status(f"[cyan]Validating {path}..."):
+            reports.append(validate_file(path, target, workers))
+
+    print_validation_reports(reports)
+    errors = sum(x.errors for x in reports)
+    if errors:
+        CONSOLE.print(format_error(f"Validation found {errors} errors, nothing was loaded"))
+    else:
+        CONSOLE.print(format_success(f"Validated {len(reports)} files"))
+
+    return not errors
+
+
+def can_resume(client: "PgClient", schema: str, table_name: str) -> bool:
+    """
+    Check an interrupted load left checkpoints for a table it created, so it can be loaded to instead of recreated
+    """
+    return (
+        bool(client.get_checkpoints(schema, table_name))
+        and client.get_insert_table_info(table_name, schema) is not None
+    )
+
+
+def print_file_results(results: list["FileResult"]) -> None:
+    console_table = Table("FILE", "TABLE", "ROWS", "SECONDS", "STATUS", style="cyan")
+    for result in results:
+        status = "[green]loaded[/green]" if result.error is None else f"[red]{escape(result.error)}[/red]"
+        console_table.add_row(result.file, result.table, str(result.rows), f"{result.seconds:.2f}", status)
+
+    CONSOLE.print(console_table)
+
+
+def print_validation_reports(reports: list["ValidationReport"]) -> None:
+    issues = [(report, x) for report in reports for x in report.issues.values()]
+    if issues:
+        console_table = Table("FILE", "CHECK", "COLUMN", "PROBLEM", "FEATURES", "EXAMPLES", style="cyan")
+        for report, issue in issues:
+            colour = "red" if issue.error else "yellow"
+            console_table.add_row(
+                report.file,
+                issue.check,
+                issue.column,
+                f"[{colour}]{escape(issue.problem)}[/{colour}]",
+                str(issue.count) if issue.examples else "-",
+                ", ".join(str(x) for x in issue.examples) or "-",
+            )
+        CONSOLE.print(console_table)
+
+    for report in reports:
+        CONSOLE.print(format_info(report.summary()), highlight=False)
+
+
+def print_load_stats(stats: LoadStats) -> None:
+    # Stages are summed across workers, so compare them with each other rather than the wall clock
+    total = sum(stats.stages.values())
+    console_table = Table("STAGE", "SECONDS", "SHARE", style="cyan")
+    for stage, seconds in stats.stages.items():
+        console_table.add_row(stage, f"{seconds:.3f}", f"{seconds / total:.1%}" if total else "-")
+
+    CONSOLE.print(console_table)
     CONSOLE.print(
-        format_success(
-            f"Loaded {rows_inserted} records to {format_highlight(f'{table_structure.schema}.{table_structure.table}')}"
-        )
+        format_info(
+            f"{stats.rows} rows, {stats.bytes_sent / 1024**2:.2f} MB sent in {stats.seconds:.2f}s "
+            f"({stats.rows / stats.seconds if stats.seconds else 0:,.0f} rows/s)"
+        ),
+        highlight=False,
     )
+    if stats.pool is not None:
+        CONSOLE.print(format_info(stats.pool.summary()), highlight=False)
 
 
 @app.callback()
@@ -0,0 +1,220 @@
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed, wait
+from contextlib import ExitStack
+from dataclasses import dataclass, field, replace
+from functools import partial
+from multiprocessing import get_context
+from pathlib import Path
+from time import perf_counter
+from queue import Empty, Queue
+from typing import Optional, Union
+
+import fiona
+from rich.progress import Progress, TaskID
+
+from sherpa.pg_client import LoadOptions, PgClient, PgTable, advance_progress
+from sherpa.pool import get_pool
+from sherpa.stats import LoadStats
+
+# Workers are spawned rather than forked so they don't inherit the parent's database connection
+MP_CONTEXT = get_context("spawn")
+
+
+def partition_features(feature_count: int, partitions: int) -> list[tuple[int, int]]:
+    """
+    Split a file's feature indexes into contiguous (start, stop) ranges of near equal size
+    """
+    size, remainder = divmod(feature_count, partitions)
+    ranges = []
+    start = 0
+    for i in range(partitions):
+        stop = start + size + (1 if i < remainder else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+
+    return ranges
+
+
+def load_partition(
+    connection_details: dict[str, str],
+    file: Union[Path, str],
+    table_structure: PgTable,
+    options: LoadOptions,
+    start: int,
+    stop: int,
+    progress_queue: "Queue[int]",
+) -> tuple[int, LoadStats]:
+    if options.profile_path is not None:
+        # Each worker writes its own profile, suffixed with the first feature it loads
+        options = replace(options, profile_path=options.profile_path.with_name(f"{options.profile_path.name}.{start}"))
+
+    # The executor may give a worker more than one partition, so only count what its pool did for this one
+    pool = get_pool(connection_details)
+    pool_started = pool.snapshot()
+    stats = LoadStats()
+    with PgClient(connection_details) as client:
+        inserted = client.load(file, table_structure, options, start, stop, on_batch=progress_queue.put, stats=stats)
+
+    stats.add_pool(pool.stats.since(pool_started))
+    return inserted, stats
+
+
+def drain_progress(progress_queue: "Queue[int]", on_batch: Callable[[int], None]) -> None:
+    while True:
+        try:
+            on_batch(progress_queue.get_nowait())
+        except Empty:
+            return
+
+
+def load_parallel(
+    connection_details: dict[str, str],
+    file: Union[Path, str],
+    table_structure: PgTable,
+    options: LoadOptions,
+    workers: int,
+    stats: Optional[LoadStats] = None,
+    on_batch: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Load a file using a pool of worker processes, each with its own connection loading a range of features.
+    Progress is reported to on_batch if given or a progress bar if not
+    """
+    with fiona.open(file, mode="r") as collection:
+        feature_count = len(collection)
+
+    partitions = partition_features(feature_count, workers)
+    if not partitions:
+        return 0
+
+    connection_details = {k: str(v) for k, v in connection_details.items()}
+    started = perf_counter()
+    with (
+        MP_CONTEXT.Manager() as manager,
+        ProcessPoolExecutor(max_workers=len(partitions), mp_context=MP_CONTEXT) as executor,
+        ExitStack() as stack,
+    ):
+        if on_batch is None:
+            progress = stack.enter_context(Progress())
+            load_task = progress.add_task(
+                f"[cyan]Loading with {len(partitions)} workers...[/cyan]", total=feature_count
+            )
+            on_batch = partial(advance_progress, progress, load_task)
+
+        progress_queue = manager.Queue()
+        futures: list[Future[tuple[int, LoadStats]]] = [
+            executor.submit(
+                load_partition, connection_details, file, table_structure, options, start, stop, progress_queue
+            )
+            for start, stop in partitions
+        ]
+
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=0.1)
+            drain_progress(progress_queue, on_batch)
+
+        inserted = 0
+        for future in futures:
+            partition_inserted, partition_stats = future.result()
+            inserted += partition_inserted
+            if stats is not None:
+                stats.merge(partition_stats)
+
+        if stats is not None:
+            # Stage times are summed across workers, but the load took as long as the slowest
+            stats.seconds += perf_counter() - started
+
+        return inserted
+
+
+@dataclass
+class FileResult:
+    file: str
+    table: str
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    stats: LoadStats = field(default_factory=LoadStats)
+
+
+def load_file(client: PgClient, file: str, table_structure: PgTable, options: LoadOptions) -> FileResult:
+    """
+    Load a whole file, recording a failure in the result rather than raising so the remaining files still load
+    """
+    result = FileResult(file, f"{table_structure.schema}.{table_structure.table}")
+    started = perf_counter()
+    try:
+        result.rows = client.load(file, table_structure, options, on_batch=lambda rows: None, stats=result.stats)
+    except Exception as ex:
+        result.error = str(ex).strip() or type(ex).__name__
+
+    result.seconds = perf_counter() - started
+    return result
+
+
+def load_file_in_worker(
+    connection_details: dict[str, str], file: str, table_structure: PgTable, options: LoadOptions
+) -> FileResult:
+    # Each worker's pool keeps its connection open for the next file it's given
+    pool = get_pool(connection_details)
+    pool_started = pool.snapshot()
+    with PgClient(connection_details) as client:
+        result = load_file(client, file, table_structure, options)
+
+    result.stats.add_pool(pool.stats.since(pool_started))
+    return result
+
+
+def load_files(
+    client: PgClient,
+    connection_details: dict[str, str],
+    files: list[tuple[str, PgTable]],
+    options: LoadOptions,
+    workers: int,
+    stats: Optional[LoadStats] = None,
+) -> list[FileResult]:
+    """
+    Load many files, each to its own table structure. With more than one worker, files are loaded concurrently by
+    a pool of processes each reusing one connection, otherwise one at a time with client
+    """
+    started = perf_counter()
+    with Progress() as progress:
+        load_task = progress.add_task(f"[cyan]Loading {len(files)} files...[/cyan]", total=len(files))
+        if workers == 1:
+            results = []
+            for file, table_structure in files:
+                results.append(load_file(client, file, table_structure, options))
+                progress.update(load_task, advance=1)
+        else:
+            results = load_files_concurrently(connection_details, files, options, workers, progress, load_task)
+
+    if stats is not None:
+        for result in results:
+            stats.merge(result.stats)
+        stats.seconds += perf_counter() - started
+
+    return results
+
+
+def load_files_concurrently(
+    connection_details: dict[str, str],
+    files: list[tuple[str, PgTable]],
+    options: LoadOptions,
+    workers: int,
+    progress: Progress,
+    load_task: TaskID,
+) -> list[FileResult]:
+
+    connection_details = {k: str(v) for k, v in connection_details.items()}
+    with ProcessPoolExecutor(max_workers=min(workers, len(files)), mp_context=MP_CONTEXT) as executor:
+        futures = [
+            executor.submit(load_file_in_worker, connection_details, file, table_structure, options)
+            for file, table_structure in files
+        ]
+        for future in as_completed(futures):
+            future.result()
+            progress.update(load_task, advance=1)
+
+    return [x.result() for x in futures]
@@ -1,20 +1,60 @@
+import json
+from hashlib import blake2b
+from cProfile import Profile
 from dataclasses import dataclass
+from decimal import Decimal
 from pathlib import Path
-from collections.abc import Generator
-from typing import Any, Optional, Union
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from functools import cached_property, partial
+from time import monotonic, perf_counter
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Optional, Union
+from uuid import UUID
 
 import fiona
 from fiona import Collection
-from shapely.geometry import shape
-from rich.progress import Progress
-from psycopg2 import DatabaseError, connect
-from psycopg2.sql import SQL, Identifier, Composed
+from fiona.crs import CRSError
+from rich.markup import escape
+from rich.progress import Progress, TaskID
+from psycopg2 import DatabaseError
+from psycopg2.errors import InsufficientPrivilege, QueryCanceled
+from psycopg2.sql import SQL, Identifier, Composed, Literal
 from psycopg2.extensions import connection as PgConnection, cursor as PgCursor
+from psycopg2.extras import Json
 
-from sherpa.constants import DATA_TYPE_MAP
-from sherpa.geometry import get_collection_srid
+from sherpa.constants import (
+    CATALOG_TTL,
+    CHECKPOINT_TABLE,
+    HASH_COLUMN,
+    INFER_SAMPLE_SIZE,
+    LoadDriver,
+    LoadEngine,
+    LoadMode,
+    LoadReader,
+    SpatialIndex,
+    TransformMode,
+)
+from sherpa.files import file_fingerprint
+from sherpa.geometry import geojson_to_wkb, promote_to_multi, read_collection_srid, reproject_wkb, to_hex_ewkb
+from sherpa.pipeline import BatchPipeline
+from sherpa.pool import ConnectionPool, PoolError, get_pool
+from sherpa.schema import infer_schema
+from sherpa.stats import LoadStats, SyncCounts, profiled
 from sherpa.utils import format_highlight
 
+if TYPE_CHECKING:
+    from sherpa.psycopg_writer import PsycopgWriter
+
+
+# Keys deleted per statement by a sync
+DELETE_BATCH_SIZE = 10000
+
+# Key column types a sync compares keys as numbers, so a file's "007" or 7.0 matches the table's 7
+INTEGER_KEY_TYPES = {"smallint", "integer", "bigint"}
+NUMERIC_KEY_TYPES = {"numeric", "real", "double precision"}
+
 
 class PgClientError(Exception):
     """
@@ -27,112 +67,379 @@ class PgTable:
     schema: str
     table: str
     columns: list[str]
+    geometry_type: Optional[str] = None
+
+    @property
+    def multi_geometry(self) -> bool:
+        return self.geometry_type is not None and self.geometry_type.startswith("MULTI")
 
     @property
     def sql_composed_columns(self) -> Composed:
         return SQL(", ").join(Identifier(x) for x in self.columns)
 
+    @cached_property
+    def row_columns(self) -> list[str]:
+        """
+        Columns in the order generate_row_data yields their values, with the geometry last. Cached, as it's looked up
+        for every row loaded
+        """
+        return [x for x in self.columns if x != "geometry"] + ["geometry"]
+
+
+@dataclass
+class LoadOptions:
+    force_srid: Optional[int] = None
+    engine: LoadEngine = LoadEngine.COPY
+    batch_size: int = 10000
+    batch_bytes: Optional[int] = None
+    queue_size: int = 2
+    commit_every: Optional[int] = None
+    single_transaction: bool = False
+    async_commit: bool = False
+    transform: TransformMode = TransformMode.SERVER
+    time_stages: bool = False
+    profile_path: Optional[Path] = None
+    resume: bool = False
+    mode: LoadMode = LoadMode.APPEND
+    key: Optional[str] = None
+    driver: LoadDriver = LoadDriver.PSYCOPG2
+    reader: LoadReader = LoadReader.FIONA
+
+
+@dataclass
+class Checkpoint:
+    """
+    How far a load of features start to stop of a file has committed to a table
+    """
+
+    schema: str
+    table: str
+    fingerprint: str
+    start: int
+    stop: int
+    committed: int
+
+
+@dataclass
+class TableListing:
+    """
+    A table as sherpa table ls lists it. rows is the statistics collector's count of live rows and estimated_rows
+    the planner's estimate as of the last ANALYZE. size is in bytes, including indexes and TOAST, and extent is the
+    estimated (xmin, ymin, xmax, ymax) of its geometry column
+    """
+
+    schema: str
+    table: str
+    rows: int
+    estimated_rows: Optional[int]
+    size: int
+    geometry_column: Optional[str]
+    extent: Optional[tuple[float, float, float, float]] = None
+
+
+@dataclass
+class CatalogColumn:
+    """
+    A table column as pg_catalog describes it. data_type is only set for PostgreSQL's built in types, and
+    geometry_type, srid and dimensions for PostGIS columns. dimensions is the Z, M or ZM suffix of the column's type,
+    empty for a 2D column, or None if any are accepted. Generated columns are those the database fills in itself,
+    e.g. identity and serial keys. length is the limit of a varchar(n) or char(n) column, and precision and scale
+    those of a numeric(p,s) one
+    """
+
+    name: str
+    data_type: Optional[str]
+    geometry_type: Optional[str]
+    srid: Optional[int]
+    dimensions: Optional[str]
+    generated: bool
+    length: Optional[int] = None
+    precision: Optional[int] = None
+    scale: Optional[int] = None
+
+
+@dataclass
+class CatalogEntry:
+    """
+    A table's columns as last looked up, with the version of the table they were read from and when that was checked
+    """
+
+    version: Optional[str]
+    checked: float
+    columns: list[CatalogColumn]
+
 
 @dataclass
 class PgClient:
     conn: PgConnection
+    connection_details: dict[str, str]
+    pool: ConnectionPool
 
     def __init__(self, connection_details: dict[str, str]) -> None:
+        self.connection_details = connection_details
         try:
-            self.conn = connect(**connection_details)
+            self.pool = get_pool(connection_details)
+            self.conn = self.pool.getconn()
         except DatabaseError:
             raise PgClientError(f"Unable to connect to database {format_highlight(connection_details['dbname'])}")
+        except PoolError as ex:
+            raise PgClientError(escape(str(ex)))
+
+    def __enter__(self) -> "PgClient":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        # Commit if the block finished, otherwise the pool rolls the connection back as it's returned
+        if exc_type is None:
+            self.close()
+        else:
+            self.pool.putconn(self.conn)
 
     def close(self) -> None:
-        self.conn.commit()
-        self.conn.close()
+        """
+        Commit and return the connection to the pool, which keeps it open for the next client in this process
+        """
+        try:
+            self.conn.commit()
+        finally:
+            self.pool.putconn(self.conn)
 
-    def list_table_counts(self, schema: str = "public") -> Optional[list[tuple[Union[str, int], ...]]]:
+    def list_tables(self, schema: Optional[str] = "public", extent: bool = False) -> list[TableListing]:
+        """
+        List the tables in a schema, or in every schema if None, from the catalog and statistics collector without
+        reading any of their rows. Their geometry extents are only estimated if extent is set, as that needs PostGIS
+        """
+        extent_columns = SQL(
+            """
+            ST_XMin(extent.box),
+            ST_YMin(extent.box),
+            ST_XMax(extent.box),
+            ST_YMax(extent.box)
+            """
+            if extent
+            else "NULL, NULL, NULL, NULL"
+        )
+        # Estimated from the statistics ANALYZE gathers, so a table that hasn't been analyzed has no extent
+        extent_join = SQL(
+            """
+            LEFT JOIN LATERAL (
+                SELECT ST_EstimatedExtent(namespace.nspname, class.relname, geometry.attname) AS box
+            ) AS extent ON TRUE
+            """
+            if extent
+            else ""
+        )
         with self.conn.cursor() as cursor:
             cursor.execute(
-                """
-                SELECT
-                  schemaname,
-                  relname,
-                  n_live_tup
-                FROM pg_stat_user_tables
-                WHERE schemaname = %s
-                  AND relname <> 'spatial_ref_sys'
-                ORDER BY relname
-                """,
-                (schema,),
+                SQL(
+                    """
+                    SELECT
+                        namespace.nspname,
+                        class.relname,
+                        COALESCE(stats.n_live_tup, 0),
+                        -- Tables that have never been analyzed have no estimate
+                        CASE WHEN class.reltuples >= 0 THEN class.reltuples::bigint END,
+                        pg_total_relation_size(class.oid),
+                        geometry.attname,
+                        {extent_columns}
+                    FROM pg_class AS class
+                    JOIN pg_namespace AS namespace ON namespace.oid = class.relnamespace
+                    LEFT JOIN pg_stat_user_tables AS stats ON stats.relid = class.oid
+                    -- The column named geometry, as sherpa creates, or else the table's first geometry column
+                    LEFT JOIN LATERAL (
+                        SELECT attribute.attname
+                        FROM pg_attribute AS attribute
+                        WHERE attribute.attrelid = class.oid
+                          AND attribute.atttypid = to_regtype('geometry')
+                          AND attribute.attnum > 0
+                          AND NOT attribute.attisdropped
+                        ORDER BY attribute.attname <> 'geometry', attribute.attnum
+                        LIMIT 1
+                    ) AS geometry ON TRUE
+                    {extent_join}
+                    -- Partitioned tables hold no rows of their own, so only their partitions are listed
+                    WHERE class.relkind = 'r'
+                      AND class.relname <> 'spatial_ref_sys'
+                      AND namespace.nspname <> 'information_schema'
+                      AND namespace.nspname NOT LIKE 'pg\\_%%'
+                      AND (%(schema)s::text IS NULL OR namespace.nspname = %(schema)s)
+                    ORDER BY namespace.nspname, class.relname
+                    """
+                ).format(extent_columns=extent_columns, extent_join=extent_join),
+                {"schema": schema},
             )
             results = cursor.fetchall()
 
-        if len(results) == 0:
-            return None
-
-        return list(results)
+        return [
+            TableListing(
+                schema,
+                table,
+                rows,
+                estimated_rows,
+                size,
+                geometry_column,
+                None if xmin is None else (xmin, ymin, xmax, ymax),
+            )
+            for schema, table, rows, estimated_rows, size, geometry_column, xmin, ymin, xmax, ymax in results
+        ]
 
-    def get_insert_table_info(self, table: str, schema: str = "public") -> Optional[PgTable]:
+    def count_rows(self, schema: str, table: str, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Count a table's rows exactly, or return None if that takes longer than timeout seconds or the user can't read
+        the table
+        """
         with self.conn.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_schema = %s
-                  AND table_name = %s
-                  AND column_name <> %s
-                """,
-                (schema, table, "id"),
-            )
-            results = cursor.fetchall()
+            if timeout is not None:
+                cursor.execute("SET LOCAL statement_timeout = %s;", (max(round(timeout * 1000), 1),))
+            try:
+                cursor.execute(SQL("SELECT count(*) FROM {};").format(Identifier(schema, table)))
+                (count,) = cursor.fetchone()
+            except (QueryCanceled, InsufficientPrivilege):
+                count = None
+        # Ends the transaction, resetting the timeout and releasing the table's lock
+        self.conn.rollback()
 
-        if len(results) == 0:
-            return None
+        return None if count is None else int(count)
 
-        return PgTable(schema=schema, table=table, columns=[result for (result,) in results])
+    def get_columns(self, table: str, schema: str = "public") -> list[CatalogColumn]:
+        """
+        Look up a table's columns, or an empty list if it doesn't exist. Lookups are cached in the client's pool, so
+        one from the last CATALOG_TTL seconds is reused as is, and an older one once a cheap query shows the table
+        hasn't been recreated, rewritten or had its columns changed since
+        """
+        entry = self.pool.catalog.get((schema, table))
+        checked = monotonic()
+        if entry is not None and checked - entry.checked < CATALOG_TTL:
+            return entry.columns
 
-    def get_table_shape(self, table: str, schema: str = "public") -> Optional[list[tuple[Union[str, int], ...]]]:
         with self.conn.cursor() as cursor:
-            # NB: This can probably be optimised, 2 sub-queries is not ideal
+            relation = Identifier(schema, table).as_string(cursor)
+            # The table's oid and file change when it's recreated or rewritten, and its rows' xmin when it or any
+            # of its columns are altered
             cursor.execute(
                 """
-                SELECT
-                    info_schema.column_name,
-                    CASE
-                        WHEN info_schema.data_type = 'USER-DEFINED' THEN NULL
-                        ELSE info_schema.data_type
-                    END AS data_type,
+                SELECT concat_ws(
+                    ':',
+                    class.oid,
+                    class.relfilenode,
+                    class.xmin,
                     (
-                        SELECT geometry.type
-                        FROM geometry_columns AS geometry
-                        WHERE info_schema.table_schema = geometry.f_table_schema
-                            AND info_schema.table_name = geometry.f_table_name
-                            AND (info_schema.udt_name = 'geometry' OR info_schema.udt_name = 'geography')
-                    ) AS geometry_type,
-                    (
-                        SELECT geometry.srid
-                        FROM geometry_columns AS geometry
-                        WHERE info_schema.table_schema = geometry.f_table_schema
-                            AND info_schema.table_name = geometry.f_table_name
-                            AND (info_schema.udt_name = 'geometry' OR info_schema.udt_name = 'geography')
-                    ) AS srid
-                FROM information_schema.columns AS info_schema
-                WHERE info_schema.table_schema = %s
-                    AND info_schema.table_name = %s;
+                        SELECT string_agg(attribute.xmin::text, ',' ORDER BY attribute.attnum)
+                        FROM pg_attribute AS attribute
+                        WHERE attribute.attrelid = class.oid
+                          AND attribute.attnum > 0
+                    )
+                )
+                FROM pg_class AS class
+                WHERE class.oid = to_regclass(%s)
                 """,
-                (schema, table),
+                (relation,),
             )
-            results = cursor.fetchall()
+            result = cursor.fetchone()
+            version = None if result is None else result[0]
+
+            if entry is None or entry.version != version:
+                cursor.execute(
+                    """
+                    SELECT
+                        attribute.attname,
+                        -- Only built in types are named, as information_schema leaves the others USER-DEFINED
+                        CASE
+                            WHEN type.typnamespace = 'pg_catalog'::regnamespace THEN format_type(type.oid, NULL)
+                        END AS data_type,
+                        -- Typed as geometry_columns does, without the Z and M dimensions
+                        CASE
+                            WHEN type.typname IN ('geometry', 'geography') THEN
+                                replace(replace(upper(postgis_typmod_type(attribute.atttypmod)), 'ZM', ''), 'Z', '')
+                        END AS geometry_type,
+                        CASE
+                            WHEN type.typname IN ('geometry', 'geography') THEN
+                                postgis_typmod_srid(attribute.atttypmod)
+                        END AS srid,
+                        CASE
+                            WHEN type.typname IN ('geometry', 'geography') AND attribute.atttypmod >= 0 THEN
+                                COALESCE(
+                                    substring(upper(postgis_typmod_type(attribute.atttypmod)) FROM '(ZM|Z|M)$'), ''
+                                )
+                        END AS dimensions,
+                        attribute.attidentity <> ''
+                            OR attribute.attgenerated <> ''
+                            OR COALESCE(pg_get_expr(column_default.adbin, column_default.adrelid), '')
+                                LIKE 'nextval(%%' AS generated,
+                        -- Modifiers are stored offset by the 4 byte header of a varlena value
+                        CASE
+                            WHEN type.typname IN ('varchar', 'bpchar') AND attribute.atttypmod >= 0 THEN
+                                attribute.atttypmod - 4
+                        END AS length,
+                        CASE
+                            WHEN type.typname = 'numeric' AND attribute.atttypmod >= 0 THEN
+                                ((attribute.atttypmod - 4) >> 16) & 65535
+                        END AS precision,
+                        CASE
+                            WHEN type.typname = 'numeric' AND attribute.atttypmod >= 0 THEN
+                                (attribute.atttypmod - 4) & 65535
+                        END AS scale
+                    FROM pg_attribute AS attribute
+                    JOIN pg_type AS column_type ON column_type.oid = attribute.atttypid
+                    -- Columns of a domain are described by the type it's based on
+                    JOIN pg_type AS type ON type.oid = COALESCE(NULLIF(column_type.typbasetype, 0), column_type.oid)
+                    LEFT JOIN pg_attrdef AS column_default
+                        ON column_default.adrelid = attribute.attrelid
+                        AND column_default.adnum = attribute.attnum
+                    WHERE attribute.attrelid = to_regclass(%s)
+                      AND attribute.attnum > 0
+                      AND NOT attribute.attisdropped
+                    ORDER BY attribute.attnum
+                    """,
+                    (relation,),
+                )
+                entry = CatalogEntry(version, checked, [CatalogColumn(*x) for x in cursor.fetchall()])
+
+        entry.checked = checked
+        self.pool.catalog[(schema, table)] = entry
+        return entry.columns
+
+    def forget_columns(self, schema: str, *tables: str) -> None:
+        # Tables this client changes are looked up again, rather than reusing their columns until CATALOG_TTL passes
+        for table in tables:
+            self.pool.catalog.pop((schema, table), None)
 
-        if len(results) == 0:
+    def get_insert_table_info(self, table: str, schema: str = "public") -> Optional[PgTable]:
+        # Skip columns the database fills in itself
+        columns = [x for x in self.get_columns(table, schema) if not x.generated]
+        if len(columns) == 0:
             return None
 
-        return list(results)
+        return PgTable(
+            schema=schema,
+            table=table,
+            columns=[x.name for x in columns],
+            geometry_type=next((x.geometry_type for x in columns if x.name == "geometry"), None),
+        )
+
+    def get_table_shape(
+        self, table: str, schema: str = "public"
+    ) -> Optional[list[tuple[str, Optional[str], Optional[str], Optional[int]]]]:
+        columns = self.get_columns(table, schema)
+        if len(columns) == 0:
+            return None
+
+        return [(x.name, x.data_type, x.geometry_type, x.srid) for x in columns]
 
     def schema_exists(self, schema: str) -> bool:
         with self.conn.cursor() as cursor:
+            # Schemas the user can't use are left out, as information_schema.schemata does
             cursor.execute(
                 """
-                SELECT schema_name
-                FROM information_schema.schemata
-                WHERE schema_name = %s
+                SELECT 1
+                FROM pg_namespace
+                WHERE nspname = %s
+                  AND has_schema_privilege(oid, 'CREATE, USAGE')
                 """,
                 (schema,),
             )
@@ -142,85 +449,947 @@ class PgClient:
 
     def load(
         self,
-        file: Path,
+        file: Union[Path, str],
         table_structure: PgTable,
-        force_srid: Optional[int] = None,
-        batch_size: int = 10000,
+        options: Optional[LoadOptions] = None,
+        start: int = 0,
+        stop: Optional[int] = None,
+        on_batch: Optional[Callable[[int], None]] = None,
+        stats: Optional[LoadStats] = None,
     ) -> int:
-        with fiona.open(file, mode="r") as collection:
-            rows = list(generate_row_data(collection, table_structure, force_srid))
+        """
+        Load features start to stop of a file, reporting progress to on_batch if given or a progress bar if not.
+        Features are decoded on a reader thread while batches are written, with waits on either side recorded in stats
+        """
+        options = options or LoadOptions()
+        stats = stats if stats is not None else LoadStats()
+        # Batches are always timed, but timing every feature costs enough to only do it when asked to
+        feature_stats = stats if options.time_stages else None
+        started = perf_counter()
+        with fiona.open(file, mode="r") as collection, ExitStack() as stack:
+            reader_profiler = None
+            if options.profile_path is not None:
+                reader_profiler = Profile()
+                stack.enter_context(profiled(options.profile_path, reader_profiler))
+
+            stop = len(collection) if stop is None else min(stop, len(collection))
+            if on_batch is None:
+                progress = stack.enter_context(Progress())
+                load_task = progress.add_task("[cyan]Loading...[/cyan]", total=stop - start)
+                on_batch = partial(advance_progress, progress, load_task)
+
+            checkpoint = None
+            if options.resume:
+                checkpoint = self.start_checkpoint(table_structure, file_fingerprint(file), start, stop)
+                if checkpoint.committed > start:
+                    # Skip the features an interrupted load already committed
+                    on_batch(checkpoint.committed - start)
+                    start = checkpoint.committed
+
+            rows: Iterable[tuple[Any, ...]]
+            if options.reader is LoadReader.ARROW:
+                # Imported here as pyogrio and pyarrow are only needed for the Arrow reader
+                from sherpa.arrow_reader import generate_arrow_row_data
+
+                file_srid = load_collection_srid(collection)
+                rows = generate_arrow_row_data(
+                    file, table_structure, file_srid, start, stop, options.batch_size, feature_stats
+                )
+            else:
+                rows = generate_row_data(collection, table_structure, start=start, stop=stop, stats=feature_stats)
+            existing = None
+            if options.mode is LoadMode.SYNC:
+                assert options.key is not None
+                stats.sync = stats.sync or SyncCounts()
+                # Unchanged rows are dropped on the reader thread, so only new and changed rows are sent
+                key_type = next(
+                    (
+                        x.data_type
+                        for x in self.get_columns(table_structure.table, table_structure.schema)
+                        if x.name == options.key
+                    ),
+                    None,
+                )
+                existing = self.get_row_hashes(table_structure, options.key, key_type)
+                rows = filter_changed_rows(rows, table_structure, options.key, existing, stats.sync, on_batch, key_type)
+            batches = generate_batches(rows, options.batch_size, options.batch_bytes)
+            staging_table = None
+            transform_srid = None
+            if options.force_srid is not None:
+                if options.transform is TransformMode.CLIENT:
+                    # Reprojected on the reader thread, so it overlaps with writing the previous batch
+                    batches = reproject_batches(batches, table_structure, options.force_srid, stats)
+                else:
+                    transform_srid = options.force_srid
+
+            upsert_key = options.key if options.mode in (LoadMode.UPSERT, LoadMode.SYNC) else None
+            if transform_srid is not None or upsert_key is not None:
+                staging_table = self.create_staging_table(table_structure)
+
+            writer: Optional["PsycopgWriter"] = None
+            if options.driver is LoadDriver.PSYCOPG:
+                # Imported here as psycopg is only needed for its driver
+                from sherpa.psycopg_writer import PsycopgWriter
+
+                writer = stack.enter_context(PsycopgWriter(self.pool, table_structure, options.engine))
+
             inserted = 0
-            with Progress() as progress:
-                load_task = progress.add_task("[cyan]Loading...[/cyan]", total=len(collection))
-                while not progress.finished:
-                    # NB: If this gets to be a problem with large files, go back to using an iterator (islice)
-                    batch = rows[inserted : batch_size + inserted]
-                    if batch:
-                        insert_cursor = self.conn.cursor()
-                        args_list = [
-                            generate_sql_insert_row(table_structure, x, insert_cursor, force_srid) for x in batch
-                        ]
-                        statement = SQL(
-                            """
-                            INSERT INTO {}({})
-                            VALUES {}
-                            RETURNING id;
-                            """
-                        ).format(
-                            Identifier(table_structure.schema, table_structure.table),
-                            table_structure.sql_composed_columns,
-                            SQL(",").join(args_list),
-                        )
-                        insert_cursor.execute(statement)
-                        inserted += len(insert_cursor.fetchall())
-                        self.conn.commit()
-                        progress.update(load_task, advance=len(batch))
+            uncommitted = 0
+            try:
+                with BatchPipeline(batches, options.queue_size, stats, reader_profiler) as pipeline:
+                    for batch in pipeline:
+                        if uncommitted == 0 and options.async_commit:
+                            (writer or self).disable_synchronous_commit()
+
+                        if writer is not None:
+                            inserted += writer.write(batch, stats)
+                        else:
+                            inserted += self.write_rows(
+                                batch, table_structure, options.engine, staging_table, transform_srid, stats, upsert_key
+                            )
+
+                        uncommitted += len(batch)
+                        if checkpoint is not None:
+                            checkpoint.committed += len(batch)
+                        # Without a commit interval every batch is committed
+                        if not options.single_transaction and uncommitted >= (options.commit_every or 0):
+                            self.commit(stats, checkpoint, writer)
+                            uncommitted = 0
+                        on_batch(len(batch))
 
+                if existing is not None and upsert_key is not None and stats.sync is not None:
+                    # Rows whose keys weren't in the file have been deleted from it
+                    stats.sync.deleted += self.delete_rows(
+                        table_structure, upsert_key, [x for x, _ in existing.values()]
+                    )
+                self.commit(stats, checkpoint, writer)
+            except BaseException:
+                # Don't leave a partial batch (or with --single-transaction, anything) for close() to commit
+                self.conn.rollback()
+                raise
+
+            stats.rows += inserted
+            stats.seconds += perf_counter() - started
             return inserted
 
-    def create_table(self, file: Path, schema: str, table_name: str) -> str:
+    def commit(
+        self,
+        stats: Optional[LoadStats] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        writer: Optional["PsycopgWriter"] = None,
+    ) -> None:
+        """
+        Commit, saving the checkpoint if given in the same transaction so it always matches the rows committed, and
+        committing the writer's connection too if rows were written with one
+        """
+        started = perf_counter()
+        if checkpoint is not None:
+            self.save_checkpoint(checkpoint)
+        if writer is not None:
+            writer.commit()
+        self.conn.commit()
+        if stats is not None:
+            stats.add_stage("commit", perf_counter() - started)
+
+    def get_row_hashes(
+        self, table_structure: PgTable, key: str, key_type: Optional[str] = None
+    ) -> dict[Any, tuple[Any, Optional[bytes]]]:
+        """
+        Map each key in a table, normalised by normalize_key, to the key and the row's hash, streaming them from a
+        server side cursor
+        """
+        with self.conn.cursor(name="sherpa_row_hashes") as cursor:
+            cursor.itersize = 10000
+            cursor.execute(
+                SQL("SELECT {}, {} FROM {};").format(
+                    Identifier(key),
+                    Identifier(HASH_COLUMN),
+                    Identifier(table_structure.schema, table_structure.table),
+                )
+            )
+            return {
+                normalize_key(x, key_type): (x, None if row_hash is None else bytes(row_hash))
+                for x, row_hash in cursor
+                if x is not None
+            }
+
+    def delete_rows(self, table_structure: PgTable, key: str, values: list[Any]) -> int:
+        deleted = 0
+        with self.conn.cursor() as cursor:
+            for i in range(0, len(values), DELETE_BATCH_SIZE):
+                cursor.execute(
+                    SQL("DELETE FROM {} WHERE {} = ANY(%s);").format(
+                        Identifier(table_structure.schema, table_structure.table), Identifier(key)
+                    ),
+                    (values[i : i + DELETE_BATCH_SIZE],),
+                )
+                deleted += int(cursor.rowcount)
+
+        return deleted
+
+    def create_checkpoint_table(self, schema: str) -> None:
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                SQL(
+                    """
+                    CREATE TABLE IF NOT EXISTS {} (
+                        fingerprint TEXT NOT NULL,
+                        table_name TEXT NOT NULL,
+                        start_offset BIGINT NOT NULL,
+                        stop_offset BIGINT NOT NULL,
+                        committed_offset BIGINT NOT NULL,
+                        updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                        PRIMARY KEY (fingerprint, table_name, start_offset)
+                    );
+                    """
+                ).format(Identifier(schema, CHECKPOINT_TABLE))
+            )
+        self.conn.commit()
+
+    def get_checkpoints(self, schema: str, table: str, fingerprint: Optional[str] = None) -> list[Checkpoint]:
+        """
+        Find the checkpoints of loads to a table, of a file if its fingerprint is given, in the order of their ranges
+        """
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s);", (Identifier(schema, CHECKPOINT_TABLE).as_string(cursor),))
+            if cursor.fetchone()[0] is None:
+                return []
+
+            cursor.execute(
+                SQL(
+                    """
+                    SELECT fingerprint, start_offset, stop_offset, committed_offset
+                    FROM {}
+                    WHERE table_name = %s
+                      AND {}
+                    ORDER BY fingerprint, start_offset;
+                    """
+                ).format(
+                    Identifier(schema, CHECKPOINT_TABLE),
+                    SQL("TRUE") if fingerprint is None else SQL("fingerprint = {}").format(Literal(fingerprint)),
+                ),
+                (table,),
+            )
+            results = cursor.fetchall()
+
+        return [Checkpoint(schema, table, *x) for x in results]
+
+    def start_checkpoint(self, table_structure: PgTable, fingerprint: str, start: int, stop: int) -> Checkpoint:
+        """
+        Record that a load of features start to stop of a file has started, or if an earlier load of the same
+        features was interrupted, return its checkpoint to continue from
+        """
+        self.create_checkpoint_table(table_structure.schema)
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                SQL(
+                    """
+                    INSERT INTO {checkpoints}(fingerprint, table_name, start_offset, stop_offset, committed_offset)
+                    VALUES (%(fingerprint)s, %(table)s, %(start)s, %(stop)s, %(start)s)
+                    ON CONFLICT (fingerprint, table_name, start_offset) DO NOTHING;
+
+                    SELECT committed_offset
+                    FROM {checkpoints}
+                    WHERE fingerprint = %(fingerprint)s
+                      AND table_name = %(table)s
+                      AND start_offset = %(start)s;
+                    """
+                ).format(checkpoints=Identifier(table_structure.schema, CHECKPOINT_TABLE)),
+                {"fingerprint": fingerprint, "table": table_structure.table, "start": start, "stop": stop},
+            )
+            (committed,) = cursor.fetchone()
+        self.conn.commit()
+
+        return Checkpoint(table_structure.schema, table_structure.table, fingerprint, start, stop, committed)
+
+    def save_checkpoint(self, checkpoint: Checkpoint) -> None:
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                SQL(
+                    """
+                    UPDATE {}
+                    SET committed_offset = %s, updated_at = now()
+                    WHERE fingerprint = %s
+                      AND table_name = %s
+                      AND start_offset = %s;
+                    """
+                ).format(Identifier(checkpoint.schema, CHECKPOINT_TABLE)),
+                (checkpoint.committed, checkpoint.fingerprint, checkpoint.table, checkpoint.start),
+            )
+
+    def clear_checkpoints(self, schema: str, table: str, fingerprint: str) -> None:
+        if not self.get_checkpoints(schema, table, fingerprint):
+            return
+
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                SQL("DELETE FROM {} WHERE fingerprint = %s AND table_name = %s;").format(
+                    Identifier(schema, CHECKPOINT_TABLE)
+                ),
+                (fingerprint, table),
+            )
+        self.conn.commit()
+
+    def disable_synchronous_commit(self) -> None:
+        """
+        Let commits in the current transaction return before their WAL is flushed to disk. A crash can lose the
+        most recent commits, but never corrupts the table
+        """
+        with self.conn.cursor() as cursor:
+            cursor.execute("SET LOCAL synchronous_commit = off;")
+
+    def write_rows(
+        self,
+        rows: list[tuple[Any, ...]],
+        table_structure: PgTable,
+        engine: LoadEngine,
+        staging_table: Optional[PgTable] = None,
+        force_srid: Optional[int] = None,
+        stats: Optional[LoadStats] = None,
+        upsert_key: Optional[str] = None,
+    ) -> int:
+        """
+        Write rows to a table, or if a staging table is given, write them there and transform or upsert them into the
+        table. Bytes sent and time spent building and executing statements are added to stats if given
+        """
+        target_table = staging_table or table_structure
+        if engine is LoadEngine.COPY:
+            written = self.copy_rows(rows, target_table, stats)
+        else:
+            written = self.insert_rows(rows, target_table, stats=stats)
+
+        if staging_table is None:
+            return written
+
+        started = perf_counter()
+        inserted = self.insert_staged_rows(staging_table, table_structure, force_srid, upsert_key)
+        if stats is not None:
+            stats.add_stage("execute", perf_counter() - started)
+
+        return inserted
+
+    def insert_rows(
+        self,
+        rows: list[tuple[Any, ...]],
+        table_structure: PgTable,
+        force_srid: Optional[int] = None,
+        stats: Optional[LoadStats] = None,
+    ) -> int:
+        with self.conn.cursor() as cursor:
+            started = perf_counter()
+            transforms = ",".join(generate_sql_transforms(table_structure, force_srid))
+            args_list = [generate_sql_insert_row(transforms, x, cursor) for x in rows]
+            statement = SQL(
+                """
+                INSERT INTO {}({})
+                VALUES {};
+                """
+            ).format(
+                Identifier(table_structure.schema, table_structure.table),
+                SQL(", ").join(Identifier(x) for x in table_structure.row_columns),
+                SQL(",").join(args_list),
+            )
+            built = perf_counter()
+            cursor.execute(statement)
+            if stats is not None:
+                stats.bytes_sent += len(cursor.query)
+                stats.add_stage("sql build", built - started)
+                stats.add_stage("execute", perf_counter() - built)
+
+            return int(cursor.rowcount)
+
+    def copy_rows(
+        self, rows: Iterable[tuple[Any, ...]], table_structure: PgTable, stats: Optional[LoadStats] = None
+    ) -> int:
+        buffer = CopyBuffer(rows, table_structure)
+        with self.conn.cursor() as cursor:
+            started = perf_counter()
+            cursor.copy_expert(generate_sql_copy(table_structure), buffer)
+            if stats is not None:
+                # Rows are formatted as copy_expert reads them, so separate that from the time spent sending them
+                stats.bytes_sent += buffer.bytes_read
+                stats.add_stage("sql build", buffer.format_seconds)
+                stats.add_stage("execute", perf_counter() - started - buffer.format_seconds)
+
+            return int(cursor.rowcount)
+
+    def insert_staged_rows(
+        self,
+        staging_table: PgTable,
+        table_structure: PgTable,
+        force_srid: Optional[int] = None,
+        upsert_key: Optional[str] = None,
+    ) -> int:
+        """
+        Move rows from a staging table to the table in one statement, transforming their geometries to force_srid if
+        given. With an upsert key, rows update those with the same key instead of conflicting, the last of any
+        duplicates in the batch winning, and rows identical to those in the table are left untouched
+        """
+        distinct = SQL("")
+        order = SQL("")
+        conflict = SQL("")
+        if upsert_key is not None:
+            # A batch is copied in order, so the last row with a key is the one with the highest ctid
+            distinct = SQL("DISTINCT ON ({})").format(Identifier(upsert_key))
+            order = SQL("ORDER BY {}, ctid DESC").format(Identifier(upsert_key))
+            conflict = generate_sql_upsert(table_structure, upsert_key)
+
+        with self.conn.cursor() as cursor:
+            if upsert_key is not None:
+                # DISTINCT ON would merge rows without a key, and ON CONFLICT never matches them, so they'd be lost
+                cursor.execute(
+                    SQL("SELECT count(*) FROM {} WHERE {} IS NULL;").format(
+                        Identifier(staging_table.schema, staging_table.table), Identifier(upsert_key)
+                    )
+                )
+                (missing,) = cursor.fetchone()
+                if missing:
+                    raise PgClientError(
+                        f"{missing} features have no {format_highlight(upsert_key)}, the key rows are upserted on"
+                    )
+
+            cursor.execute(
+                SQL(
+                    """
+                    INSERT INTO {} AS target({})
+                    SELECT {} {}
+                    FROM {}
+                    {}
+                    {};
+                    """
+                ).format(
+                    Identifier(table_structure.schema, table_structure.table),
+                    SQL(", ").join(Identifier(x) for x in table_structure.row_columns),
+                    distinct,
+                    SQL(", ").join(
+                        SQL("ST_Transform({}, {})").format(Identifier(x), Literal(force_srid))
+                        if x == "geometry" and force_srid is not None
+                        else Identifier(x)
+                        for x in staging_table.row_columns
+                    ),
+                    Identifier(staging_table.schema, staging_table.table),
+                    order,
+                    conflict,
+                )
+            )
+            inserted = int(cursor.rowcount)
+            cursor.execute(SQL("TRUNCATE {};").format(Identifier(staging_table.schema, staging_table.table)))
+
+        return inserted
+
+    def create_staging_table(self, table_structure: PgTable) -> PgTable:
+        """
+        Create an untyped temporary copy of a table's load columns to stage rows in before transforming them
+        """
+        staging_table = PgTable(schema="pg_temp", table="sherpa_staging", columns=table_structure.row_columns)
+        select_columns = [
+            SQL("NULL::GEOMETRY AS geometry") if x == "geometry" else Identifier(x) for x in staging_table.row_columns
+        ]
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                SQL(
+                    """
+                    DROP TABLE IF EXISTS {staging};
+                    CREATE TEMPORARY TABLE {staging} AS
+                    SELECT {columns}
+                    FROM {table}
+                    WITH NO DATA;
+                    """
+                ).format(
+                    staging=Identifier(staging_table.schema, staging_table.table),
+                    columns=SQL(", ").join(select_columns),
+                    table=Identifier(table_structure.schema, table_structure.table),
+                )
+            )
+
+        return staging_table
+
+    def create_table(
+        self,
+        file: Union[Path, str],
+        schema: str,
+        table_name: str,
+        staging: bool = False,
+        force_srid: Optional[int] = None,
+        sample_size: Optional[int] = INFER_SAMPLE_SIZE,
+        hash_column: bool = False,
+    ) -> str:
+        """
+        Create a table from a file's schema, narrowing its column and geometry types by sampling sample_size features
+        or the whole file if None. A staging table is UNLOGGED and has no primary key, so it can be bulk loaded
+        quickly before finish_staged_load makes it durable and moves it into place. A hash column lets later loads
+        find the features that have changed. Raises PgClientError if the file's CRS can't be read
+        """
         with fiona.open(file, mode="r") as collection:
-            file_schema = collection.schema["properties"]
+            try:
+                inferred = infer_schema(collection, sample_size)
+            except CRSError as ex:
+                # Raised rather than exiting, like load_collection_srid
+                raise PgClientError(escape(str(ex)))
 
-        columns = list(file_schema.items())
-        fields = [SQL("{} {}").format(Identifier(col[0]), SQL(DATA_TYPE_MAP[col[1]])) for col in columns]
+        if force_srid is not None:
+            inferred.srid = force_srid
+
+        fields = [SQL("{} {}").format(Identifier(name), SQL(data_type)) for name, data_type in inferred.columns]
+        if hash_column:
+            fields.append(SQL("{} BYTEA").format(Identifier(HASH_COLUMN)))
         q = SQL(
             """
-            CREATE TABLE {} (
-                id BIGINT PRIMARY KEY GENERATED ALWAYS AS IDENTITY,
-                {},
-                geometry GEOMETRY
+            CREATE {}TABLE {} (
+                id BIGINT {}GENERATED ALWAYS AS IDENTITY,
+                {}
+                geometry {}
             );
             """,
-        ).format(Identifier(schema, table_name), SQL(",").join(fields))
+        ).format(
+            SQL("UNLOGGED " if staging else ""),
+            Identifier(schema, table_name),
+            SQL("" if staging else "PRIMARY KEY "),
+            SQL("").join(SQL("{},").format(x) for x in fields),
+            SQL(inferred.geometry_column_type),
+        )
 
         with self.conn.cursor() as cursor:
             cursor.execute(q)
             self.conn.commit()
+        self.forget_columns(schema, table_name)
 
         return table_name
 
+    def drop_table(self, schema: str, table_name: str) -> None:
+        with self.conn.cursor() as cursor:
+            cursor.execute(SQL("DROP TABLE IF EXISTS {};").format(Identifier(schema, table_name)))
+            self.conn.commit()
+        self.forget_columns(schema, table_name)
+
+    def has_unique_index(self, schema: str, table_name: str, column: str) -> bool:
+        """
+        Check a column has a unique index of its own, which ON CONFLICT needs to upsert on it
+        """
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT 1
+                FROM pg_index AS index
+                JOIN pg_attribute AS attribute
+                    ON attribute.attrelid = index.indrelid
+                    AND attribute.attnum = index.indkey[0]
+                WHERE index.indrelid = %s::regclass
+                  AND index.indisunique
+                  AND index.indnkeyatts = 1
+                  AND index.indpred IS NULL
+                  AND attribute.attname = %s
+                """,
+                (Identifier(schema, table_name).as_string(cursor), column),
+            )
+            results = cursor.fetchone()
+
+        return True if results else False
+
+    def create_replacement_table(self, schema: str, table_name: str, replacement_table: str) -> None:
+        """
+        Create an empty copy of a table, with its defaults, constraints and indexes, to load rows to before
+        swap_table replaces the table with it
+        """
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                SQL(
+                    """
+                    DROP TABLE IF EXISTS {replacement};
+                    CREATE TABLE {replacement} (LIKE {table} INCLUDING ALL);
+                    """
+                ).format(replacement=Identifier(schema, replacement_table), table=Identifier(schema, table_name))
+            )
+            self.conn.commit()
+        self.forget_columns(schema, replacement_table)
+
+    def swap_table(self, schema: str, replacement_table: str, table_name: str) -> None:
+        """
+        Drop a table and rename its replacement in its place in one transaction, so readers see either the old rows
+        or the new ones. Sequences and index names follow the table
+        """
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                """
+                -- Serial columns copied by LIKE still use the table's sequences, which would be dropped with it
+                SELECT sequence.relname, attribute.attname
+                FROM pg_depend AS depend
+                JOIN pg_class AS sequence
+                    ON sequence.oid = depend.objid
+                    AND sequence.relkind = 'S'
+                JOIN pg_attribute AS attribute
+                    ON attribute.attrelid = depend.refobjid
+                    AND attribute.attnum = depend.refobjsubid
+                WHERE depend.refobjid = %s::regclass
+                  AND depend.deptype = 'a';
+                """,
+                (Identifier(schema, table_name).as_string(cursor),),
+            )
+            sequences = cursor.fetchall()
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes WHERE schemaname = %s AND tablename = %s;",
+                (schema, replacement_table),
+            )
+            indexes = [x for (x,) in cursor.fetchall()]
+
+            statements = [
+                SQL("ALTER SEQUENCE {} OWNED BY {};").format(
+                    Identifier(schema, sequence), Identifier(schema, replacement_table, column)
+                )
+                for sequence, column in sequences
+            ]
+            statements.append(SQL("DROP TABLE {};").format(Identifier(schema, table_name)))
+            statements.append(
+                SQL("ALTER TABLE {} RENAME TO {};").format(
+                    Identifier(schema, replacement_table), Identifier(table_name)
+                )
+            )
+            # LIKE names indexes after the replacement table, so give them back the names the table's had
+            statements.extend(
+                SQL("ALTER INDEX {} RENAME TO {};").format(
+                    Identifier(schema, index), Identifier(index.replace(replacement_table, table_name, 1))
+                )
+                for index in indexes
+                if index.startswith(replacement_table)
+            )
+            statements.append(SQL("ANALYZE {};").format(Identifier(schema, table_name)))
+
+            cursor.execute(SQL("\n").join(statements))
+            self.conn.commit()
+        self.forget_columns(schema, replacement_table, table_name)
+
+    def finish_staged_load(
+        self,
+        schema: str,
+        staging_table: str,
+        table_name: str,
+        index: SpatialIndex = SpatialIndex.GIST,
+        cluster: bool = False,
+        maintenance_work_mem: Optional[int] = None,
+    ) -> None:
+        """
+        Log, index and analyze a loaded staging table, then rename it to table_name in the same transaction so the
+        table appears complete or not at all
+        """
+        with self.conn.cursor() as cursor:
+            if maintenance_work_mem is not None:
+                set_maintenance_work_mem(cursor, maintenance_work_mem)
+
+            cursor.execute(
+                SQL(
+                    """
+                    ALTER TABLE {staging} SET LOGGED;
+                    ALTER TABLE {staging} ADD CONSTRAINT {primary_key} PRIMARY KEY (id);
+                    {index}
+                    ALTER TABLE {staging} RENAME TO {table};
+                    """
+                ).format(
+                    staging=Identifier(schema, staging_table),
+                    primary_key=Identifier(identifier_with_suffix(table_name, "_pkey")),
+                    index=generate_sql_spatial_index(schema, staging_table, table_name, index, cluster),
+                    table=Identifier(table_name),
+                )
+            )
+            self.conn.commit()
+        self.forget_columns(schema, staging_table, table_name)
+
+    def index_table(
+        self,
+        schema: str,
+        table_name: str,
+        index: SpatialIndex = SpatialIndex.GIST,
+        cluster: bool = False,
+        maintenance_work_mem: Optional[int] = None,
+    ) -> None:
+        """
+        Build a spatial index on a loaded table's geometry, optionally cluster the table on it, and analyze it
+        """
+        with self.conn.cursor() as cursor:
+            if maintenance_work_mem is not None:
+                set_maintenance_work_mem(cursor, maintenance_work_mem)
+
+            cursor.execute(generate_sql_spatial_index(schema, table_name, table_name, index, cluster))
+            self.conn.commit()
+
+
+def count_rows(connection_details: dict[str, str], schema: str, table: str, timeout: Optional[float]) -> Optional[int]:
+    with PgClient(connection_details) as client:
+        return client.count_rows(schema, table, timeout)
+
+
+def count_rows_concurrently(
+    connection_details: dict[str, str],
+    tables: list[tuple[str, str]],
+    workers: int,
+    timeout: Optional[float] = None,
+    on_count: Optional[Callable[[], None]] = None,
+) -> list[Optional[int]]:
+    """
+    Count the rows of each (schema, table) exactly across workers connections, None for those that took longer than
+    timeout seconds. The database does the counting, so threads sharing this process's pool keep as many busy as
+    worker processes would
+    """
+    with ThreadPoolExecutor(max_workers=max(min(workers, len(tables)), 1)) as executor:
+        futures = [executor.submit(count_rows, connection_details, schema, table, timeout) for schema, table in tables]
+        for future in as_completed(futures):
+            future.result()
+            if on_count is not None:
+                on_count()
+
+    return [x.result() for x in futures]
+
+
+def set_maintenance_work_mem(cursor: PgCursor, size: int) -> None:
+    # Index builds and CLUSTER sort in memory up to this limit, so raising it for the transaction speeds them up
+    cursor.execute(SQL("SET LOCAL maintenance_work_mem = {};").format(Literal(f"{max(size // 1024, 1024)}kB")))
+
+
+def generate_sql_spatial_index(
+    schema: str, table_name: str, index_table_name: str, index: SpatialIndex, cluster: bool
+) -> Composed:
+    """
+    Index, cluster and analyze table_name, naming the index after index_table_name, which it's to be renamed to
+    """
+    index_name = identifier_with_suffix(index_table_name, "_geometry_idx")
+    statements = []
+    if index is not SpatialIndex.NONE:
+        statements.append(
+            SQL("CREATE INDEX {} ON {} USING {} (geometry);").format(
+                Identifier(index_name), Identifier(schema, table_name), SQL(index.value)
+            )
+        )
+        if cluster:
+            statements.append(
+                SQL("CLUSTER {} USING {};").format(Identifier(schema, table_name), Identifier(index_name))
+            )
+
+    statements.append(SQL("ANALYZE {};").format(Identifier(schema, table_name)))
+    return SQL("\n").join(statements)
+
+
+def generate_sql_upsert(table_info: PgTable, key: str) -> Composed:
+    """
+    Update the row with a conflicting key from the excluded row, unless every column already matches
+    """
+    columns = [x for x in table_info.row_columns if x != key]
+    if not columns:
+        return SQL("ON CONFLICT ({}) DO NOTHING").format(Identifier(key))
+
+    return SQL("ON CONFLICT ({key}) DO UPDATE SET {updates} WHERE ({current}) IS DISTINCT FROM ({excluded})").format(
+        key=Identifier(key),
+        updates=SQL(", ").join(SQL("{0} = EXCLUDED.{0}").format(Identifier(x)) for x in columns),
+        current=SQL(", ").join(SQL("target.{}").format(Identifier(x)) for x in columns),
+        excluded=SQL(", ").join(SQL("EXCLUDED.{}").format(Identifier(x)) for x in columns),
+    )
+
+
+def identifier_with_suffix(name: str, suffix: str) -> str:
+    # PostgreSQL truncates identifiers to 63 bytes, so trim the name rather than losing the suffix
+    return name.encode("utf-8")[: 63 - len(suffix.encode("utf-8"))].decode("utf-8", "ignore") + suffix
+
+
+def load_collection_srid(collection: Collection) -> int:
+    # Raised rather than exiting, so a multi file load records the file as failed and loads the rest
+    try:
+        return read_collection_srid(collection)
+    except CRSError as ex:
+        raise PgClientError(escape(str(ex)))
+
 
 def generate_row_data(
-    collection: Collection, table_info: PgTable, force_srid: Optional[int] = None
+    collection: Collection,
+    table_info: PgTable,
+    force_srid: Optional[int] = None,
+    start: int = 0,
+    stop: Optional[int] = None,
+    stats: Optional[LoadStats] = None,
 ) -> Generator[tuple[Any, ...], None, None]:
-    file_srid = get_collection_srid(collection)
+    """
+    Yield each feature as a row of property values followed by its WKB geometry and SRIDs. If the table has a hash
+    column it's filled with a hash of the rest of the row. Given stats, the time spent reading, encoding and
+    building each row is added to its stages
+    """
+    file_srid = load_collection_srid(collection)
+    features = collection if start == 0 and stop is None else collection.filter(start, stop)
+    multi_geometry = table_info.multi_geometry
+    property_columns = table_info.row_columns[:-1]
+    hash_index = property_columns.index(HASH_COLUMN) if HASH_COLUMN in property_columns else None
+    if stats is not None:
+        features = time_iteration(features, stats, "read")
+
+    for feature in features:
+        if stats is not None:
+            started = perf_counter()
 
-    for feature in collection:
         properties = feature["properties"]
-        geometry_obj = shape(feature["geometry"])
+        geometry = feature["geometry"]
+        if multi_geometry:
+            geometry = promote_to_multi(geometry)
+        wkb = geojson_to_wkb(geometry)
+
+        if stats is not None:
+            encoded = perf_counter()
+            stats.add_stage("encode", encoded - started)
 
+        geometry_attributes: tuple[Any, ...]
         if force_srid is not None:
-            geometry_attributes = (geometry_obj.wkb, file_srid, force_srid)
+            geometry_attributes = (wkb, file_srid, force_srid)
+        else:
+            geometry_attributes = (wkb, file_srid)
+
+        if hash_index is None:
+            row_data = tuple(properties[col] for col in property_columns) + geometry_attributes
+        else:
+            values = [None if col == HASH_COLUMN else properties[col] for col in property_columns]
+            values[hash_index] = hash_row(values, geometry_attributes)
+            row_data = (*values, *geometry_attributes)
+        if stats is not None:
+            stats.add_stage("row build", perf_counter() - encoded)
+
+        yield row_data
+
+
+def hash_row(values: list[Any], geometry_attributes: tuple[Any, ...]) -> bytes:
+    """
+    Hash a row's property values, WKB and SRIDs. Values are hashed as JSON, which is stable for anything fiona reads
+    """
+    digest = blake2b(json.dumps(values, default=str).encode("utf-8"), digest_size=16)
+    wkb, *srids = geometry_attributes
+    digest.update(wkb or b"")
+    digest.update(json.dumps(srids).encode("utf-8"))
+    return digest.digest()
+
+
+def normalize_key(value: Any, key_type: Optional[str]) -> Any:
+    """
+    Convert a key to the value the database stores it as in a column of key_type, so keys read from a file match
+    the table's however the file wrote them. Keys that can't be converted, and those of other types, compare as text
+    """
+    try:
+        if key_type in INTEGER_KEY_TYPES:
+            number = Decimal(str(value).strip())
+            if number == number.to_integral_value():
+                return int(number)
+        elif key_type in NUMERIC_KEY_TYPES:
+            return Decimal(str(value).strip())
+        elif key_type == "uuid":
+            return UUID(str(value))
+    except (ArithmeticError, ValueError):
+        pass
+
+    return str(value)
+
+
+def filter_changed_rows(
+    rows: Iterable[tuple[Any, ...]],
+    table_info: PgTable,
+    key: str,
+    existing: dict[Any, tuple[Any, Optional[bytes]]],
+    counts: SyncCounts,
+    on_skip: Callable[[int], None],
+    key_type: Optional[str] = None,
+) -> Generator[tuple[Any, ...], None, None]:
+    """
+    Yield the rows that are new or have a different hash to the row with the same key in existing, which maps keys
+    normalised for a key_type column to the table's key value and hash. Keys are removed from existing as they're
+    seen, leaving those missing from the file
+    """
+    key_index = table_info.row_columns.index(key)
+    hash_index = table_info.row_columns.index(HASH_COLUMN)
+    seen: dict[Any, bytes] = {}
+    skipped = 0
+    for row in rows:
+        row_key = normalize_key(row[key_index], key_type)
+        if row_key in seen or row_key in existing:
+            previous = seen[row_key] if row_key in seen else existing.pop(row_key)[1]
+            seen[row_key] = row[hash_index]
+            if previous == row[hash_index]:
+                counts.unchanged += 1
+                skipped += 1
+                if skipped >= 1000:
+                    on_skip(skipped)
+                    skipped = 0
+                continue
+            counts.changed += 1
         else:
-            geometry_attributes = (geometry_obj.wkb, file_srid)
+            seen[row_key] = row[hash_index]
+            counts.new += 1
+
+        yield row
 
-        yield tuple(properties[col] for col in table_info.columns if col != "geometry") + geometry_attributes
+    on_skip(skipped)
+
+
+def time_iteration(items: Iterable[Any], stats: LoadStats, stage: str) -> Generator[Any, None, None]:
+    """
+    Yield from items, adding the time spent waiting on each to a stage
+    """
+    iterator = iter(items)
+    while True:
+        started = perf_counter()
+        item = next(iterator, StopIteration)
+        stats.add_stage(stage, perf_counter() - started)
+        if item is StopIteration:
+            return
+        yield item
+
+
+def advance_progress(progress: Progress, task: TaskID, rows: int) -> None:
+    progress.update(task, advance=rows)
+
+
+def estimate_row_size(row_data: tuple[Any, ...]) -> int:
+    return sum(len(x) if isinstance(x, (str, bytes)) else 8 for x in row_data)
+
+
+def generate_batches(
+    rows: Iterable[tuple[Any, ...]], batch_size: int, batch_bytes: Optional[int] = None
+) -> Generator[list[tuple[Any, ...]], None, None]:
+    """
+    Group rows into batches of at most batch_size rows, ending a batch early once it holds roughly batch_bytes of data
+    """
+    batch: list[tuple[Any, ...]] = []
+    size = 0
+    for row_data in rows:
+        batch.append(row_data)
+        if batch_bytes is not None:
+            size += estimate_row_size(row_data)
+
+        if len(batch) >= batch_size or (batch_bytes is not None and size >= batch_bytes):
+            yield batch
+            batch = []
+            size = 0
+
+    if batch:
+        yield batch
+
+
+def reproject_batches(
+    batches: Iterable[list[tuple[Any, ...]]], table_info: PgTable, force_srid: int, stats: Optional[LoadStats] = None
+) -> Generator[list[tuple[Any, ...]], None, None]:
+    """
+    Reproject each batch's geometries to force_srid in one vectorized call, replacing their SRIDs to match
+    """
+    geometry_index = len(table_info.row_columns) - 1
+    for batch in batches:
+        file_srid = batch[0][geometry_index + 1]
+        if not file_srid:
+            raise PgClientError("Unable to reproject geometries on the client without a file SRID")
+
+        started = perf_counter()
+        geometries = reproject_wkb([row[geometry_index] for row in batch], file_srid, force_srid)
+        reprojected = [
+            (*row[:geometry_index], wkb, force_srid, *row[geometry_index + 2 :]) for row, wkb in zip(batch, geometries)
+        ]
+        if stats is not None:
+            stats.add_stage("reproject", perf_counter() - started)
+
+        yield reprojected
 
 
 def generate_sql_transforms(table_info: PgTable, force_srid: Optional[int] = None) -> list[str]:
     sql_transforms = []
-    for x in table_info.columns:
+    for x in table_info.row_columns:
         if x != "geometry":
             sql_transforms.append("%s")
         elif force_srid:
@@ -231,9 +1400,76 @@ def generate_sql_transforms(table_info: PgTable, force_srid: Optional[int] = Non
     return sql_transforms
 
 
-def generate_sql_insert_row(
-    table_info: PgTable, row_data: tuple[Any, ...], cursor: PgCursor, force_srid: Optional[int] = None
-) -> Composed:
-    return SQL("({})").format(
-        SQL(cursor.mogrify(",".join(generate_sql_transforms(table_info, force_srid)), row_data).decode("utf-8"))
+def generate_sql_insert_row(transforms: str, row_data: tuple[Any, ...], cursor: PgCursor) -> Composed:
+    """
+    Format a row's values into transforms, the joined generate_sql_transforms built once per batch
+    """
+    values = tuple(Json(x) if isinstance(x, (dict, list)) else x for x in row_data)
+    return SQL("({})").format(SQL(cursor.mogrify(transforms, values).decode("utf-8")))
+
+
+def generate_sql_copy(table_info: PgTable) -> Composed:
+    return SQL("COPY {} ({}) FROM STDIN").format(
+        Identifier(table_info.schema, table_info.table),
+        SQL(", ").join(Identifier(x) for x in table_info.row_columns),
     )
+
+
+# Characters with special meaning in COPY's text format
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def format_copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    elif isinstance(value, bool):
+        return "t" if value else "f"
+    elif isinstance(value, (dict, list)):
+        # Fiona reads JSON fields as Python objects
+        return json.dumps(value).translate(COPY_ESCAPES)
+    elif isinstance(value, bytes):
+        return "\\\\x" + value.hex()
+    else:
+        return str(value).translate(COPY_ESCAPES)
+
+
+def generate_copy_row(row_data: tuple[Any, ...], geometry_index: int) -> str:
+    """
+    Format a row from generate_row_data as a line of COPY text, encoding the geometry, its WKB at geometry_index
+    followed by its SRID, as hex EWKB
+    """
+    wkb, srid = row_data[geometry_index : geometry_index + 2]
+    properties = (format_copy_value(x) for x in row_data[:geometry_index])
+    geometry = "\\N" if wkb is None else to_hex_ewkb(wkb, srid)
+    return "\t".join([*properties, geometry]) + "\n"
+
+
+class CopyBuffer:
+    """
+    File-like adapter that lazily formats rows as COPY text for cursor.copy_expert
+    """
+
+    def __init__(self, rows: Iterable[tuple[Any, ...]], table_info: PgTable) -> None:
+        self.rows: Iterator[tuple[Any, ...]] = iter(rows)
+        self.table_info = table_info
+        self.geometry_index = len(table_info.row_columns) - 1
+        self.buffer = bytearray()
+        self.bytes_read = 0
+        self.format_seconds = 0.0
+
+    def read(self, size: int = -1) -> bytes:
+        started = perf_counter()
+        while size < 0 or len(self.buffer) < size:
+            row_data = next(self.rows, None)
+            if row_data is None:
+                break
+            self.buffer += generate_copy_row(row_data, self.geometry_index).encode("utf-8")
+
+        if size < 0:
+            size = len(self.buffer)
+
+        chunk = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        self.bytes_read += len(chunk)
+        self.format_seconds += perf_counter() - started
+        return chunk
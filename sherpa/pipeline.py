@@ -0,0 +1,100 @@
+from cProfile import Profile
+from collections.abc import Iterable, Iterator
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from time import perf_counter
+from types import TracebackType
+from typing import Any, Generic, Optional, TypeVar
+
+from sherpa.stats import PipelineStats
+
+T = TypeVar("T")
+
+
+class BatchPipeline(Generic[T]):
+    """
+    Produce batches on a reader thread into a bounded queue while the caller consumes them, so decoding a file
+    overlaps with writing to the database. A profiler only sees the thread enabling it, so the reader thread can be
+    given its own
+    """
+
+    def __init__(
+        self,
+        batches: Iterable[T],
+        queue_size: int,
+        stats: Optional[PipelineStats] = None,
+        profiler: Optional[Profile] = None,
+    ) -> None:
+        self.batches = batches
+        self.profiler = profiler
+        self.queue: Queue[Any] = Queue(maxsize=queue_size)
+        self.stats = stats or PipelineStats()
+        self.stats.queue_size = queue_size
+        self.stopped = Event()
+        self.error: Optional[BaseException] = None
+        self.reader = Thread(target=self.read, name="sherpa-reader", daemon=True)
+        self.done = object()
+
+    def __enter__(self) -> "BatchPipeline[T]":
+        self.reader.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.stopped.set()
+        self.reader.join()
+
+    def __iter__(self) -> Iterator[T]:
+        while True:
+            depth = self.queue.qsize()
+            started = perf_counter()
+            batch = self.get()
+            self.stats.writer_stall += perf_counter() - started
+
+            if batch is self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+
+            self.stats.record_queue_depth(depth)
+            yield batch
+
+    def read(self) -> None:
+        if self.profiler is not None:
+            self.profiler.enable()
+
+        try:
+            for batch in self.batches:
+                started = perf_counter()
+                queued = self.put(batch)
+                self.stats.reader_stall += perf_counter() - started
+                if not queued:
+                    return
+        except BaseException as ex:
+            self.error = ex
+        finally:
+            if self.profiler is not None:
+                self.profiler.disable()
+            self.put(self.done)
+
+    def put(self, item: Any) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+
+        return False
+
+    def get(self) -> Any:
+        while True:
+            try:
+                return self.queue.get(timeout=0.1)
+            except Empty:
+                if not self.reader.is_alive() and self.queue.empty():
+                    return self.done
@@ -0,0 +1,313 @@
+import atexit
+from dataclasses import dataclass, fields, replace
+from threading import Condition
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Any, Optional
+
+from psycopg2 import Error, connect
+from psycopg2.extensions import connection as PgConnection
+
+from sherpa.constants import CONFIG_FILE
+from sherpa.stats import PoolStats
+from sherpa.utils import read_config_file
+
+if TYPE_CHECKING:
+    from sherpa.pg_client import CatalogEntry
+
+
+class PoolError(Exception):
+    """
+    Raise when a connection pool is misconfigured or has no connection free in time
+    """
+
+
+@dataclass
+class PoolConfig:
+    """
+    Settings of the connection pools, read from the [pool] table of the config file. max_size caps the connections
+    a command holds at once, counting those of its worker processes, and is unlimited if not set. statement_timeout
+    is in milliseconds and the other times in seconds
+    """
+
+    min_size: int = 0
+    max_size: Optional[int] = None
+    timeout: float = 30.0
+    idle_timeout: float = 300.0
+    application_name: str = "sherpa"
+    statement_timeout: Optional[int] = None
+    keepalives_idle: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "PoolConfig":
+        settings = config.get("pool", {})
+        unknown = set(settings) - {x.name for x in fields(cls)}
+        if unknown:
+            raise PoolError(f"Unknown [pool] settings in {CONFIG_FILE}: {', '.join(sorted(unknown))}")
+
+        for name, value in settings.items():
+            text = name == "application_name"
+            if isinstance(value, bool) or not isinstance(value, str if text else (int, float)):
+                raise PoolError(f"The [pool] {name} in {CONFIG_FILE} must be a {'string' if text else 'number'}")
+
+        pool_config = cls(**settings)
+        if pool_config.min_size < 0 or (
+            pool_config.max_size is not None and pool_config.max_size < max(pool_config.min_size, 1)
+        ):
+            raise PoolError(f"The [pool] max_size in {CONFIG_FILE} must be at least 1 and min_size")
+
+        return pool_config
+
+    @property
+    def connect_parameters(self) -> dict[str, Any]:
+        # Settings are passed as libpq parameters rather than startup options, which PgBouncer rejects by default
+        parameters: dict[str, Any] = {"application_name": self.application_name}
+        if self.keepalives_idle is not None:
+            parameters.update(keepalives=1, keepalives_idle=self.keepalives_idle)
+
+        return parameters
+
+
+class ConnectionPool:
+    """
+    Connections to one database kept open once returned, so later clients in the same process reuse them rather
+    than connecting again. Connections idle for longer than idle_timeout are closed, down to min_size
+    """
+
+    def __init__(self, connection_details: dict[str, str], config: PoolConfig) -> None:
+        self.connection_details = connection_details
+        self.config = config
+        self.stats = PoolStats()
+        # Idle connections with when each was returned, the most recently returned last
+        self.idle: list[tuple[PgConnection, float]] = []
+        self.in_use: list[PgConnection] = []
+        # Connections opened outside the pool that count against max_size, such as the psycopg driver's
+        self.reserved = 0
+        # Connections being opened, checked or rolled back outside the condition, which also count against max_size
+        self.pending = 0
+        self.condition = Condition()
+        # Columns of the tables looked up through the pool's connections, by schema and table, see PgClient.get_columns
+        self.catalog: dict[tuple[str, str], "CatalogEntry"] = {}
+        for _ in range(config.min_size):
+            self.idle.append((self.connect(), monotonic()))
+            self.stats.opened += 1
+
+    @property
+    def size(self) -> int:
+        return len(self.idle) + len(self.in_use) + self.reserved + self.pending
+
+    def connect(self) -> PgConnection:
+        conn = connect(**self.connection_details, **self.config.connect_parameters)
+        if self.config.statement_timeout is not None:
+            # Set for the session, as returning a connection only rolls back what a transaction set
+            with conn.cursor() as cursor:
+                cursor.execute("SET statement_timeout = %s;", (self.config.statement_timeout,))
+            conn.commit()
+
+        return conn
+
+    def getconn(self) -> PgConnection:
+        """
+        Check out the most recently returned connection that still works, or a new one if none is idle. Waits up
+        to timeout for a connection to be returned when max_size are in use. Connecting and checking are round
+        trips, so they're done outside the condition, holding a slot of the pool while they run
+        """
+        started = perf_counter()
+        deadline = monotonic() + self.config.timeout
+        while True:
+            conn = self.claim(deadline)
+            try:
+                if conn is None:
+                    conn = self.connect()
+                    with self.condition:
+                        self.stats.opened += 1
+                elif self.check(conn):
+                    with self.condition:
+                        self.stats.reused += 1
+                else:
+                    with self.condition:
+                        self.pending -= 1
+                        self.stats.closed += 1
+                        self.condition.notify()
+                    continue
+            except BaseException:
+                with self.condition:
+                    self.pending -= 1
+                    self.condition.notify()
+                raise
+
+            with self.condition:
+                self.pending -= 1
+                return self.check_out(conn, started)
+
+    def claim(self, deadline: float) -> Optional[PgConnection]:
+        """
+        Take the most recently returned idle connection, or a slot to connect in if there's none, counting either as
+        pending until getconn checks it out
+        """
+        with self.condition:
+            while True:
+                self.close_idle()
+                if self.idle:
+                    conn, _ = self.idle.pop()
+                    self.pending += 1
+                    return conn
+
+                if self.config.max_size is None or self.size < self.config.max_size:
+                    self.pending += 1
+                    return None
+
+                self.wait(deadline)
+
+    def wait(self, deadline: float) -> None:
+        # Called holding the condition, which a returned connection notifies
+        remaining = deadline - monotonic()
+        if remaining <= 0 or not self.condition.wait(remaining):
+            raise PoolError(
+                f"All {self.config.max_size} of the pool's connections were still in use after {self.config.timeout:g}s"
+            )
+
+    def reserve(self) -> None:
+        """
+        Count a connection opened outside the pool against max_size, closing an idle connection or waiting up to
+        timeout for one to be returned if there's no room for it. release uncounts it once it's closed
+        """
+        deadline = monotonic() + self.config.timeout
+        with self.condition:
+            while self.config.max_size is not None and self.size >= self.config.max_size:
+                if self.idle:
+                    conn, _ = self.idle.pop(0)
+                    conn.close()
+                    self.stats.closed += 1
+                else:
+                    self.wait(deadline)
+            self.reserved += 1
+
+    def release(self) -> None:
+        with self.condition:
+            self.reserved -= 1
+            self.condition.notify()
+
+    def check_out(self, conn: PgConnection, started: float) -> PgConnection:
+        self.in_use.append(conn)
+        self.stats.checkouts += 1
+        self.stats.wait_seconds += perf_counter() - started
+        self.stats.peak_in_use = max(self.stats.peak_in_use, len(self.in_use))
+        return conn
+
+    def check(self, conn: PgConnection) -> bool:
+        """
+        Check an idle connection still works, closing it if it doesn't, such as after the server restarted
+        """
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.rollback()
+        except Error:
+            conn.close()
+            return False
+
+        return True
+
+    def putconn(self, conn: PgConnection) -> None:
+        """
+        Return a connection, rolling back anything left uncommitted so the next client starts a fresh transaction
+        """
+        with self.condition:
+            if conn not in self.in_use:
+                return
+
+            self.in_use.remove(conn)
+            self.pending += 1
+
+        try:
+            conn.rollback()
+        except Error:
+            conn.close()
+            rolled_back = False
+        else:
+            rolled_back = True
+
+        with self.condition:
+            self.pending -= 1
+            if rolled_back:
+                self.idle.append((conn, monotonic()))
+            else:
+                self.stats.closed += 1
+            self.condition.notify()
+
+    def close_idle(self) -> None:
+        # The least recently returned connections are first, so close from the start while they've expired
+        expired = monotonic() - self.config.idle_timeout
+        while self.idle and self.idle[0][1] < expired and self.size > self.config.min_size:
+            conn, _ = self.idle.pop(0)
+            conn.close()
+            self.stats.closed += 1
+
+    def reclaim(self) -> None:
+        """
+        Return the connections still checked out, such as those of a command that exited before closing its client
+        """
+        for conn in list(self.in_use):
+            self.putconn(conn)
+
+    def snapshot(self) -> PoolStats:
+        """
+        Copy the pool's stats to measure what happens after with PoolStats.since, restarting their peak from the
+        connections in use now
+        """
+        with self.condition:
+            self.stats.peak_in_use = len(self.in_use)
+            return replace(self.stats)
+
+    def close(self) -> None:
+        with self.condition:
+            for conn in [x for x, _ in self.idle] + self.in_use:
+                conn.close()
+            self.idle = []
+            self.in_use = []
+
+
+# This process's pools, by the connection details they connect with
+POOLS: dict[tuple[tuple[str, str], ...], ConnectionPool] = {}
+
+
+def read_pool_config() -> PoolConfig:
+    return PoolConfig.from_config(read_config_file())
+
+
+def get_pool(connection_details: dict[str, str], keep_warm: bool = False) -> ConnectionPool:
+    """
+    Get this process's pool of connections to a database, creating it with the config file's settings if needed.
+    Only a pool kept warm, as sherpa serve's is, opens and keeps min_size connections, so a command and its workers
+    only open the connections they use
+    """
+    details = {k: str(v) for k, v in connection_details.items()}
+    key = tuple(sorted(details.items()))
+    if key not in POOLS:
+        config = read_pool_config()
+        POOLS[key] = ConnectionPool(details, config if keep_warm else replace(config, min_size=0))
+
+    return POOLS[key]
+
+
+def close_idle_connections() -> None:
+    for pool in POOLS.values():
+        with pool.condition:
+            pool.close_idle()
+
+
+def reclaim_connections() -> None:
+    """
+    Return every pool's checked out connections and restart their stats, so a command run in a long lived process
+    starts as it would in a new one
+    """
+    for pool in POOLS.values():
+        pool.reclaim()
+        pool.stats = PoolStats()
+
+
+@atexit.register
+def close_pools() -> None:
+    for pool in POOLS.values():
+        pool.close()
+    POOLS.clear()
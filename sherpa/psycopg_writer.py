@@ -0,0 +1,155 @@
+from contextlib import ExitStack
+from time import perf_counter
+from types import TracebackType
+from typing import Any, Optional
+
+import psycopg
+from psycopg import sql
+from psycopg.types.json import Jsonb
+
+from sherpa.constants import LoadEngine
+from sherpa.geometry import to_ewkb, to_hex_ewkb
+from sherpa.pg_client import PgTable
+from sherpa.pool import ConnectionPool
+from sherpa.stats import LoadStats
+
+# Column types binary COPY can write from the values fiona reads, which are strict about Python types. Anything
+# else, such as dates fiona reads as strings, falls back to text COPY
+BINARY_COPY_TYPES = {
+    "text",
+    "varchar",
+    "int2",
+    "int4",
+    "int8",
+    "float4",
+    "float8",
+    "bool",
+    "bytea",
+    "geometry",
+}
+
+
+class PsycopgWriter:
+    """
+    Write batches over a psycopg 3 connection of its own. COPY uses the binary format when every column's type
+    allows it, and INSERT runs in pipeline mode so batches are queued without waiting for the last to finish
+    """
+
+    def __init__(self, pool: ConnectionPool, table_structure: PgTable, engine: LoadEngine) -> None:
+        # Connected with the pool's settings and counted against its max_size, though the pool can't hand it out
+        pool.reserve()
+        self.pool = pool
+        self.stack = ExitStack()
+        self.stack.callback(pool.release)
+        try:
+            self.conn = psycopg.connect(
+                psycopg.conninfo.make_conninfo(**pool.connection_details, **pool.config.connect_parameters)
+            )
+            self.stack.callback(self.conn.close)
+            if pool.config.statement_timeout is not None:
+                self.conn.execute(
+                    sql.SQL("SET statement_timeout = {};").format(sql.Literal(pool.config.statement_timeout))
+                )
+                self.conn.commit()
+
+            self.table_structure = table_structure
+            self.engine = engine
+            self.column_types = self.get_column_types()
+        except BaseException:
+            self.stack.close()
+            raise
+        self.binary = all(x in BINARY_COPY_TYPES for x in self.column_types)
+
+    def __enter__(self) -> "PsycopgWriter":
+        # The connection rolls back if the load fails, then closes
+        self.stack.enter_context(self.conn)
+        if self.engine is LoadEngine.INSERT:
+            self.stack.enter_context(self.conn.pipeline())
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.stack.__exit__(exc_type, exc_value, traceback)
+
+    def get_column_types(self) -> list[str]:
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT attribute.attname, type.typname
+                FROM pg_attribute AS attribute
+                JOIN pg_type AS type
+                    ON type.oid = attribute.atttypid
+                WHERE attribute.attrelid = %s::regclass
+                  AND attribute.attnum > 0
+                  AND NOT attribute.attisdropped
+                """,
+                (sql.Identifier(self.table_structure.schema, self.table_structure.table).as_string(self.conn),),
+            )
+            types: dict[str, str] = dict(cursor.fetchall())
+
+        return [types[x] for x in self.table_structure.row_columns]
+
+    def write(self, rows: list[tuple[Any, ...]], stats: Optional[LoadStats] = None) -> int:
+        started = perf_counter()
+        if self.engine is LoadEngine.COPY:
+            self.copy_rows(rows)
+        else:
+            self.insert_rows(rows)
+
+        if stats is not None:
+            # psycopg formats rows as it sends them, so the two can't be timed apart
+            stats.add_stage("execute", perf_counter() - started)
+
+        # Rows are written whole or the load fails, and in pipeline mode the row count isn't known until a sync
+        return len(rows)
+
+    def copy_rows(self, rows: list[tuple[Any, ...]]) -> None:
+        geometry_index = len(self.table_structure.row_columns) - 1
+        statement = sql.SQL("COPY {} ({}) FROM STDIN {}").format(
+            sql.Identifier(self.table_structure.schema, self.table_structure.table),
+            sql.SQL(", ").join(sql.Identifier(x) for x in self.table_structure.row_columns),
+            sql.SQL("(FORMAT BINARY)" if self.binary else ""),
+        )
+        with self.conn.cursor() as cursor, cursor.copy(statement) as copy:
+            if self.binary:
+                # Binary COPY carries no types, so EWKB is sent as bytea for geometry's binary input to read
+                copy.set_types(["bytea" if x == "geometry" else x for x in self.column_types])
+                for row in rows:
+                    wkb, srid = row[geometry_index : geometry_index + 2]
+                    copy.write_row((*row[:geometry_index], None if wkb is None else to_ewkb(wkb, srid)))
+            else:
+                for row in rows:
+                    wkb, srid = row[geometry_index : geometry_index + 2]
+                    properties = (adapt_value(x) for x in row[:geometry_index])
+                    copy.write_row((*properties, None if wkb is None else to_hex_ewkb(wkb, srid)))
+
+    def insert_rows(self, rows: list[tuple[Any, ...]]) -> None:
+        geometry_index = len(self.table_structure.row_columns) - 1
+        statement = sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
+            sql.Identifier(self.table_structure.schema, self.table_structure.table),
+            sql.SQL(", ").join(sql.Identifier(x) for x in self.table_structure.row_columns),
+            sql.SQL(", ").join([sql.Placeholder()] * geometry_index + [sql.SQL("ST_GeomFromWKB(%s, %s::integer)")]),
+        )
+        with self.conn.cursor() as cursor:
+            cursor.executemany(
+                statement,
+                [
+                    (*(adapt_value(x) for x in row[:geometry_index]), *row[geometry_index : geometry_index + 2])
+                    for row in rows
+                ],
+            )
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def disable_synchronous_commit(self) -> None:
+        self.conn.execute("SET LOCAL synchronous_commit = off;")
+
+
+def adapt_value(value: Any) -> Any:
+    # Fiona reads JSON fields as Python objects, which psycopg only dumps when told they're JSON
+    return Jsonb(value) if isinstance(value, (dict, list)) else value
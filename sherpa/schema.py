@@ -0,0 +1,144 @@
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Optional
+
+from fiona import Collection
+
+from sherpa.constants import DATA_TYPE_MAP
+from sherpa.geometry import geometry_has_z, read_collection_srid
+
+# Fiona's integer field types, where int is 64 bit
+INTEGERS = ("int", "int32", "int64")
+
+# PostgreSQL integer types and the largest value each holds
+INTEGER_TYPES = [("SMALLINT", 2**15 - 1), ("INTEGER", 2**31 - 1), ("BIGINT", 2**63 - 1)]
+
+# Geometry types grouped by the multi type that can hold any of them
+GEOMETRY_FAMILIES = {
+    "Point": "MultiPoint",
+    "MultiPoint": "MultiPoint",
+    "LineString": "MultiLineString",
+    "MultiLineString": "MultiLineString",
+    "Polygon": "MultiPolygon",
+    "MultiPolygon": "MultiPolygon",
+    "GeometryCollection": "GeometryCollection",
+}
+
+
+@dataclass
+class InferredSchema:
+    columns: list[tuple[str, str]]
+    geometry_type: Optional[str] = None
+    srid: int = 0
+
+    @property
+    def geometry_column_type(self) -> str:
+        if self.geometry_type is None and not self.srid:
+            return "GEOMETRY"
+
+        return f"GEOMETRY({self.geometry_type or 'Geometry'}, {self.srid})"
+
+
+@dataclass
+class SampleSummary:
+    """
+    What a pass over a file's features saw, to narrow the types its declared schema gives
+    """
+
+    full_scan: bool = False
+    geometry_types: set[str] = field(default_factory=set)
+    dimensions: set[bool] = field(default_factory=set)
+    integer_ranges: dict[str, tuple[int, int]] = field(default_factory=dict)
+
+
+def sample_features(collection: Collection, sample_size: Optional[int]) -> SampleSummary:
+    """
+    Read the first sample_size features of a file, or all of them if sample_size is None
+    """
+    integer_columns = [
+        name for name, declared in collection.schema["properties"].items() if declared.partition(":")[0] in INTEGERS
+    ]
+    summary = SampleSummary(full_scan=sample_size is None or len(collection) <= sample_size)
+    for feature in islice(collection, sample_size):
+        geometry = feature["geometry"]
+        if geometry is not None:
+            summary.geometry_types.add(geometry["type"])
+            summary.dimensions.add(geometry_has_z(geometry))
+
+        properties = feature["properties"]
+        for name in integer_columns:
+            value = properties[name]
+            if value is not None:
+                low, high = summary.integer_ranges.get(name, (value, value))
+                summary.integer_ranges[name] = (min(low, value), max(high, value))
+
+    return summary
+
+
+def infer_column_type(declared: str, integer_range: Optional[tuple[int, int]] = None) -> str:
+    """
+    Map a fiona field type such as str:254, int:9 or float:10.2 to a PostgreSQL type. Integers are narrowed to
+    the smallest type holding integer_range, which must cover every value in the file
+    """
+    base, _, width = declared.partition(":")
+    if base in INTEGERS:
+        if integer_range is not None:
+            largest = max(abs(integer_range[0]) - 1, integer_range[1])
+        elif width:
+            # A shapefile's field width is its maximum number of digits
+            largest = 10 ** int(width) - 1
+        else:
+            return DATA_TYPE_MAP[base]
+        return next((name for name, limit in INTEGER_TYPES if largest <= limit), "NUMERIC")
+
+    if base == "float" and width:
+        precision, _, scale = width.partition(".")
+        # Fixed point shapefile fields are exact decimals, beyond 18 digits they're only declared that way
+        if scale and int(scale) > 0 and int(precision) <= 18:
+            return f"NUMERIC({precision}, {scale})"
+
+    return DATA_TYPE_MAP.get(base, "TEXT")
+
+
+def infer_geometry_type(declared: Optional[str], summary: SampleSummary) -> Optional[str]:
+    """
+    Pick a geometry type holding every geometry seen, or None if they can't share one. Unless every feature was
+    seen, points, lines and polygons are promoted to their multi type, as files such as shapefiles and GeoJSON mix
+    the two freely
+    """
+    geometry_types = set(summary.geometry_types)
+    if declared is not None and declared.removeprefix("3D ") in GEOMETRY_FAMILIES:
+        geometry_types.add(declared.removeprefix("3D "))
+
+    families = {GEOMETRY_FAMILIES[x] for x in geometry_types if x in GEOMETRY_FAMILIES}
+    if len(families) != 1 or len(summary.dimensions) > 1 or not geometry_types <= GEOMETRY_FAMILIES.keys():
+        return None
+
+    (family,) = families
+    if len(geometry_types) == 1 and (summary.full_scan or family == "GeometryCollection"):
+        (geometry_type,) = geometry_types
+    else:
+        geometry_type = family
+
+    return geometry_type + ("Z" if True in summary.dimensions else "")
+
+
+def infer_schema(collection: Collection, sample_size: Optional[int] = None) -> InferredSchema:
+    """
+    Infer column types and a typed geometry column from a file's declared schema, narrowed by sampling its features.
+    Raises CRSError if the file's CRS can't be read
+    """
+    summary = sample_features(collection, sample_size)
+    columns = [
+        (
+            name,
+            infer_column_type(declared, summary.integer_ranges.get(name) if summary.full_scan else None),
+        )
+        for name, declared in collection.schema["properties"].items()
+    ]
+
+    return InferredSchema(
+        columns=columns,
+        geometry_type=infer_geometry_type(collection.schema.get("geometry"), summary),
+        srid=read_collection_srid(collection),
+    )
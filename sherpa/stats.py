@@ -0,0 +1,177 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from cProfile import Profile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from pstats import Stats
+from typing import Any, Optional
+
+
+@dataclass
+class PipelineStats:
+    """
+    How long each side of the load pipeline spent waiting on the other
+    """
+
+    batches: int = 0
+    total_queue_depth: int = 0
+    max_queue_depth: int = 0
+    queue_size: int = 0
+    reader_stall: float = 0.0
+    writer_stall: float = 0.0
+
+    @property
+    def mean_queue_depth(self) -> float:
+        return self.total_queue_depth / self.batches if self.batches else 0.0
+
+    @property
+    def bottleneck(self) -> str:
+        # A reader blocked on a full queue is waiting for the database, a writer blocked on an empty one for the file
+        return "database" if self.reader_stall > self.writer_stall else "file reader"
+
+    def record_queue_depth(self, depth: int) -> None:
+        self.batches += 1
+        self.total_queue_depth += depth
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def merge(self, other: "PipelineStats") -> None:
+        self.batches += other.batches
+        self.total_queue_depth += other.total_queue_depth
+        self.max_queue_depth = max(self.max_queue_depth, other.max_queue_depth)
+        self.queue_size = max(self.queue_size, other.queue_size)
+        self.reader_stall += other.reader_stall
+        self.writer_stall += other.writer_stall
+
+    def summary(self) -> str:
+        return (
+            f"Queue depth mean {self.mean_queue_depth:.1f}, max {self.max_queue_depth} of {self.queue_size}; "
+            f"reader stalled {self.reader_stall:.2f}s, writer stalled {self.writer_stall:.2f}s "
+            f"(bottleneck: {self.bottleneck})"
+        )
+
+
+# Stages of the load path in the order a feature passes through them
+LOAD_STAGES = ["read", "encode", "reproject", "row build", "sql build", "execute", "commit"]
+
+
+def empty_stages() -> dict[str, float]:
+    return dict.fromkeys(LOAD_STAGES, 0.0)
+
+
+@dataclass
+class SyncCounts:
+    """
+    Features a sync found new, changed, unchanged or missing compared with the table
+    """
+
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+    def merge(self, other: "SyncCounts") -> None:
+        self.new += other.new
+        self.changed += other.changed
+        self.unchanged += other.unchanged
+        self.deleted += other.deleted
+
+    def summary(self) -> str:
+        return f"{self.new} new, {self.changed} changed, {self.unchanged} unchanged, {self.deleted} deleted"
+
+
+@dataclass
+class PoolStats:
+    """
+    Connections handed out by the pools of a load's processes, summed across them
+    """
+
+    checkouts: int = 0
+    opened: int = 0
+    reused: int = 0
+    closed: int = 0
+    peak_in_use: int = 0
+    wait_seconds: float = 0.0
+
+    def merge(self, other: "PoolStats") -> None:
+        self.checkouts += other.checkouts
+        self.opened += other.opened
+        self.reused += other.reused
+        self.closed += other.closed
+        # Each process's pool is separate, so their peaks could all be at once
+        self.peak_in_use += other.peak_in_use
+        self.wait_seconds += other.wait_seconds
+
+    def since(self, earlier: "PoolStats") -> "PoolStats":
+        return PoolStats(
+            checkouts=self.checkouts - earlier.checkouts,
+            opened=self.opened - earlier.opened,
+            reused=self.reused - earlier.reused,
+            closed=self.closed - earlier.closed,
+            peak_in_use=self.peak_in_use,
+            wait_seconds=self.wait_seconds - earlier.wait_seconds,
+        )
+
+    def summary(self) -> str:
+        return (
+            f"Pool: {self.checkouts} checkouts, {self.opened} connections opened, {self.reused} reused, "
+            f"{self.closed} closed; peak {self.peak_in_use} in use, waited {self.wait_seconds:.2f}s"
+        )
+
+
+@dataclass
+class LoadStats(PipelineStats):
+    """
+    Pipeline stats plus the rows and bytes sent and the time spent in each stage. Reading, encoding and building
+    rows are only timed with LoadOptions.time_stages, as they're timed for every feature
+    """
+
+    rows: int = 0
+    bytes_sent: int = 0
+    seconds: float = 0.0
+    stages: dict[str, float] = field(default_factory=empty_stages)
+    sync: Optional[SyncCounts] = None
+    pool: Optional[PoolStats] = None
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        self.stages[stage] += seconds
+
+    def add_pool(self, pool: PoolStats) -> None:
+        self.pool = self.pool or PoolStats()
+        self.pool.merge(pool)
+
+    def merge(self, other: PipelineStats) -> None:
+        super().merge(other)
+        if isinstance(other, LoadStats):
+            self.rows += other.rows
+            self.bytes_sent += other.bytes_sent
+            for stage, seconds in other.stages.items():
+                self.add_stage(stage, seconds)
+            if other.sync is not None:
+                self.sync = self.sync or SyncCounts()
+                self.sync.merge(other.sync)
+            if other.pool is not None:
+                self.add_pool(other.pool)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "mean_queue_depth": self.mean_queue_depth,
+            "bottleneck": self.bottleneck,
+        }
+
+
+@contextmanager
+def profiled(path: Path, *profilers: Profile) -> Iterator[None]:
+    """
+    Profile the calling thread, then write its stats combined with those of profilers run on other threads to path
+    """
+    profiler = Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        stats = Stats(profiler)
+        for other in profilers:
+            stats.add(other)
+        stats.dump_stats(path)
@@ -1,6 +1,10 @@
+import re
+from typing import Any, Optional
+
+import tomlkit
 from tomlkit.toml_document import TOMLDocument
 
-from sherpa.constants import DSN_FILE, CONSOLE
+from sherpa.constants import CONFIG_FILE, DSN_FILE, CONSOLE
 
 
 def format_error(msg: str) -> str:
@@ -31,3 +35,42 @@ def read_dsn_file() -> TOMLDocument:
         exit(0)
     else:
         return dsn_profile
+
+
+def read_config_file() -> dict[str, Any]:
+    # Unlike the DSN profile, every setting in the config file has a default
+    try:
+        config: dict[str, Any] = tomlkit.parse(CONFIG_FILE.read_text()).unwrap()
+    except FileNotFoundError:
+        return {}
+    else:
+        return config
+
+
+SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+
+def parse_size(size: str) -> Optional[int]:
+    """
+    Parse a human readable size such as 512KB or 1.5GB into bytes, returning None if it isn't valid
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*", size.upper())
+    if match is None:
+        return None
+
+    value, unit = match.groups()
+    if unit in ("K", "M", "G"):
+        unit += "B"
+
+    return int(float(value) * SIZE_UNITS[unit]) or None
+
+
+def format_size(size: int) -> str:
+    """
+    Format a number of bytes in the largest unit it's at least one of, e.g. 1.5GB
+    """
+    for unit in ("GB", "MB", "KB"):
+        if size >= SIZE_UNITS[unit]:
+            return f"{size / SIZE_UNITS[unit]:.1f}{unit}"
+
+    return f"{size}B"
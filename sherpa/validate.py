@@ -0,0 +1,387 @@
+import json
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation, localcontext
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Optional, Union
+from uuid import UUID
+
+import fiona
+import shapely
+from fiona.crs import CRSError
+
+from sherpa.constants import HASH_COLUMN
+from sherpa.geometry import geojson_to_wkb, geometry_has_z, read_collection_srid
+from sherpa.parallel import MP_CONTEXT, partition_features
+from sherpa.pg_client import CatalogColumn, PgTable
+
+# Feature indexes kept as examples of each issue
+MAX_EXAMPLES = 3
+
+# Geometries checked for validity per vectorized call
+VALIDITY_BATCH_SIZE = 10000
+
+INTEGER_RANGES = {"smallint": 2**15, "integer": 2**31, "bigint": 2**63}
+
+BOOLEAN_TEXT = {"t", "f", "true", "false", "y", "n", "yes", "no", "on", "off", "1", "0"}
+
+GEOMETRY_MULTI_TYPES = {"POINT": "MULTIPOINT", "LINESTRING": "MULTILINESTRING", "POLYGON": "MULTIPOLYGON"}
+
+
+@dataclass
+class ValidationTarget:
+    """
+    What a file is checked against: the table's columns, the data type of each and its geometry's SRID and
+    dimensions, the Z, M or ZM suffix of its type or None if it accepts any. Columns limited to a length or a
+    numeric precision and scale have those too
+    """
+
+    table: PgTable
+    column_types: dict[str, Optional[str]]
+    srid: int = 0
+    force_srid: Optional[int] = None
+    geometry_dimensions: Optional[str] = None
+    column_lengths: dict[str, int] = field(default_factory=dict)
+    column_precisions: dict[str, tuple[int, int]] = field(default_factory=dict)
+
+    @classmethod
+    def from_columns(
+        cls, table: PgTable, columns: list[CatalogColumn], force_srid: Optional[int] = None
+    ) -> "ValidationTarget":
+        geometry = next((x for x in columns if x.name == "geometry"), None)
+        srid = 0 if geometry is None else geometry.srid or 0
+        dimensions = None if geometry is None else geometry.dimensions
+        return cls(
+            table,
+            {x.name: x.data_type for x in columns},
+            srid,
+            force_srid,
+            dimensions,
+            {x.name: x.length for x in columns if x.length is not None},
+            {x.name: (x.precision, x.scale) for x in columns if x.precision is not None and x.scale is not None},
+        )
+
+
+@dataclass
+class ValidationIssue:
+    check: str
+    column: str
+    problem: str
+    error: bool = True
+    count: int = 0
+    examples: list[int] = field(default_factory=list)
+
+
+@dataclass
+class ValidationReport:
+    file: str
+    table: str
+    features: int = 0
+    seconds: float = 0.0
+    issues: dict[tuple[str, str, str], ValidationIssue] = field(default_factory=dict)
+
+    @property
+    def errors(self) -> int:
+        return sum(x.error for x in self.issues.values())
+
+    @property
+    def warnings(self) -> int:
+        return sum(not x.error for x in self.issues.values())
+
+    def add(self, check: str, column: str, problem: str, feature: Optional[int] = None, error: bool = True) -> None:
+        issue = self.issues.setdefault((check, column, problem), ValidationIssue(check, column, problem, error))
+        issue.count += 1
+        if feature is not None and len(issue.examples) < MAX_EXAMPLES:
+            issue.examples.append(feature)
+
+    def merge(self, other: "ValidationReport") -> None:
+        self.features += other.features
+        for key, issue in other.issues.items():
+            merged = self.issues.setdefault(key, ValidationIssue(issue.check, issue.column, issue.problem, issue.error))
+            merged.count += issue.count
+            merged.examples = sorted(merged.examples + issue.examples)[:MAX_EXAMPLES]
+
+    def summary(self) -> str:
+        return (
+            f"Checked {self.features} features of {self.file} against {self.table} in {self.seconds:.2f}s: "
+            f"{self.errors} errors, {self.warnings} warnings"
+        )
+
+
+def check_integer(value: Any, data_type: str) -> Optional[str]:
+    # COPY sends floats as text like 1.0, which integer columns reject even when it's a whole number
+    if isinstance(value, (bool, float)):
+        return f"isn't {data_type}"
+
+    try:
+        number = int(value if isinstance(value, int) else str(value).strip())
+    except ValueError:
+        return f"isn't {data_type}"
+
+    limit = INTEGER_RANGES[data_type]
+    return None if -limit <= number < limit else f"is out of range for {data_type}"
+
+
+def check_float(value: Any, data_type: str) -> Optional[str]:
+    try:
+        float(str(value))
+    except ValueError:
+        return f"isn't {data_type}"
+    return None
+
+
+def check_boolean(value: Any, data_type: str) -> Optional[str]:
+    # COPY sends integers as text, and boolean only accepts 1 and 0 of those
+    if isinstance(value, bool) or str(value).strip().lower() in BOOLEAN_TEXT:
+        return None
+    return "isn't boolean"
+
+
+def check_iso(parse: Callable[[str], Any]) -> Callable[[Any, str], Optional[str]]:
+    def check(value: Any, data_type: str) -> Optional[str]:
+        if isinstance(value, (date, time)):
+            return None
+        try:
+            parse(str(value))
+        except ValueError:
+            return f"isn't an ISO 8601 {data_type}"
+        return None
+
+    return check
+
+
+def check_json(value: Any, data_type: str) -> Optional[str]:
+    if isinstance(value, (dict, list)):
+        return None
+    try:
+        json.loads(str(value))
+    except ValueError:
+        return f"isn't valid {data_type}"
+    return None
+
+
+def check_uuid(value: Any, data_type: str) -> Optional[str]:
+    try:
+        UUID(str(value))
+    except ValueError:
+        return "isn't a uuid"
+    return None
+
+
+# Checks of whether PostgreSQL accepts a value for a column, by the column's information_schema data type. Columns
+# of other types aren't checked
+TYPE_CHECKS: dict[str, Callable[[Any, str], Optional[str]]] = {
+    **{x: check_integer for x in INTEGER_RANGES},
+    **{x: check_float for x in ("real", "double precision", "numeric")},
+    "boolean": check_boolean,
+    # Dates accept a time as well, which PostgreSQL drops
+    **{
+        x: check_iso(datetime.fromisoformat)
+        for x in ("date", "timestamp with time zone", "timestamp without time zone")
+    },
+    **{x: check_iso(time.fromisoformat) for x in ("time with time zone", "time without time zone")},
+    **{x: check_json for x in ("json", "jsonb")},
+    "uuid": check_uuid,
+}
+
+
+def check_length(value: Any, length: int) -> Optional[str]:
+    # PostgreSQL drops trailing spaces past the limit rather than rejecting them
+    text = json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+    return f"is longer than {length} characters" if len(text.rstrip(" ")) > length else None
+
+
+def check_precision(value: Any, precision: int, scale: int) -> Optional[str]:
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        return None
+
+    if number.is_nan():
+        return None
+
+    # Values are rounded to scale digits, then may have at most precision - scale digits before the decimal point
+    problem = f"is out of range for numeric({precision},{scale})"
+    if number.is_infinite() or (number and number.adjusted() >= precision - scale):
+        return problem
+
+    with localcontext() as context:
+        context.prec = precision + 1
+        rounded = number.quantize(Decimal(1).scaleb(-scale), rounding=ROUND_HALF_UP)
+
+    return problem if rounded and rounded.adjusted() >= precision - scale else None
+
+
+def check_value(
+    value: Any,
+    data_type: Optional[str],
+    length: Optional[int] = None,
+    precision: Optional[tuple[int, int]] = None,
+) -> Optional[str]:
+    """
+    Describe why PostgreSQL would reject a value for a column of data_type, limited to length characters or a
+    numeric (precision, scale) if given, or return None if it wouldn't
+    """
+    if value is None or data_type is None or data_type == "bytea":
+        return None
+
+    if isinstance(value, str) and "\x00" in value:
+        # Fiona reads these from some formats, but PostgreSQL text can't hold them
+        return "contains a NUL character"
+
+    check = TYPE_CHECKS.get(data_type)
+    problem = None if check is None else check(value, data_type)
+    if problem is None and length is not None:
+        problem = check_length(value, length)
+    if problem is None and precision is not None:
+        problem = check_precision(value, *precision)
+
+    return problem
+
+
+def check_geometry_type(geometry_type: str, table_geometry_type: Optional[str]) -> bool:
+    """
+    Whether a geometry of a type fiona reads fits a table's geometry column, once promoted to multi if that's needed
+    """
+    if table_geometry_type is None:
+        return True
+
+    # PostGIS names types in upper case, suffixed with their dimensions
+    table_type = table_geometry_type.upper().rstrip("ZM")
+    geometry_type = geometry_type.upper()
+    if table_type == "GEOMETRY" or table_type == geometry_type:
+        return True
+
+    return GEOMETRY_MULTI_TYPES.get(geometry_type) == table_type
+
+
+def check_geometry_dimensions(has_z: bool, table_dimensions: Optional[str]) -> bool:
+    """
+    Whether a geometry's dimensions match those of a table's geometry column. fiona doesn't read M values, so only
+    columns without an M dimension can match
+    """
+    return table_dimensions is None or table_dimensions == ("Z" if has_z else "")
+
+
+def validate_collection(file: Union[Path, str], target: ValidationTarget) -> ValidationReport:
+    """
+    Check the file wide issues that would fail a load before any of its rows are written: columns missing from the
+    file and a file CRS that can't be read or SRID the table won't accept
+    """
+    report = ValidationReport(str(file), f"{target.table.schema}.{target.table.table}")
+    with fiona.open(file, mode="r") as collection:
+        properties = set(collection.schema["properties"])
+        try:
+            file_srid: Optional[int] = read_collection_srid(collection)
+        except CRSError as ex:
+            report.add("srid", "geometry", f"file CRS can't be read: {ex}")
+            file_srid = None
+
+    columns = [x for x in target.table.row_columns[:-1] if x != HASH_COLUMN]
+    for column in columns:
+        if column not in properties:
+            report.add("column", column, "is in the table but not the file")
+    for column in sorted(properties - set(columns)):
+        report.add("column", column, "is in the file but not the table, so won't be loaded", error=False)
+    if "geometry" not in target.table.columns:
+        report.add("column", "geometry", "is missing from the table")
+
+    if file_srid is None:
+        return report
+
+    srid = target.force_srid or file_srid
+    if target.force_srid is not None and not file_srid:
+        report.add("srid", "geometry", "can't be transformed to --srid without a file SRID")
+    elif target.srid and srid != target.srid:
+        report.add("srid", "geometry", f"SRID {srid} doesn't match the table's SRID {target.srid}")
+
+    return report
+
+
+def validate_features(
+    file: Union[Path, str], target: ValidationTarget, start: int = 0, stop: Optional[int] = None
+) -> ValidationReport:
+    """
+    Check features start to stop of a file for values their columns won't accept, geometries of a type the table
+    won't accept and invalid geometries, which PostGIS accepts but most spatial operations mishandle
+    """
+    report = ValidationReport(str(file), f"{target.table.schema}.{target.table.table}")
+    columns = [x for x in target.table.row_columns[:-1] if x != HASH_COLUMN]
+    checked_columns = [
+        (x, target.column_types.get(x), target.column_lengths.get(x), target.column_precisions.get(x)) for x in columns
+    ]
+    geometries: list[tuple[int, Optional[bytes]]] = []
+    with fiona.open(file, mode="r") as collection:
+        features = collection if start == 0 and stop is None else collection.filter(start, stop)
+        for index, feature in enumerate(features, start):
+            report.features += 1
+            properties = feature["properties"]
+            for column, data_type, length, precision in checked_columns:
+                problem = check_value(properties.get(column), data_type, length, precision)
+                if problem is not None:
+                    report.add("type", column, problem, index)
+
+            geometry = feature["geometry"]
+            if geometry is None:
+                continue
+
+            if not check_geometry_type(geometry["type"], target.table.geometry_type):
+                report.add(
+                    "geometry", "geometry", f"{geometry['type']} doesn't fit {target.table.geometry_type}", index
+                )
+
+            has_z = geometry_has_z(geometry)
+            if not check_geometry_dimensions(has_z, target.geometry_dimensions):
+                column_type = f"{(target.table.geometry_type or 'GEOMETRY').rstrip('ZM')}{target.geometry_dimensions}"
+                report.add(
+                    "geometry", "geometry", f"{'XYZ' if has_z else 'XY'} coordinates don't fit {column_type}", index
+                )
+
+            geometries.append((index, geojson_to_wkb(geometry)))
+            if len(geometries) >= VALIDITY_BATCH_SIZE:
+                check_validity(geometries, report)
+                geometries = []
+
+    check_validity(geometries, report)
+    return report
+
+
+def check_validity(geometries: list[tuple[int, Optional[bytes]]], report: ValidationReport) -> None:
+    if not geometries:
+        return
+
+    indexes, wkbs = zip(*geometries)
+    reasons = shapely.is_valid_reason(shapely.from_wkb(list(wkbs)))
+    for index, reason in zip(indexes, reasons):
+        if reason != "Valid Geometry":
+            # Drop the location from reasons such as "Self-intersection[1 2]" so they group together
+            report.add("geometry", "geometry", f"is invalid: {reason.split('[')[0]}", index, error=False)
+
+
+def validate_file(
+    file: Union[Path, str], target: ValidationTarget, workers: int = 1, feature_count: Optional[int] = None
+) -> ValidationReport:
+    """
+    Check a file against the table it will be loaded to without writing anything, splitting its features across a
+    pool of worker processes if there's more than one
+    """
+    started = perf_counter()
+    report = validate_collection(file, target)
+    if feature_count is None:
+        with fiona.open(file, mode="r") as collection:
+            feature_count = len(collection)
+
+    partitions = partition_features(feature_count, workers)
+    if len(partitions) > 1:
+        with ProcessPoolExecutor(max_workers=len(partitions), mp_context=MP_CONTEXT) as executor:
+            futures = [executor.submit(validate_features, file, target, start, stop) for start, stop in partitions]
+            for future in futures:
+                report.merge(future.result())
+    else:
+        report.merge(validate_features(file, target))
+
+    report.seconds = perf_counter() - started
+    return report
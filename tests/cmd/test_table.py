@@ -1,4 +1,7 @@
+import json
+
 import pytest
+from psycopg2.sql import SQL, Identifier
 from typer.testing import CliRunner
 from rich.table import Table
 
@@ -28,6 +31,32 @@ def test_cmd_list_tables_no_data(pg_client, runner, rich_table):
         assert table_output in result.stdout
 
 
+def test_cmd_list_tables_exact_and_estimate(runner):
+    result = runner.invoke(table.app, ["ls", "--exact", "--estimate"])
+    assert result.exit_code == 1
+    assert "--exact can't be used with --estimate" in result.stdout
+
+
+@pytest.mark.parametrize("option", [pytest.param([], id="stats"), pytest.param(["--exact"], id="exact")])
+def test_cmd_list_tables_json(pg_client, pg_connection, runner, monkeypatch, dsn_profile, option):
+    monkeypatch.setattr("sherpa.cmd.table.read_dsn_file", lambda: dsn_profile)
+    with pg_connection.cursor() as cursor:
+        cursor.execute(
+            SQL(
+                "INSERT INTO {} (polygon_id, geometry) VALUES ('ABC123', 'SRID=4326;POLYGON((0 0,1 0,1 1,0 0))');"
+            ).format(Identifier(TEST_TABLE))
+        )
+    pg_connection.commit()
+
+    result = runner.invoke(table.app, ["ls", "--all-schemas", "--json", *option])
+    assert result.exit_code == 0
+    listing = next(x for x in json.loads(result.stdout) if x["table"] == TEST_TABLE)
+    assert listing["schema"] == "public"
+    assert listing["size"] > 0
+    if option:
+        assert listing["rows"] == 1
+
+
 # def test_cmd_list_tables_default_schema(runner):
 #     result = runner.invoke(main.app, ["tables"])
 #     expected_output = {"SCHEMA": "public", "TABLE": TEST_TABLE, "ROWS": "0"}
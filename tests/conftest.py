@@ -6,6 +6,7 @@ import fiona
 from psycopg2 import connect
 from psycopg2.sql import SQL, Identifier
 
+from sherpa.constants import CHECKPOINT_TABLE
 from sherpa.pg_client import PgClient
 from tests.constants import TEST_TABLE
 
@@ -34,7 +35,7 @@ def drop_test_tables(config: dict[str, Any]) -> None:
     conn = connect(**config)
     with conn:
         with conn.cursor() as cursor:
-            for table in ("test_geojson_file", "test_gpkg_file", TEST_TABLE):
+            for table in ("test_geojson_file", "test_gpkg_file", TEST_TABLE, CHECKPOINT_TABLE):
                 cursor.execute(SQL("DROP TABLE IF EXISTS {} CASCADE;").format(Identifier(table)))
             cursor.execute("DROP SCHEMA IF EXISTS generic CASCADE;")
     conn.close()
@@ -44,6 +45,8 @@ def drop_test_tables(config: dict[str, Any]) -> None:
 def pg_client(dsn_profile):
     create_test_tables(dsn_profile["default"])
     client = PgClient(dsn_profile["default"])
+    # The test tables are recreated for each test, quicker than the pool's cached columns expire
+    client.pool.catalog.clear()
     yield client
     client.close()
     drop_test_tables(dsn_profile["default"])
@@ -0,0 +1,86 @@
+import fiona
+import pytest
+import shapely
+
+from sherpa.constants import HASH_COLUMN
+from sherpa.pg_client import PgTable, generate_row_data
+
+pytest.importorskip("pyogrio")
+pytest.importorskip("pyarrow")
+
+from sherpa.arrow_reader import generate_arrow_row_data  # noqa: E402
+
+
+def read_rows(file, table, start=0, stop=None):
+    with fiona.open(file) as collection:
+        return list(generate_row_data(collection, table, start=start, stop=stop))
+
+
+@pytest.mark.parametrize("file", [pytest.param("geojson_file", id="geojson"), pytest.param("gpkg_file", id="gpkg")])
+@pytest.mark.parametrize(
+    "columns",
+    [
+        pytest.param(["polygon_id", "geometry"], id="properties"),
+        pytest.param(["polygon_id", HASH_COLUMN, "geometry"], id="hash"),
+    ],
+)
+def test_generate_arrow_row_data_matches_fiona(request, file, columns):
+    path = request.getfixturevalue(file)
+    table = PgTable("public", "parcels", columns)
+    expected = read_rows(path, table)
+
+    assert list(generate_arrow_row_data(path, table, expected[0][-1], batch_size=3)) == expected
+
+
+@pytest.mark.parametrize("start, stop", [(1, 3), (2, None), (3, 10), (4, 4)])
+def test_generate_arrow_row_data_range(gpkg_file, start, stop):
+    table = PgTable("public", "parcels", ["polygon_id", "geometry"])
+    expected = read_rows(gpkg_file, table, start, stop)
+
+    assert list(generate_arrow_row_data(gpkg_file, table, 4326, start, stop)) == expected
+
+
+def test_generate_arrow_row_data_promotes_to_multi(gpkg_file):
+    table = PgTable("public", "parcels", ["polygon_id", "geometry"], "MULTIPOLYGON")
+    rows = list(generate_arrow_row_data(gpkg_file, table, 4326))
+
+    assert {shapely.from_wkb(x[1]).geom_type for x in rows} == {"MultiPolygon"}
+    assert rows == read_rows(gpkg_file, table)
+
+
+def test_generate_arrow_row_data_dates_as_strings(tmp_path):
+    path = tmp_path / "dated.gpkg"
+    schema = {"geometry": "Point", "properties": {"day": "date", "seen": "datetime"}}
+    with fiona.open(path, "w", driver="GPKG", schema=schema, crs="EPSG:4326") as collection:
+        collection.write(
+            {
+                "type": "Feature",
+                "properties": {"day": "2024-03-01", "seen": "2024-03-01T10:30:00"},
+                "geometry": {"type": "Point", "coordinates": (1.0, 2.0)},
+            }
+        )
+
+    table = PgTable("public", "dated", ["day", "seen", "geometry"])
+    [row] = generate_arrow_row_data(path, table, 4326)
+
+    assert row[0] == "2024-03-01"
+    assert row[1].startswith("2024-03-01T")
+    assert [row] == read_rows(path, table)
+
+
+@pytest.mark.parametrize("columns", [["seen", "geometry"], ["seen", HASH_COLUMN, "geometry"]])
+def test_generate_arrow_row_data_datetimes_match_fiona(tmp_path, columns):
+    path = tmp_path / "dated.gpkg"
+    schema = {"geometry": "Point", "properties": {"seen": "datetime"}}
+    with fiona.open(path, "w", driver="GPKG", schema=schema, crs="EPSG:4326") as collection:
+        collection.writerecords(
+            {
+                "type": "Feature",
+                "properties": {"seen": seen},
+                "geometry": {"type": "Point", "coordinates": (1.0, 2.0)},
+            }
+            for seen in ["2024-03-01T10:30:00", "2024-03-01T10:30:00.250", None]
+        )
+
+    table = PgTable("public", "dated", columns)
+    assert list(generate_arrow_row_data(path, table, 4326)) == read_rows(path, table)
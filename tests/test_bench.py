@@ -0,0 +1,88 @@
+import json
+
+import fiona
+import pytest
+
+from sherpa.bench import (
+    BENCH_TABLE,
+    BenchFormat,
+    BenchGeometry,
+    BenchResult,
+    find_regressions,
+    run_load,
+    save_results,
+    write_synthetic_file,
+)
+from sherpa.constants import LoadEngine
+from sherpa.pg_client import LoadOptions
+from sherpa.stats import LoadStats, PoolStats, SyncCounts
+
+
+@pytest.mark.parametrize("file_format", list(BenchFormat))
+@pytest.mark.parametrize(
+    "geometry, geometry_type",
+    [
+        pytest.param(BenchGeometry.POINT, "Point", id="point"),
+        pytest.param(BenchGeometry.LINE, "LineString", id="line"),
+        pytest.param(BenchGeometry.POLYGON, "Polygon", id="polygon"),
+    ],
+)
+def test_write_synthetic_file(tmp_path, file_format, geometry, geometry_type):
+    path = write_synthetic_file(tmp_path, file_format, 25, geometry, vertices=8, properties=5)
+
+    with fiona.open(path) as collection:
+        assert len(collection) == 25
+        assert collection.schema["geometry"] == geometry_type
+        assert list(collection.schema["properties"]) == ["prop_0", "prop_1", "prop_2", "prop_3", "prop_4"]
+        feature = next(iter(collection))
+
+    if geometry is BenchGeometry.POLYGON:
+        assert len(feature.geometry.coordinates[0]) == 9
+
+
+def test_find_regressions(tmp_path):
+    def result(features: int, seconds: float) -> BenchResult:
+        return BenchResult("geojson", "copy", 10000, 1, features, 1024, seconds, 0, LoadStats())
+
+    baseline = tmp_path / "baseline.json"
+    save_results([result(1000, 1.0)], baseline)
+
+    assert find_regressions([result(1000, 1.05)], baseline, tolerance=0.1) == []
+    assert find_regressions([result(1000, 2.0)], baseline, tolerance=0.1) == [(result(1000, 2.0), 1000.0)]
+
+
+def test_bench_result_from_dict(tmp_path):
+    stats = LoadStats(rows=10, sync=SyncCounts(new=10), pool=PoolStats(checkouts=3, opened=3, peak_in_use=3))
+    result = BenchResult("gpkg", "copy", 10000, 2, 10, 1024, 1.0, 0, stats)
+    path = tmp_path / "results.json"
+    save_results([result], path)
+
+    with open(path) as f:
+        assert [BenchResult.from_dict(x) for x in json.load(f)] == [result]
+
+
+def test_run_load(pg_client, dsn_profile, tmp_path):
+    path = write_synthetic_file(tmp_path, BenchFormat.GPKG, 100)
+    result = run_load(dsn_profile["default"], path, BenchFormat.GPKG, LoadOptions(engine=LoadEngine.INSERT), 1)
+
+    assert result.features == 100
+    assert result.engine == "insert"
+    assert result.stats.batches == 1
+    assert result.peak_rss > 0
+
+
+def test_run_load_keeps_existing_table(pg_client, dsn_profile, tmp_path):
+    path = write_synthetic_file(tmp_path, BenchFormat.GPKG, 10)
+    pg_client.create_table(path, "public", BENCH_TABLE)
+    try:
+        run_load(dsn_profile["default"], path, BenchFormat.GPKG, LoadOptions(engine=LoadEngine.INSERT), 1)
+        assert pg_client.get_insert_table_info(BENCH_TABLE) is not None
+    finally:
+        pg_client.drop_table("public", BENCH_TABLE)
+
+
+def test_write_synthetic_file_holes(tmp_path):
+    path = write_synthetic_file(tmp_path, BenchFormat.GPKG, 5, BenchGeometry.POLYGON, vertices=8, holes=2)
+
+    with fiona.open(path) as collection:
+        assert all(len(x.geometry.coordinates) == 3 for x in collection)
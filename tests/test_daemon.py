@@ -0,0 +1,99 @@
+import socket
+from io import StringIO
+from threading import Thread
+
+import pytest
+
+from sherpa.constants import CONSOLE
+from sherpa.daemon import NO_DAEMON_ENV, DaemonError, forward_command, make_server, run_command, should_forward
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    socket_path = tmp_path / "sherpa.sock"
+    server = make_server(socket_path)
+    thread = Thread(target=server.serve_forever)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.mark.parametrize(
+    "args, env, expected_result",
+    [
+        pytest.param(["load", "file.geojson"], None, True, id="load"),
+        pytest.param(["table", "ls"], None, True, id="table"),
+        pytest.param(["dsn", "add"], None, False, id="dsn"),
+        pytest.param(["load", "--help"], None, False, id="help"),
+        pytest.param([], None, False, id="no_args"),
+        pytest.param(["load", "file.geojson"], "1", False, id="no_daemon"),
+    ],
+)
+def test_should_forward(daemon, monkeypatch, args, env, expected_result):
+    if env is not None:
+        monkeypatch.setenv(NO_DAEMON_ENV, env)
+    assert should_forward(args, daemon) == expected_result
+
+
+def test_should_forward_not_serving(tmp_path):
+    assert not should_forward(["load", "file.geojson"], tmp_path / "sherpa.sock")
+
+
+def test_forward_command_help(daemon, capsys):
+    assert forward_command(["load", "--help"], daemon) == 0
+    assert "Usage: sherpa load" in capsys.readouterr().out
+
+
+def test_forward_command_usage_error(daemon, capsys):
+    assert forward_command(["load", "--monkeys"], daemon) == 2
+    assert "No such option" in capsys.readouterr().out
+
+
+def test_forward_command_runs_from_cwd(daemon, monkeypatch, tmp_path, dsn_profile, capsys):
+    monkeypatch.setattr("sherpa.main.read_dsn_file", lambda: dsn_profile)
+    monkeypatch.chdir(tmp_path)
+
+    assert forward_command(["load", "missing.geojson", "parcels"], daemon) == 1
+    assert "File not found: missing.geojson" in capsys.readouterr().out
+
+
+def test_forward_command_not_serving(tmp_path):
+    assert forward_command(["table", "ls"], tmp_path / "sherpa.sock") is None
+
+
+def test_run_command_local_only():
+    output = StringIO()
+    assert run_command(["dsn", "add"], ".", output) == 2
+    assert "only runs load, table, validate commands" in output.getvalue()
+
+
+@pytest.mark.parametrize(
+    "terminal, color_system, expected_result",
+    [pytest.param(False, None, False, id="piped"), pytest.param(True, "standard", True, id="terminal")],
+)
+def test_run_command_renders_for_client(monkeypatch, tmp_path, dsn_profile, terminal, color_system, expected_result):
+    monkeypatch.setattr("sherpa.main.read_dsn_file", lambda: dsn_profile)
+    color_system_before = CONSOLE.color_system
+    output = StringIO()
+
+    assert run_command(["load", "missing.geojson", "parcels"], str(tmp_path), output, 80, terminal, color_system) == 1
+    assert "File not found" in output.getvalue()
+    assert ("\x1b[" in output.getvalue()) == expected_result
+    assert CONSOLE.color_system == color_system_before
+
+
+def test_make_server_already_running(daemon):
+    with pytest.raises(DaemonError):
+        make_server(daemon)
+
+
+def test_make_server_replaces_stale_socket(tmp_path):
+    socket_path = tmp_path / "sherpa.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(str(socket_path))
+
+    server = make_server(socket_path)
+    server.server_close()
+    assert oct(socket_path.stat().st_mode & 0o777) == oct(0o600)
@@ -0,0 +1,73 @@
+from zipfile import ZipFile
+
+import fiona
+
+from sherpa.files import expand_load_paths, file_fingerprint, load_path_stem
+
+
+def test_expand_load_paths_file(gpkg_file):
+    assert expand_load_paths(str(gpkg_file)) == [str(gpkg_file)]
+
+
+def test_expand_load_paths_missing(tmp_path):
+    assert expand_load_paths(str(tmp_path / "missing.gpkg")) == []
+
+
+def test_expand_load_paths_directory(tmp_path, geojson_file, gpkg_file):
+    (tmp_path / "notes.txt").write_text("not a GIS file")
+    assert expand_load_paths(str(tmp_path)) == [str(geojson_file), str(gpkg_file)]
+
+
+def test_expand_load_paths_glob(tmp_path, geojson_file, gpkg_file):
+    assert expand_load_paths(str(tmp_path / "*.gpkg")) == [str(gpkg_file)]
+
+
+def test_expand_load_paths_literal_glob_characters(tmp_path, gpkg_file):
+    path = gpkg_file.rename(tmp_path / "parcels[2024].gpkg")
+    assert expand_load_paths(str(path)) == [str(path)]
+
+
+def test_expand_load_paths_zip(tmp_path, geojson_file):
+    archive = tmp_path / "archive.zip"
+    with ZipFile(archive, "w") as f:
+        f.write(geojson_file, "nested/parcels.geojson")
+        f.writestr("readme.txt", "not a GIS file")
+
+    paths = expand_load_paths(str(archive))
+    assert paths == [f"/vsizip/{archive}/nested/parcels.geojson"]
+    assert load_path_stem(paths[0]) == "parcels"
+
+    with fiona.open(paths[0]) as collection:
+        assert len(collection) == 4
+
+
+def test_file_fingerprint(geojson_file, gpkg_file):
+    assert file_fingerprint(geojson_file) == file_fingerprint(str(geojson_file))
+    assert file_fingerprint(geojson_file) != file_fingerprint(gpkg_file)
+
+    fingerprint = file_fingerprint(geojson_file)
+    geojson_file.write_text(geojson_file.read_text().replace("ABC123", "XYZ789"))
+    assert file_fingerprint(geojson_file) != fingerprint
+
+
+def test_file_fingerprint_shapefile_sidecars(tmp_path, geometry_records):
+    shapefile = tmp_path / "parcels.shp"
+    schema = {"geometry": "Polygon", "properties": {"polygon_id": "str"}}
+    with fiona.open(shapefile, "w", schema=schema, driver="ESRI Shapefile", crs="EPSG:4326") as collection:
+        collection.writerecords(geometry_records)
+
+    fingerprint = file_fingerprint(shapefile)
+    dbf = tmp_path / "parcels.dbf"
+    dbf.write_bytes(dbf.read_bytes().replace(b"ABC123", b"XYZ789"))
+    assert file_fingerprint(shapefile) != fingerprint
+
+
+def test_file_fingerprint_zip(tmp_path, geojson_file, gpkg_file):
+    archive = tmp_path / "archive.zip"
+    with ZipFile(archive, "w") as f:
+        f.write(geojson_file, "parcels.geojson")
+        f.write(gpkg_file, "parcels.gpkg")
+
+    geojson_path, gpkg_path = expand_load_paths(str(archive))
+    assert file_fingerprint(geojson_path) == file_fingerprint(geojson_path)
+    assert file_fingerprint(geojson_path) != file_fingerprint(gpkg_path)
@@ -0,0 +1,89 @@
+import pytest
+import shapely
+from shapely.geometry import Point, Polygon, mapping
+
+from sherpa.geometry import geojson_to_wkb, promote_to_multi, reproject_wkb, to_ewkb, to_hex_ewkb
+
+
+def test_to_hex_ewkb_embeds_srid():
+    polygon = Polygon([(148.6288077, -35.319649), (148.6336544, -35.3244957), (148.6230378, -35.3235725)])
+    expected = shapely.to_wkb(shapely.set_srid(polygon, 4283), hex=True, include_srid=True).lower()
+    assert to_hex_ewkb(polygon.wkb, 4283) == expected
+
+
+def test_to_hex_ewkb_three_dimensions():
+    point = Point(1.0, 2.0, 3.0)
+    expected = shapely.to_wkb(shapely.set_srid(point, 4326), hex=True, include_srid=True).lower()
+    assert to_hex_ewkb(point.wkb, 4326) == expected
+
+
+def test_to_ewkb_embeds_srid():
+    point = Point(1.0, 2.0)
+    assert to_ewkb(point.wkb, 4326) == shapely.to_wkb(shapely.set_srid(point, 4326), include_srid=True)
+
+
+def test_to_hex_ewkb_without_srid():
+    point = Point(1.0, 2.0)
+    assert to_hex_ewkb(point.wkb, 0) == point.wkb.hex()
+
+
+@pytest.mark.parametrize(
+    "wkt",
+    [
+        "POINT (1 2)",
+        "POINT Z (1 2 3)",
+        "POINT EMPTY",
+        "LINESTRING (0 0, 1 1, 2 3)",
+        "POLYGON EMPTY",
+        "POLYGON ((0 0, 10 0, 10 10, 0 0), (1 1, 2 1, 2 2, 1 1))",
+        "MULTIPOINT Z (1 2 3, 3 4 5)",
+        "MULTILINESTRING ((0 0, 1 1), (2 2, 3 3))",
+        "MULTIPOLYGON Z (((0 0 1, 1 0 1, 1 1 1, 0 0 1)), ((5 5 2, 6 5 2, 6 6 2, 5 5 2)))",
+        "GEOMETRYCOLLECTION (POINT (1 2), POLYGON Z ((0 0 1, 1 0 1, 1 1 1, 0 0 1)))",
+    ],
+)
+def test_geojson_to_wkb_matches_shapely(wkt):
+    geometry = shapely.from_wkt(wkt)
+    assert geojson_to_wkb(mapping(geometry)) == geometry.wkb
+
+
+def test_geojson_to_wkb_closes_rings():
+    geometry = {"type": "Polygon", "coordinates": [[(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)]]}
+    assert geojson_to_wkb(geometry) == Polygon([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)]).wkb
+
+
+def test_geojson_to_wkb_null_geometry():
+    assert geojson_to_wkb(None) is None
+
+
+def test_reproject_wkb():
+    pytest.importorskip("pyproj")
+    geometries = [Point(148.6288077, -35.319649).wkb, None, Point(148.6288077, -35.319649, 580.0).wkb]
+
+    reprojected = reproject_wkb(geometries, 4326, 3857)
+
+    assert reprojected[1] is None
+    point, point_z = shapely.from_wkb(reprojected[0]), shapely.from_wkb(reprojected[2])
+    assert (round(point.x), round(point.y)) == (16545283, -4207405)
+    assert not point.has_z
+    assert (round(point_z.x), round(point_z.y), point_z.z) == (16545283, -4207405, 580.0)
+
+
+@pytest.mark.parametrize(
+    "geometry, expected_result",
+    [
+        pytest.param(
+            {"type": "Polygon", "coordinates": [[(0, 0), (1, 0), (1, 1), (0, 0)]]},
+            {"type": "MultiPolygon", "coordinates": [[[(0, 0), (1, 0), (1, 1), (0, 0)]]]},
+            id="polygon",
+        ),
+        pytest.param(
+            {"type": "MultiPoint", "coordinates": [(0, 0)]},
+            {"type": "MultiPoint", "coordinates": [(0, 0)]},
+            id="already_multi",
+        ),
+        pytest.param(None, None, id="null"),
+    ],
+)
+def test_promote_to_multi(geometry, expected_result):
+    assert promote_to_multi(geometry) == expected_result
@@ -1,9 +1,15 @@
 from pathlib import Path
 
+import fiona
 import pytest
+from fiona.crs import CRSError
+from psycopg2.sql import SQL, Identifier
 from typer.testing import CliRunner
 
 from sherpa import main
+from sherpa.files import file_fingerprint
+from sherpa.pg_client import PgTable
+from sherpa.pool import PoolConfig
 from tests.constants import TEST_TABLE
 
 
@@ -72,3 +78,283 @@ def test_cmd_load_no_table_input(runner, geojson_file):
     print(result.stdout)
     assert result.exit_code == 1
     assert "sherpa: You must provide a table to load to or create one with --create/-c" in result.stdout
+
+
+def test_cmd_load_invalid_batch_bytes(runner, geojson_file):
+    result = runner.invoke(main.app, ["load", str(geojson_file), TEST_TABLE, "--batch-bytes", "lots"])
+    assert result.exit_code == 1
+    assert "sherpa: Invalid batch size in bytes: lots" in result.stdout
+
+
+def test_cmd_load_single_transaction_with_workers(runner, geojson_file):
+    result = runner.invoke(main.app, ["load", str(geojson_file), TEST_TABLE, "--single-transaction", "--workers", "2"])
+    assert result.exit_code == 1
+    assert "sherpa: --single-transaction can't be used with --workers" in result.stdout
+
+
+def test_cmd_load_create_table_fast(runner, geojson_file, pg_connection):
+    result = runner.invoke(main.app, ["load", "--create", "--fast", str(geojson_file), "test_geojson_file"])
+    assert result.exit_code == 0
+    assert "sherpa: Loaded 4 records to public.test_geojson_file" in result.stdout
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT
+                relname,
+                relpersistence,
+                (SELECT array_agg(indexrelid::regclass::text ORDER BY 1) FROM pg_index WHERE indrelid = pg_class.oid)
+            FROM pg_class
+            WHERE relname LIKE 'test_geojson_file%'
+                AND relkind = 'r'
+            """
+        )
+        results = cursor.fetchall()
+
+    assert results == [("test_geojson_file", "p", ["test_geojson_file_geometry_idx", "test_geojson_file_pkey"])]
+
+
+def test_cmd_load_create_table_indexed(runner, geojson_file, pg_connection):
+    result = runner.invoke(
+        main.app,
+        ["load", "--create", "--index", "spgist", "--cluster", "--maintenance-work-mem", "64MB", str(geojson_file)],
+    )
+    assert result.exit_code == 0
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT
+                pg_am.amname,
+                pg_index.indisclustered,
+                -- Set by ANALYZE, a table that's never been analyzed has -1
+                table_class.reltuples
+            FROM pg_index
+            JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid
+            JOIN pg_class AS table_class ON table_class.oid = pg_index.indrelid
+            JOIN pg_am ON pg_am.oid = index_class.relam
+            WHERE index_class.relname = 'test_geojson_file_geometry_idx'
+            """
+        )
+        results = cursor.fetchall()
+
+    assert results == [("spgist", True, 4)]
+
+
+@pytest.mark.parametrize(
+    "args, expected_error",
+    [
+        pytest.param(
+            ["--index", "brin"],
+            "sherpa: --index, --cluster and --maintenance-work-mem can only be used with --create/-c",
+            id="without_create",
+        ),
+        pytest.param(
+            ["--create", "--index", "brin", "--cluster"],
+            "sherpa: --cluster needs a GiST or SP-GiST index, not brin",
+            id="cluster_brin",
+        ),
+        pytest.param(
+            ["--create", "--maintenance-work-mem", "lots"],
+            "sherpa: Invalid maintenance_work_mem size: lots",
+            id="invalid_size",
+        ),
+    ],
+)
+def test_cmd_load_index_options_invalid(runner, geojson_file, args, expected_error):
+    result = runner.invoke(main.app, ["load", *args, str(geojson_file), TEST_TABLE])
+    assert result.exit_code == 1
+    assert expected_error in result.stdout
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_cmd_load_directory(runner, tmp_path, geojson_file, gpkg_file, pg_connection, workers):
+    result = runner.invoke(main.app, ["load", "--workers", workers, str(tmp_path), TEST_TABLE])
+    assert result.exit_code == 0
+    assert "sherpa: Loaded 8 records from 2 of 2 files" in result.stdout
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("SELECT count(*) FROM public.{}").format(Identifier(TEST_TABLE)))
+        assert cursor.fetchone()[0] == 8
+
+
+def test_cmd_load_directory_create_tables(runner, tmp_path, geojson_file, gpkg_file, pg_connection):
+    result = runner.invoke(main.app, ["load", "--create", str(tmp_path / "test_*_file.*")])
+    assert result.exit_code == 0
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute("SELECT (SELECT count(*) FROM test_geojson_file), (SELECT count(*) FROM test_gpkg_file)")
+        assert cursor.fetchone() == (4, 4)
+
+
+def test_cmd_load_create_tables_unreadable_crs(runner, tmp_path, geojson_file, gpkg_file, pg_connection, monkeypatch):
+    def read_collection_srid(collection):
+        if str(collection.path).endswith(".geojson"):
+            raise CRSError("Invalid CRS")
+        return 4283
+
+    monkeypatch.setattr("sherpa.schema.read_collection_srid", read_collection_srid)
+    result = runner.invoke(main.app, ["load", "--create", str(tmp_path / "test_*_file.*")])
+    assert result.exit_code == 0
+    assert "Invalid CRS" in result.stdout
+    assert "sherpa: Loaded 4 records from 1 of 2 files" in result.stdout
+
+
+def test_cmd_load_fast_without_create(runner, geojson_file):
+    result = runner.invoke(main.app, ["load", "--fast", str(geojson_file), TEST_TABLE])
+    assert result.exit_code == 1
+    assert "sherpa: --fast can only be used when creating a table with --create/-c" in result.stdout
+
+
+def test_cmd_load_resume(runner, pg_client, gpkg_file, pg_connection):
+    # As if an earlier load committed the first three features before it was interrupted
+    table_structure = PgTable("public", TEST_TABLE, ["polygon_id", "geometry"])
+    checkpoint = pg_client.start_checkpoint(table_structure, file_fingerprint(gpkg_file), 0, 4)
+    checkpoint.committed = 3
+    pg_client.commit(checkpoint=checkpoint)
+
+    result = runner.invoke(main.app, ["load", "--resume", str(gpkg_file), TEST_TABLE])
+    assert result.exit_code == 0
+    assert f"sherpa: Loaded 1 records to public.{TEST_TABLE}" in result.stdout
+    assert pg_client.get_checkpoints("public", TEST_TABLE) == []
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("SELECT count(*) FROM public.{}").format(Identifier(TEST_TABLE)))
+        assert cursor.fetchone()[0] == 1
+
+
+def test_cmd_load_resume_with_other_workers(runner, pg_client, gpkg_file):
+    table_structure = PgTable("public", TEST_TABLE, ["polygon_id", "geometry"])
+    for start, stop in [(0, 2), (2, 4)]:
+        pg_client.start_checkpoint(table_structure, file_fingerprint(gpkg_file), start, stop)
+
+    result = runner.invoke(main.app, ["load", "--resume", str(gpkg_file), TEST_TABLE])
+    assert result.exit_code == 1
+    assert "sherpa: The interrupted load used 2 workers, resume it with --workers 2" in result.stdout
+
+
+def test_cmd_load_resume_single_transaction(runner, geojson_file):
+    result = runner.invoke(main.app, ["load", "--resume", "--single-transaction", str(geojson_file), TEST_TABLE])
+    assert result.exit_code == 1
+    assert "sherpa: --resume can't be used with --single-transaction" in result.stdout
+
+
+def test_cmd_load_resume_fast(runner, geojson_file):
+    result = runner.invoke(main.app, ["load", "--resume", "--fast", "--create", str(geojson_file)])
+    assert result.exit_code == 1
+    assert "sherpa: --fast loads can't be resumed" in result.stdout
+
+
+def test_cmd_load_replace(runner, geojson_file, pg_connection):
+    assert runner.invoke(main.app, ["load", str(geojson_file), TEST_TABLE, "--srid", 4326]).exit_code == 0
+
+    result = runner.invoke(main.app, ["load", "--mode", "replace", str(geojson_file), TEST_TABLE, "--srid", 4326])
+    assert result.exit_code == 0
+    assert f"sherpa: Loaded 4 records to public.{TEST_TABLE}" in result.stdout
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("SELECT count(*) FROM public.{}").format(Identifier(TEST_TABLE)))
+        assert cursor.fetchone()[0] == 4
+
+
+def test_cmd_load_upsert_without_unique_index(runner, geojson_file):
+    result = runner.invoke(main.app, ["load", "--mode", "upsert", "--key", "polygon_id", str(geojson_file), TEST_TABLE])
+    assert result.exit_code == 1
+    assert f"sherpa: Column polygon_id of public.{TEST_TABLE} needs a unique index to upsert on" in result.stdout
+
+
+@pytest.mark.parametrize(
+    "args, expected_error",
+    [
+        (["--mode", "upsert"], "--key must be used with --mode upsert or sync, and they need one"),
+        (["--key", "polygon_id"], "--key must be used with --mode upsert or sync, and they need one"),
+        (["--mode", "sync", "--key", "polygon_id", "--workers", "2"], "--mode sync loads a single file"),
+        (["--hash"], "--hash can only be used when creating a table with --create/-c"),
+        (["--mode", "replace", "--create"], "--mode replace loads to an existing table, create it with --create/-c"),
+        (["--validate", "--create"], "--validate checks files against an existing table"),
+    ],
+)
+def test_cmd_load_mode_options_invalid(runner, geojson_file, args, expected_error):
+    result = runner.invoke(main.app, ["load", *args, str(geojson_file), TEST_TABLE])
+    assert result.exit_code == 1
+    assert f"sherpa: {expected_error}" in result.stdout
+
+
+def test_cmd_load_psycopg_driver_upsert(runner, geojson_file):
+    pytest.importorskip("psycopg")
+    args = ["load", "--driver", "psycopg", "--mode", "upsert", "--key", "polygon_id", str(geojson_file), TEST_TABLE]
+    result = runner.invoke(main.app, args)
+    assert result.exit_code == 1
+    assert "sherpa: --driver psycopg only appends" in result.stdout
+
+
+def test_cmd_validate(runner, gpkg_file):
+    result = runner.invoke(main.app, ["validate", str(gpkg_file), TEST_TABLE, "--workers", 2])
+    assert result.exit_code == 0
+    assert "sherpa: Validated 1 files" in result.stdout
+
+
+def test_cmd_load_validate_fails_before_loading(runner, geojson_file, pg_connection):
+    result = runner.invoke(main.app, ["load", "--validate", str(geojson_file), TEST_TABLE])
+    assert result.exit_code == 1
+    assert "sherpa: Validation found 1 errors, nothing was loaded" in result.stdout
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("SELECT count(*) FROM public.{}").format(Identifier(TEST_TABLE)))
+        assert cursor.fetchone()[0] == 0
+
+
+def test_cmd_load_sync(runner, tmp_path, geometry_records, pg_connection):
+    file = tmp_path / "parcels.gpkg"
+    schema = {"geometry": "Polygon", "properties": {"polygon_id": "str"}}
+    for i, record in enumerate(geometry_records):
+        record["properties"]["polygon_id"] = f"P{i}"
+    with fiona.open(file, "w", schema=schema, driver="GPKG", crs="EPSG:4326") as collection:
+        collection.writerecords(geometry_records)
+
+    assert runner.invoke(main.app, ["load", "--create", "--hash", str(file), "test_gpkg_file"]).exit_code == 0
+    with pg_connection.cursor() as cursor:
+        cursor.execute("CREATE UNIQUE INDEX ON test_gpkg_file (polygon_id);")
+    pg_connection.commit()
+
+    # Drop one feature and change another
+    geometry_records[1]["geometry"]["coordinates"][0][0] = [148.0, -35.0]
+    geometry_records[1]["geometry"]["coordinates"][0][-1] = [148.0, -35.0]
+    with fiona.open(file, "w", schema=schema, driver="GPKG", crs="EPSG:4326") as collection:
+        collection.writerecords(geometry_records[:3])
+
+    result = runner.invoke(main.app, ["load", "--mode", "sync", "--key", "polygon_id", str(file), "test_gpkg_file"])
+    assert result.exit_code == 0
+    assert "sherpa: Synced: 0 new, 1 changed, 2 unchanged, 1 deleted" in result.stdout
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute("SELECT polygon_id FROM test_gpkg_file ORDER BY 1")
+        assert cursor.fetchall() == [("P0",), ("P1",), ("P2",)]
+
+
+def test_cmd_load_sync_without_hash_column(runner, geojson_file, pg_connection):
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("CREATE UNIQUE INDEX ON {} (polygon_id);").format(Identifier(TEST_TABLE)))
+    pg_connection.commit()
+
+    result = runner.invoke(main.app, ["load", "--mode", "sync", "--key", "polygon_id", str(geojson_file), TEST_TABLE])
+    assert result.exit_code == 1
+    assert "sherpa: --mode sync needs a sherpa_hash BYTEA column" in result.stdout
+
+
+def test_cmd_load_stats_pool(runner, geojson_file, monkeypatch):
+    monkeypatch.setattr("sherpa.pool.POOLS", {})
+    result = runner.invoke(
+        main.app, ["load", str(geojson_file), TEST_TABLE, "--srid", 4326, "--workers", "2", "--stats"]
+    )
+    assert result.exit_code == 0
+    # One connection for this process and one for each worker
+    assert "sherpa: Pool: 3 checkouts, 3 connections opened, 0 reused" in result.stdout
+
+
+def test_cmd_load_workers_limited_by_pool(runner, geojson_file, monkeypatch):
+    monkeypatch.setattr("sherpa.pool.POOLS", {})
+    monkeypatch.setattr("sherpa.pool.read_pool_config", lambda: PoolConfig(max_size=2))
+    result = runner.invoke(main.app, ["load", str(geojson_file), TEST_TABLE, "--srid", 4326, "--workers", "3"])
+    assert result.exit_code == 0
+    assert "sherpa: Limiting --workers to 1, the pool's max_size is 2 connections" in result.stdout
@@ -0,0 +1,30 @@
+import pytest
+from psycopg2.sql import SQL, Identifier
+
+from sherpa.parallel import load_parallel, partition_features
+from sherpa.pg_client import LoadOptions, PgTable
+from tests.constants import TEST_TABLE
+
+
+@pytest.mark.parametrize(
+    "feature_count, partitions, expected_result",
+    [
+        pytest.param(10, 3, [(0, 4), (4, 7), (7, 10)], id="uneven"),
+        pytest.param(4, 2, [(0, 2), (2, 4)], id="even"),
+        pytest.param(2, 4, [(0, 1), (1, 2)], id="more_partitions_than_features"),
+        pytest.param(0, 4, [], id="empty"),
+    ],
+)
+def test_partition_features(feature_count, partitions, expected_result):
+    assert partition_features(feature_count, partitions) == expected_result
+
+
+def test_load_parallel(pg_client, pg_connection, dsn_profile, gpkg_file):
+    table = PgTable("public", TEST_TABLE, ["polygon_id", "geometry"])
+    assert load_parallel(dsn_profile["default"], gpkg_file, table, LoadOptions(), workers=2) == 4
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("SELECT polygon_id FROM public.{} ORDER BY polygon_id").format(Identifier(TEST_TABLE)))
+        results = [x for (x,) in cursor.fetchall()]
+
+    assert results == ["ABC123", "ABC123", "DEF456", "GHI789"]
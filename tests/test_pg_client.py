@@ -1,8 +1,36 @@
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import UUID
+
 import pytest
 import fiona
+from fiona.crs import CRSError
+import psycopg2.errors
+import shapely
 from psycopg2.sql import SQL, Identifier, Composed
 
-from sherpa.pg_client import PgTable, generate_row_data, generate_sql_insert_row, generate_sql_transforms
+from sherpa.constants import LoadDriver, LoadEngine, LoadMode, LoadReader, TransformMode
+from sherpa.files import file_fingerprint
+from sherpa.pg_client import (
+    CopyBuffer,
+    LoadOptions,
+    PgClientError,
+    PgTable,
+    filter_changed_rows,
+    format_copy_value,
+    generate_batches,
+    generate_copy_row,
+    generate_row_data,
+    generate_sql_insert_row,
+    generate_sql_transforms,
+    generate_sql_upsert,
+    identifier_with_suffix,
+    load_collection_srid,
+    normalize_key,
+    reproject_batches,
+    time_iteration,
+)
+from sherpa.stats import LoadStats, SyncCounts
 
 from tests.constants import TEST_TABLE
 
@@ -16,9 +44,73 @@ def test_get_insert_table_info(pg_client):
     table = pg_client.get_insert_table_info(TEST_TABLE)
     assert table.table == TEST_TABLE
     assert table.columns == ["polygon_id", "geometry"]
+    assert table.geometry_type == "POLYGON"
     assert table.sql_composed_columns == Composed([Identifier("polygon_id"), SQL(", "), Identifier("geometry")])
 
 
+def test_get_table_shape(pg_client):
+    assert pg_client.get_table_shape(TEST_TABLE) == [
+        ("id", "bigint", None, None),
+        ("polygon_id", "text", None, None),
+        ("geometry", None, "POLYGON", 4326),
+    ]
+    assert pg_client.get_table_shape("non_existent") is None
+    assert [x.dimensions for x in pg_client.get_columns(TEST_TABLE)] == [None, None, ""]
+
+
+def test_get_columns_cached(pg_client, pg_connection, monkeypatch):
+    assert [x.name for x in pg_client.get_columns(TEST_TABLE)] == ["id", "polygon_id", "geometry"]
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("ALTER TABLE {} ADD COLUMN area REAL;").format(Identifier(TEST_TABLE)))
+    pg_connection.commit()
+
+    assert [x.name for x in pg_client.get_columns(TEST_TABLE)] == ["id", "polygon_id", "geometry"]
+    monkeypatch.setattr("sherpa.pg_client.CATALOG_TTL", 0)
+    assert [x.name for x in pg_client.get_columns(TEST_TABLE)] == ["id", "polygon_id", "geometry", "area"]
+
+
+def test_get_columns_forgets_changed_tables(pg_client, geojson_file):
+    assert pg_client.get_insert_table_info("test_geojson_file") is None
+
+    pg_client.create_table(geojson_file, "public", "test_geojson_file")
+    assert pg_client.get_insert_table_info("test_geojson_file").columns == ["polygon_id", "geometry"]
+
+    pg_client.drop_table("public", "test_geojson_file")
+    assert pg_client.get_insert_table_info("test_geojson_file") is None
+
+
+def test_list_tables(pg_client, gpkg_file):
+    pg_client.create_table(gpkg_file, "generic", "test_gpkg_file")
+    pg_client.load(gpkg_file, pg_client.get_insert_table_info("test_gpkg_file", "generic"))
+
+    assert [(x.schema, x.table, x.geometry_column) for x in pg_client.list_tables("generic")] == [
+        ("generic", "test_gpkg_file", "geometry")
+    ]
+    assert ("public", TEST_TABLE) in [(x.schema, x.table) for x in pg_client.list_tables(None)]
+    assert pg_client.count_rows("generic", "test_gpkg_file") == 4
+
+
+def test_list_tables_partitions(pg_client, pg_connection):
+    with pg_connection.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TABLE generic.parcels (state TEXT, geometry GEOMETRY) PARTITION BY LIST (state);
+            CREATE TABLE generic.parcels_act PARTITION OF generic.parcels FOR VALUES IN ('ACT');
+            CREATE TABLE generic.parcels_nsw PARTITION OF generic.parcels FOR VALUES IN ('NSW');
+            """
+        )
+    pg_connection.commit()
+
+    assert [x.table for x in pg_client.list_tables("generic")] == ["parcels_act", "parcels_nsw"]
+
+
+def test_count_rows_timeout(pg_client, pg_connection):
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("LOCK TABLE {} IN ACCESS EXCLUSIVE MODE;").format(Identifier(TEST_TABLE)))
+        assert pg_client.count_rows("public", TEST_TABLE, timeout=0.1) is None
+    pg_connection.rollback()
+
+
 @pytest.mark.parametrize(
     "schema, expected_result",
     [
@@ -31,9 +123,12 @@ def test_schema_exists(pg_client, schema, expected_result):
     assert expected_result == pg_client.schema_exists(schema)
 
 
+@pytest.mark.parametrize(
+    "engine", [pytest.param(LoadEngine.COPY, id="copy"), pytest.param(LoadEngine.INSERT, id="insert")]
+)
 @pytest.mark.parametrize("file", [pytest.param("geojson_file", id="geojson"), pytest.param("gpkg_file", id="gpkg")])
-def test_load_success(request, pg_client, pg_connection, pg_table, file):
-    pg_client.load(request.getfixturevalue(file), pg_table, force_srid=4326)
+def test_load_success(request, pg_client, pg_connection, pg_table, file, engine):
+    assert pg_client.load(request.getfixturevalue(file), pg_table, LoadOptions(force_srid=4326, engine=engine)) == 4
     with pg_connection.cursor() as cursor:
         cursor.execute(
             SQL(
@@ -85,6 +180,18 @@ def test_create_table_from_file_success(pg_client, pg_connection, geojson_file):
     assert results == "test_geojson_file"
 
 
+def test_create_table_infers_types(pg_client, gpkg_file):
+    pg_client.create_table(gpkg_file, "generic", "test_gpkg_file", sample_size=2)
+    table = pg_client.get_insert_table_info("test_gpkg_file", "generic")
+    assert table.geometry_type == "MULTIPOLYGON"
+
+    with pg_client.conn.cursor() as cursor:
+        cursor.execute("SELECT Find_SRID('generic', 'test_gpkg_file', 'geometry');")
+        assert cursor.fetchone()[0] == 4326
+
+    assert pg_client.load(gpkg_file, table) == 4
+
+
 def test_generate_row_data(geojson_file, pg_table):
     with fiona.open(geojson_file) as collection:
         rows = list(generate_row_data(collection, pg_table, force_srid=4326))
@@ -129,7 +236,7 @@ def test_generate_sql_insert_row(pg_table, pg_connection):
         4326,
     )
     with pg_connection.cursor() as cursor:
-        sql_insert_rows = generate_sql_insert_row(pg_table, row_data, cursor)
+        sql_insert_rows = generate_sql_insert_row(",".join(generate_sql_transforms(pg_table)), row_data, cursor)
 
     assert sql_insert_rows == Composed(
         [
@@ -140,3 +247,368 @@ def test_generate_sql_insert_row(pg_table, pg_connection):
             SQL(")"),
         ]
     )
+
+
+def test_generate_copy_row():
+    row_data = (
+        "ABC\t123\\",
+        b"\x01\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\xf0?\x00\x00\x00\x00\x00\x00\x00@",
+        4283,
+        4326,
+    )
+    assert generate_copy_row(row_data, 1) == ("ABC\\t123\\\\\t0101000020bb100000000000000000f03f0000000000000040\n")
+
+
+def test_generate_copy_row_null_values():
+    row_data = (None, True, b"\x01\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\xf0?\x00\x00\x00\x00\x00\x00\x00@", 0)
+    assert generate_copy_row(row_data, 2) == "\\N\tt\t0101000000000000000000f03f0000000000000040\n"
+
+
+@pytest.mark.parametrize(
+    "value, expected_result",
+    [
+        pytest.param({"name": "a\tb"}, '{"name": "a\\\\tb"}', id="json"),
+        pytest.param([1, 2], "[1, 2]", id="json_array"),
+        pytest.param(b"\x01\xff", "\\\\x01ff", id="bytes"),
+    ],
+)
+def test_format_copy_value(value, expected_result):
+    assert format_copy_value(value) == expected_result
+
+
+def test_generate_row_data_promotes_to_multi(geojson_file):
+    table = PgTable("public", TEST_TABLE, ["polygon_id", "geometry"], geometry_type="MULTIPOLYGON")
+    with fiona.open(geojson_file) as collection:
+        rows = list(generate_row_data(collection, table))
+
+    assert all(shapely.from_wkb(row[1]).geom_type == "MultiPolygon" for row in rows)
+
+
+def test_copy_buffer_reads_in_chunks(geojson_file, pg_table):
+    with fiona.open(geojson_file) as collection:
+        rows = list(generate_row_data(collection, pg_table))
+
+    buffer = CopyBuffer(rows, pg_table)
+    chunks = []
+    while chunk := buffer.read(64):
+        assert len(chunk) <= 64
+        chunks.append(chunk)
+
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert [line.split("\t")[0] for line in lines] == ["ABC123", "ABC123", "DEF456", "GHI789"]
+    assert all(line.split("\t")[1].startswith("0103000020bb100000") for line in lines)
+
+
+def test_copy_buffer_counts_bytes(geojson_file, pg_table):
+    with fiona.open(geojson_file) as collection:
+        rows = list(generate_row_data(collection, pg_table))
+
+    buffer = CopyBuffer(rows, pg_table)
+    sent = len(buffer.read(64)) + len(buffer.read())
+    assert buffer.bytes_read == sent
+    assert buffer.format_seconds > 0
+
+
+def test_generate_row_data_timed_stages(geojson_file, pg_table):
+    stats = LoadStats()
+    with fiona.open(geojson_file) as collection:
+        assert len(list(generate_row_data(collection, pg_table, stats=stats))) == 4
+
+    assert all(stats.stages[x] > 0 for x in ("read", "encode", "row build"))
+    assert stats.stages["execute"] == 0
+
+
+def test_time_iteration():
+    stats = LoadStats()
+    assert list(time_iteration(range(3), stats, "read")) == [0, 1, 2]
+    assert stats.stages["read"] > 0
+
+
+def test_generate_batches_by_row_count():
+    rows = ((x, b"wkb", 4326) for x in range(25))
+    batches = list(generate_batches(rows, batch_size=10))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert [row[0] for batch in batches for row in batch] == list(range(25))
+
+
+def test_generate_batches_by_bytes():
+    rows = (("x" * 100, b"\x00" * 100, 4326) for _ in range(10))
+    batches = list(generate_batches(rows, batch_size=10000, batch_bytes=500))
+    assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+
+
+def test_generate_row_data_feature_range(geojson_file, pg_table):
+    with fiona.open(geojson_file) as collection:
+        rows = list(generate_row_data(collection, pg_table, start=1, stop=3))
+
+    assert [row[0] for row in rows] == ["ABC123", "DEF456"]
+
+
+@pytest.mark.parametrize(
+    "engine", [pytest.param(LoadEngine.COPY, id="copy"), pytest.param(LoadEngine.INSERT, id="insert")]
+)
+def test_load_table_without_id_column(pg_client, pg_connection, gpkg_file, engine):
+    with pg_connection.cursor() as cursor:
+        cursor.execute("CREATE TABLE generic.no_id (polygon_id TEXT, geometry GEOMETRY(Polygon, 4326));")
+    pg_connection.commit()
+
+    table = pg_client.get_insert_table_info("no_id", "generic")
+    assert table.columns == ["polygon_id", "geometry"]
+    assert pg_client.load(gpkg_file, table, LoadOptions(engine=engine)) == 4
+
+
+@pytest.mark.parametrize(
+    "options, expected_rows",
+    [
+        pytest.param(LoadOptions(batch_size=1), 1, id="commit_every_batch"),
+        pytest.param(LoadOptions(batch_size=1, single_transaction=True), 0, id="single_transaction"),
+    ],
+)
+def test_load_failure_commit_modes(pg_client, pg_connection, gpkg_file, options, expected_rows):
+    with pg_connection.cursor() as cursor:
+        cursor.execute("CREATE TABLE generic.unique_polygons (polygon_id TEXT UNIQUE, geometry GEOMETRY);")
+    pg_connection.commit()
+
+    table = pg_client.get_insert_table_info("unique_polygons", "generic")
+    with pytest.raises(psycopg2.errors.UniqueViolation):
+        pg_client.load(gpkg_file, table, options)
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM generic.unique_polygons;")
+        assert cursor.fetchone()[0] == expected_rows
+
+
+def test_load_async_commit_every(pg_client, pg_table, gpkg_file):
+    options = LoadOptions(batch_size=1, commit_every=3, async_commit=True)
+    assert pg_client.load(gpkg_file, pg_table, options) == 4
+
+
+@pytest.mark.parametrize(
+    "name, expected_result",
+    [
+        pytest.param("parcels", "parcels_pkey", id="short"),
+        pytest.param("p" * 63, "p" * 58 + "_pkey", id="truncated"),
+    ],
+)
+def test_identifier_with_suffix(name, expected_result):
+    assert identifier_with_suffix(name, "_pkey") == expected_result
+
+
+def test_reproject_batches(geojson_file, pg_table):
+    pytest.importorskip("pyproj")
+    with fiona.open(geojson_file) as collection:
+        batches = list(generate_batches(generate_row_data(collection, pg_table), batch_size=3))
+
+    reprojected = list(reproject_batches(batches, pg_table, 3857))
+
+    assert [len(batch) for batch in reprojected] == [3, 1]
+    for row in (row for batch in reprojected for row in batch):
+        assert row[2] == 3857
+        assert shapely.from_wkb(row[1]).bounds[0] > 16000000
+
+
+@pytest.mark.parametrize(
+    "engine", [pytest.param(LoadEngine.COPY, id="copy"), pytest.param(LoadEngine.INSERT, id="insert")]
+)
+def test_load_client_side_transform(pg_client, pg_connection, pg_table, geojson_file, engine):
+    pytest.importorskip("pyproj")
+    options = LoadOptions(force_srid=4326, engine=engine, transform=TransformMode.CLIENT)
+    assert pg_client.load(geojson_file, pg_table, options) == 4
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("SELECT DISTINCT ST_SRID(geometry) FROM public.{}").format(Identifier(TEST_TABLE)))
+        assert cursor.fetchall() == [(4326,)]
+
+
+@pytest.mark.parametrize(
+    "engine", [pytest.param(LoadEngine.COPY, id="copy"), pytest.param(LoadEngine.INSERT, id="insert")]
+)
+def test_load_psycopg_driver(pg_client, pg_connection, pg_table, geojson_file, engine):
+    pytest.importorskip("psycopg")
+    options = LoadOptions(engine=engine, driver=LoadDriver.PSYCOPG, batch_size=3)
+    assert pg_client.load(geojson_file, pg_table, options) == 4
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(
+            SQL("SELECT polygon_id, ST_SRID(geometry) FROM public.{} ORDER BY polygon_id").format(
+                Identifier(TEST_TABLE)
+            )
+        )
+        rows = cursor.fetchall()
+
+    assert len(rows) == 4
+    assert {x[1] for x in rows} == {4326}
+
+
+@pytest.mark.parametrize("file", [pytest.param("geojson_file", id="geojson"), pytest.param("gpkg_file", id="gpkg")])
+def test_load_arrow_reader(request, pg_client, pg_connection, pg_table, file):
+    pytest.importorskip("pyogrio")
+    pytest.importorskip("pyarrow")
+    options = LoadOptions(force_srid=4326, reader=LoadReader.ARROW, batch_size=3)
+    assert pg_client.load(request.getfixturevalue(file), pg_table, options, start=1) == 3
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("SELECT polygon_id FROM public.{} ORDER BY polygon_id").format(Identifier(TEST_TABLE)))
+        assert [x[0] for x in cursor.fetchall()] == ["ABC123", "DEF456", "GHI789"]
+
+
+def test_load_records_stats(pg_client, pg_table, gpkg_file, tmp_path):
+    stats = LoadStats()
+    options = LoadOptions(time_stages=True, profile_path=tmp_path / "load.prof")
+    assert pg_client.load(gpkg_file, pg_table, options, stats=stats) == 4
+
+    assert stats.rows == 4
+    assert stats.bytes_sent > 0
+    assert all(x > 0 for x in stats.stages.values() if x != stats.stages["reproject"])
+    assert (tmp_path / "load.prof").exists()
+
+
+def test_load_resumes_from_checkpoint(pg_client, pg_table, gpkg_file):
+    checkpoint = pg_client.start_checkpoint(pg_table, file_fingerprint(gpkg_file), 0, 4)
+    assert checkpoint.committed == 0
+
+    # As if an earlier load committed the first three features before it was interrupted
+    checkpoint.committed = 3
+    pg_client.commit(checkpoint=checkpoint)
+
+    assert pg_client.load(gpkg_file, pg_table, LoadOptions(batch_size=1, resume=True)) == 1
+    (checkpoint,) = pg_client.get_checkpoints("public", TEST_TABLE)
+    assert (checkpoint.start, checkpoint.stop, checkpoint.committed) == (0, 4, 4)
+
+    pg_client.clear_checkpoints("public", TEST_TABLE, checkpoint.fingerprint)
+    assert pg_client.get_checkpoints("public", TEST_TABLE) == []
+
+
+def test_load_failure_rolls_back_checkpoint(pg_client, pg_table, gpkg_file):
+    with pytest.raises(psycopg2.errors.UndefinedColumn):
+        pg_client.load(gpkg_file, PgTable("public", TEST_TABLE, ["missing", "geometry"]), LoadOptions(resume=True))
+
+    (checkpoint,) = pg_client.get_checkpoints("public", TEST_TABLE, file_fingerprint(gpkg_file))
+    assert checkpoint.committed == 0
+
+
+@pytest.mark.parametrize("engine", [LoadEngine.COPY, LoadEngine.INSERT])
+def test_load_upsert(pg_client, pg_table, gpkg_file, pg_connection, engine):
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("CREATE UNIQUE INDEX ON {} (polygon_id);").format(Identifier(TEST_TABLE)))
+    pg_connection.commit()
+    assert pg_client.has_unique_index("public", TEST_TABLE, "polygon_id")
+
+    options = LoadOptions(engine=engine, mode=LoadMode.UPSERT, key="polygon_id")
+    # The file has two features with the same key, the last of which is kept
+    assert pg_client.load(gpkg_file, pg_table, options) == 3
+    # Nothing changed, so nothing is rewritten
+    assert pg_client.load(gpkg_file, pg_table, options) == 0
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("SELECT polygon_id FROM {} ORDER BY 1").format(Identifier(TEST_TABLE)))
+        assert cursor.fetchall() == [("ABC123",), ("DEF456",), ("GHI789",)]
+
+
+def test_load_upsert_null_keys(pg_client, pg_connection, tmp_path, geometry_records):
+    with pg_connection.cursor() as cursor:
+        cursor.execute("CREATE TABLE generic.nullable_keys (polygon_id TEXT UNIQUE, geometry GEOMETRY);")
+    pg_connection.commit()
+    file = tmp_path / "nullable_keys.gpkg"
+    for record in geometry_records[:2]:
+        record["properties"]["polygon_id"] = None
+    schema = {"geometry": "Polygon", "properties": {"polygon_id": "str"}}
+    with fiona.open(file, "w", schema=schema, driver="GPKG", crs="EPSG:4326") as collection:
+        collection.writerecords(geometry_records)
+
+    table = pg_client.get_insert_table_info("nullable_keys", "generic")
+    with pytest.raises(PgClientError, match="2 features have no"):
+        pg_client.load(file, table, LoadOptions(mode=LoadMode.UPSERT, key="polygon_id"))
+
+
+def test_generate_sql_upsert(pg_table, pg_connection):
+    assert generate_sql_upsert(pg_table, "polygon_id").as_string(pg_connection) == (
+        'ON CONFLICT ("polygon_id") DO UPDATE SET "geometry" = EXCLUDED."geometry" '
+        'WHERE (target."geometry") IS DISTINCT FROM (EXCLUDED."geometry")'
+    )
+
+
+def test_swap_table(pg_client, pg_table, gpkg_file, pg_connection):
+    pg_client.create_replacement_table("public", TEST_TABLE, "replacement")
+    pg_client.load(gpkg_file, PgTable("public", "replacement", pg_table.columns))
+    pg_client.swap_table("public", "replacement", TEST_TABLE)
+
+    with pg_connection.cursor() as cursor:
+        cursor.execute(SQL("SELECT count(*) FROM {}").format(Identifier(TEST_TABLE)))
+        assert cursor.fetchone()[0] == 4
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", (TEST_TABLE,))
+        assert cursor.fetchall() == [(f"{TEST_TABLE}_pkey",)]
+
+
+def test_generate_row_data_hash(gpkg_file):
+    table = PgTable("public", TEST_TABLE, ["polygon_id", "sherpa_hash", "geometry"])
+    with fiona.open(gpkg_file) as collection:
+        rows = list(generate_row_data(collection, table))
+        assert [x[1] for x in generate_row_data(collection, table)] == [x[1] for x in rows]
+
+    assert all(isinstance(x[1], bytes) and len(x[1]) == 16 for x in rows)
+    # The first two features share an ID but not a geometry
+    assert rows[0][1] != rows[1][1]
+    assert rows[2][1] != rows[3][1]
+
+
+def test_load_collection_srid_invalid_crs():
+    class InvalidCRS:
+        def to_epsg(self):
+            raise CRSError("Invalid CRS")
+
+    collection = SimpleNamespace(crs=InvalidCRS())
+    with pytest.raises(PgClientError, match="Invalid CRS"):
+        load_collection_srid(collection)
+
+
+def test_filter_changed_rows():
+    table = PgTable("public", TEST_TABLE, ["id", "sherpa_hash", "geometry"])
+    rows = [(1, b"same", None, 0), (2, b"new", None, 0), (3, b"changed", None, 0), (4, b"added", None, 0)]
+    existing = {"1": (1, b"same"), "2": (2, b"old"), "3": (3, None), "5": (5, b"gone")}
+    counts = SyncCounts()
+    skipped = []
+
+    changed = list(filter_changed_rows(rows, table, "id", existing, counts, skipped.append))
+
+    assert [x[0] for x in changed] == [2, 3, 4]
+    assert (counts.new, counts.changed, counts.unchanged) == (1, 2, 1)
+    assert sum(skipped) == 1
+    assert existing == {"5": (5, b"gone")}
+
+
+def test_filter_changed_rows_normalizes_keys():
+    table = PgTable("public", TEST_TABLE, ["id", "sherpa_hash", "geometry"])
+    rows = [("007", b"same", None, 0), (1.0, b"changed", None, 0)]
+    existing = {7: (7, b"same"), 1: (1, b"old"), 2: (2, b"gone")}
+    counts = SyncCounts()
+
+    changed = list(filter_changed_rows(rows, table, "id", existing, counts, lambda _: None, "bigint"))
+
+    assert [x[0] for x in changed] == [1.0]
+    assert (counts.new, counts.changed, counts.unchanged) == (0, 1, 1)
+    assert existing == {2: (2, b"gone")}
+
+
+@pytest.mark.parametrize(
+    "value, key_type, expected_result",
+    [
+        pytest.param("007", "bigint", 7, id="zero_padded"),
+        pytest.param(7.0, "integer", 7, id="integral_float"),
+        pytest.param(7.5, "integer", "7.5", id="fractional"),
+        pytest.param("1.50", "numeric", Decimal("1.5"), id="numeric"),
+        pytest.param(
+            "A0EEBC99-9C0B-4EF8-BB6D-6BB9BD380A11", "uuid", UUID("a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"), id="uuid"
+        ),
+        pytest.param("abc", "bigint", "abc", id="invalid"),
+        pytest.param(7, "text", "7", id="text"),
+    ],
+)
+def test_normalize_key(value, key_type, expected_result):
+    assert normalize_key(value, key_type) == expected_result
+
+
+def test_row_columns_cached():
+    table = PgTable("public", TEST_TABLE, ["geometry", "polygon_id"])
+    assert table.row_columns == ["polygon_id", "geometry"]
+    assert table.row_columns is table.row_columns
@@ -0,0 +1,70 @@
+import time
+from cProfile import Profile
+from pstats import Stats
+
+import pytest
+
+from sherpa.pipeline import BatchPipeline
+from sherpa.stats import LoadStats, PipelineStats, profiled
+
+
+def test_batch_pipeline_yields_batches_in_order():
+    stats = PipelineStats()
+    with BatchPipeline(([x] for x in range(10)), queue_size=2, stats=stats) as pipeline:
+        assert list(pipeline) == [[x] for x in range(10)]
+
+    assert stats.batches == 10
+    assert stats.queue_size == 2
+    assert stats.max_queue_depth <= 2
+
+
+def test_batch_pipeline_raises_reader_errors():
+    def batches():
+        yield [1]
+        raise ValueError("Bad feature")
+
+    with BatchPipeline(batches(), queue_size=2) as pipeline:
+        with pytest.raises(ValueError, match="Bad feature"):
+            list(pipeline)
+
+
+def test_batch_pipeline_stops_reader_when_writer_fails():
+    with pytest.raises(RuntimeError):
+        with BatchPipeline(([x] for x in range(1000)), queue_size=1) as pipeline:
+            for _ in pipeline:
+                raise RuntimeError("Write failed")
+
+    assert not pipeline.reader.is_alive()
+
+
+def test_batch_pipeline_records_slow_writer():
+    stats = PipelineStats()
+    with BatchPipeline(([x] for x in range(5)), queue_size=1, stats=stats) as pipeline:
+        for _ in pipeline:
+            time.sleep(0.02)
+
+    assert stats.reader_stall > stats.writer_stall
+    assert stats.bottleneck == "database"
+
+
+def test_load_stats_merge():
+    stats = LoadStats(rows=2, bytes_sent=10)
+    stats.add_stage("encode", 1.0)
+    other = LoadStats(batches=1, rows=3, bytes_sent=5, reader_stall=0.5)
+    other.add_stage("encode", 0.5)
+    stats.merge(other)
+
+    assert (stats.rows, stats.bytes_sent, stats.batches, stats.reader_stall) == (5, 15, 1, 0.5)
+    assert stats.stages["encode"] == 1.5
+    assert stats.to_dict()["stages"]["encode"] == 1.5
+
+
+def test_profiled_includes_reader_thread(tmp_path):
+    reader_profiler = Profile()
+    with profiled(tmp_path / "load.prof", reader_profiler):
+        with BatchPipeline(([x] for x in range(3)), queue_size=1, profiler=reader_profiler) as pipeline:
+            list(pipeline)
+
+    functions = {name for _, _, name in Stats(str(tmp_path / "load.prof")).stats}
+    assert "put" in functions
+    assert "__iter__" in functions
@@ -0,0 +1,172 @@
+from threading import Thread
+
+import pytest
+from psycopg2 import OperationalError
+
+from sherpa.pg_client import PgClient
+from sherpa.pool import ConnectionPool, PoolConfig, PoolError, get_pool
+from sherpa.stats import PoolStats
+
+
+@pytest.fixture
+def pool_config(monkeypatch):
+    pool_config = PoolConfig()
+    monkeypatch.setattr("sherpa.pool.POOLS", {})
+    monkeypatch.setattr("sherpa.pool.read_pool_config", lambda: pool_config)
+    yield pool_config
+
+
+def test_pool_config_defaults():
+    assert PoolConfig.from_config({}) == PoolConfig()
+
+
+def test_pool_config_from_config():
+    config = {"pool": {"min_size": 1, "max_size": 4, "statement_timeout": 60000, "keepalives_idle": 30}}
+    pool_config = PoolConfig.from_config(config)
+
+    assert (pool_config.min_size, pool_config.max_size, pool_config.statement_timeout) == (1, 4, 60000)
+    assert pool_config.connect_parameters == {"application_name": "sherpa", "keepalives": 1, "keepalives_idle": 30}
+
+
+@pytest.mark.parametrize(
+    "settings, expected_error",
+    [
+        pytest.param({"max_connections": 4}, "Unknown [pool] settings", id="unknown"),
+        pytest.param({"min_size": 2, "max_size": 1}, "must be at least 1 and min_size", id="max_below_min"),
+        pytest.param({"max_size": 0}, "must be at least 1 and min_size", id="max_zero"),
+        pytest.param({"max_size": "4"}, "max_size in .* must be a number", id="max_text"),
+        pytest.param({"application_name": 1}, "application_name in .* must be a string", id="name_number"),
+    ],
+)
+def test_pool_config_invalid(settings, expected_error):
+    with pytest.raises(PoolError, match=expected_error.replace("[", r"\[")):
+        PoolConfig.from_config({"pool": settings})
+
+
+def test_pool_stats_since():
+    earlier = PoolStats(checkouts=2, opened=1, reused=1, wait_seconds=0.5)
+    later = PoolStats(checkouts=5, opened=2, reused=3, closed=1, peak_in_use=2, wait_seconds=0.75)
+
+    assert later.since(earlier) == PoolStats(
+        checkouts=3, opened=1, reused=2, closed=1, peak_in_use=2, wait_seconds=0.25
+    )
+
+
+def test_pool_stats_merge():
+    stats = PoolStats(checkouts=1, opened=1, peak_in_use=1)
+    stats.merge(PoolStats(checkouts=2, opened=1, reused=1, peak_in_use=1))
+
+    assert stats == PoolStats(checkouts=3, opened=2, reused=1, peak_in_use=2)
+
+
+def test_get_pool_only_warm_keeps_min_size(dsn_profile, monkeypatch):
+    monkeypatch.setattr("sherpa.pool.POOLS", {})
+    monkeypatch.setattr("sherpa.pool.read_pool_config", lambda: PoolConfig(min_size=2, max_size=4))
+
+    pool = get_pool(dsn_profile["default"])
+    assert (pool.config.min_size, pool.size) == (0, 0)
+
+
+def test_pool_reserve_counts_against_max_size(dsn_profile):
+    pool = ConnectionPool(dsn_profile["default"], PoolConfig(max_size=1, timeout=0))
+    pool.reserve()
+    assert pool.size == 1
+    with pytest.raises(PoolError, match="All 1 of the pool's connections were still in use"):
+        pool.reserve()
+
+    pool.release()
+    assert pool.size == 0
+
+
+def test_pool_connects_outside_condition(dsn_profile, monkeypatch):
+    pool = ConnectionPool(dsn_profile["default"], PoolConfig(max_size=1, timeout=0))
+    acquired = []
+
+    def connect():
+        # Another thread can take the condition, to return a connection say, while this one connects
+        def acquire():
+            if pool.condition.acquire(timeout=1):
+                acquired.append(pool.size)
+                pool.condition.release()
+
+        thread = Thread(target=acquire)
+        thread.start()
+        thread.join()
+        raise OperationalError("connection refused")
+
+    monkeypatch.setattr(pool, "connect", connect)
+    with pytest.raises(OperationalError):
+        pool.getconn()
+
+    # The slot it connected in was counted, then released once connecting failed
+    assert acquired == [1]
+    assert pool.size == 0
+
+
+def test_pg_client_reuses_connection(pg_client, dsn_profile, pool_config):
+    with PgClient(dsn_profile["default"]) as client:
+        conn = client.conn
+    with PgClient(dsn_profile["default"]) as client:
+        assert client.conn is conn
+
+    pool = get_pool(dsn_profile["default"])
+    assert (pool.stats.checkouts, pool.stats.opened, pool.stats.reused) == (2, 1, 1)
+    assert not conn.closed
+
+
+def test_pg_client_context_manager_rolls_back(pg_client, dsn_profile, pool_config):
+    with pytest.raises(ValueError):
+        with PgClient(dsn_profile["default"]) as client:
+            with client.conn.cursor() as cursor:
+                cursor.execute("CREATE TABLE public.sherpa_rolled_back (id INTEGER);")
+            raise ValueError
+
+    with PgClient(dsn_profile["default"]) as client:
+        assert client.get_insert_table_info("sherpa_rolled_back") is None
+
+
+def test_pool_connection_settings(pg_client, dsn_profile):
+    pool = ConnectionPool(dsn_profile["default"], PoolConfig(application_name="sherpa-test", statement_timeout=5000))
+    conn = pool.getconn()
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT current_setting('application_name'), current_setting('statement_timeout');")
+        assert cursor.fetchone() == ("sherpa-test", "5s")
+
+    pool.close()
+
+
+def test_pool_max_size_timeout(pg_client, dsn_profile):
+    pool = ConnectionPool(dsn_profile["default"], PoolConfig(max_size=1, timeout=0.1))
+    conn = pool.getconn()
+    with pytest.raises(PoolError, match="All 1 of the pool's connections"):
+        pool.getconn()
+
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    pool.close()
+
+
+def test_pool_closes_idle_connections(pg_client, dsn_profile):
+    pool = ConnectionPool(dsn_profile["default"], PoolConfig(min_size=1, idle_timeout=0))
+    pool.putconn(pool.getconn())
+    pool.putconn(pool.getconn())
+    extra = pool.getconn()
+    kept = pool.getconn()
+    pool.putconn(extra)
+    pool.putconn(kept)
+    pool.close_idle()
+
+    assert extra.closed
+    assert [x for x, _ in pool.idle] == [kept]
+    pool.close()
+
+
+def test_pool_replaces_broken_connection(pg_client, dsn_profile):
+    pool = ConnectionPool(dsn_profile["default"], PoolConfig())
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.close()
+
+    assert pool.getconn() is not conn
+    assert pool.stats.closed == 1
+    pool.close()
@@ -0,0 +1,95 @@
+import json
+
+import fiona
+import pytest
+from fiona.crs import CRSError
+
+from sherpa.schema import InferredSchema, SampleSummary, infer_column_type, infer_geometry_type, infer_schema
+
+
+@pytest.mark.parametrize(
+    "declared, integer_range, expected_result",
+    [
+        pytest.param("str", None, "TEXT", id="str"),
+        pytest.param("str:254", None, "TEXT", id="str_width"),
+        pytest.param("int32", None, "INTEGER", id="int32"),
+        pytest.param("int", None, "BIGINT", id="int64"),
+        pytest.param("int:4", None, "SMALLINT", id="int_width_small"),
+        pytest.param("int:18", None, "BIGINT", id="int_width_large"),
+        pytest.param("int", (-32768, 100), "SMALLINT", id="int_range_small"),
+        pytest.param("int32", (0, 40000), "INTEGER", id="int_range_integer"),
+        pytest.param("int", (0, 2**40), "BIGINT", id="int_range_big"),
+        pytest.param("float", None, "DOUBLE PRECISION", id="float"),
+        pytest.param("float:10.2", None, "NUMERIC(10, 2)", id="float_decimal"),
+        pytest.param("float:24.15", None, "DOUBLE PRECISION", id="float_wide"),
+        pytest.param("date", None, "DATE", id="date"),
+        pytest.param("datetime", None, "TIMESTAMPTZ", id="datetime"),
+        pytest.param("json", None, "JSONB", id="json"),
+        pytest.param("List[str]", None, "TEXT", id="unknown"),
+    ],
+)
+def test_infer_column_type(declared, integer_range, expected_result):
+    assert infer_column_type(declared, integer_range) == expected_result
+
+
+@pytest.mark.parametrize(
+    "declared, geometry_types, dimensions, full_scan, expected_result",
+    [
+        pytest.param("Polygon", {"Polygon"}, {False}, True, "Polygon", id="full_scan_single"),
+        pytest.param("Polygon", {"Polygon"}, {False}, False, "MultiPolygon", id="sampled_promoted"),
+        pytest.param("Polygon", {"Polygon", "MultiPolygon"}, {False}, True, "MultiPolygon", id="mixed_multi"),
+        pytest.param("Point", {"Point"}, {False}, False, "MultiPoint", id="sampled_point"),
+        pytest.param("Point", {"Point"}, {False}, True, "Point", id="full_scan_point"),
+        pytest.param("3D LineString", {"LineString"}, {True}, True, "LineStringZ", id="three_dimensions"),
+        pytest.param("Unknown", {"Point", "Polygon"}, {False}, True, None, id="mixed_families"),
+        pytest.param("Polygon", {"Polygon"}, {False, True}, True, None, id="mixed_dimensions"),
+        pytest.param("Unknown", set(), set(), True, None, id="no_geometries"),
+    ],
+)
+def test_infer_geometry_type(declared, geometry_types, dimensions, full_scan, expected_result):
+    summary = SampleSummary(full_scan=full_scan, geometry_types=geometry_types, dimensions=dimensions)
+    assert infer_geometry_type(declared, summary) == expected_result
+
+
+@pytest.mark.parametrize(
+    "schema, expected_result",
+    [
+        pytest.param(InferredSchema([], "MultiPolygon", 4326), "GEOMETRY(MultiPolygon, 4326)", id="typed"),
+        pytest.param(InferredSchema([], None, 4326), "GEOMETRY(Geometry, 4326)", id="srid_only"),
+        pytest.param(InferredSchema([], None, 0), "GEOMETRY", id="untyped"),
+    ],
+)
+def test_geometry_column_type(schema, expected_result):
+    assert schema.geometry_column_type == expected_result
+
+
+def test_infer_schema_full_scan(geojson_file):
+    with fiona.open(geojson_file) as collection:
+        assert infer_schema(collection) == InferredSchema([("polygon_id", "TEXT")], "Polygon", 4283)
+
+
+def test_infer_schema_sampled(tmp_path, geometry_records):
+    path = tmp_path / "parcels.gpkg"
+    records = [
+        {**x, "properties": {"area": 40000 if i == 3 else i, "attributes": json.dumps({"id": i})}}
+        for i, x in enumerate(geometry_records)
+    ]
+    schema = {"geometry": "Polygon", "properties": {"area": "int", "attributes": "str"}}
+    with fiona.open(path, "w", schema=schema, driver="GPKG", crs="EPSG:4326") as collection:
+        collection.writerecords(records)
+
+    with fiona.open(path) as collection:
+        sampled = infer_schema(collection, sample_size=2)
+        full = infer_schema(collection, sample_size=None)
+
+    assert sampled == InferredSchema([("area", "BIGINT"), ("attributes", "TEXT")], "MultiPolygon", 4326)
+    assert full == InferredSchema([("area", "INTEGER"), ("attributes", "TEXT")], "Polygon", 4326)
+
+
+def test_infer_schema_unreadable_crs(geojson_file, monkeypatch):
+    def read_collection_srid(collection):
+        raise CRSError("Invalid CRS")
+
+    monkeypatch.setattr("sherpa.schema.read_collection_srid", read_collection_srid)
+    with fiona.open(geojson_file) as collection, pytest.raises(CRSError, match="Invalid CRS"):
+        infer_schema(collection)
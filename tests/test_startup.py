@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+# Libraries that load GDAL, GEOS, PROJ or libpq, which only the commands using them should import
+HEAVY_MODULES = {"fiona", "shapely", "numpy", "psycopg2", "psycopg", "pyproj", "pyogrio", "pyarrow"}
+
+# Microseconds importing the CLI may take, well under the time it took when it imported the libraries above
+IMPORT_BUDGET = 250_000
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Import a module in a fresh interpreter, returning the cumulative microseconds python -X importtime reports for
+    each module it imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def test_cli_imports_without_heavy_modules():
+    times = import_times("sherpa.main")
+    assert "sherpa.main" in times
+    assert sorted(x for x in times if x.split(".")[0] in HEAVY_MODULES) == []
+
+
+def test_cli_import_budget():
+    # The quickest of a few imports, so a busy machine doesn't fail the test
+    assert min(import_times("sherpa.main")["sherpa.main"] for _ in range(3)) < IMPORT_BUDGET
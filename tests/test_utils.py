@@ -0,0 +1,30 @@
+import pytest
+
+from sherpa.utils import format_size, parse_size
+
+
+@pytest.mark.parametrize(
+    "size, expected_result",
+    [
+        pytest.param("512", 512, id="bytes"),
+        pytest.param("64KB", 64 * 1024, id="kilobytes"),
+        pytest.param("64mb", 64 * 1024**2, id="lowercase"),
+        pytest.param("1.5G", int(1.5 * 1024**3), id="fractional"),
+        pytest.param("0MB", None, id="zero"),
+        pytest.param("lots", None, id="invalid"),
+    ],
+)
+def test_parse_size(size, expected_result):
+    assert parse_size(size) == expected_result
+
+
+@pytest.mark.parametrize(
+    "size, expected_result",
+    [
+        pytest.param(512, "512B", id="bytes"),
+        pytest.param(64 * 1024, "64.0KB", id="kilobytes"),
+        pytest.param(int(1.5 * 1024**3), "1.5GB", id="gigabytes"),
+    ],
+)
+def test_format_size(size, expected_result):
+    assert format_size(size) == expected_result
@@ -0,0 +1,200 @@
+import fiona
+import pytest
+from fiona.crs import CRSError
+
+from sherpa.pg_client import CatalogColumn, PgTable
+from sherpa.validate import (
+    ValidationTarget,
+    check_geometry_dimensions,
+    check_geometry_type,
+    check_value,
+    validate_file,
+)
+
+
+@pytest.fixture
+def parcels_file(tmp_path):
+    path = tmp_path / "parcels.gpkg"
+    schema = {"geometry": "Polygon", "properties": {"parcel_id": "str", "lots": "str", "zone": "str"}}
+    records = [
+        ("P1", "12", [(0, 0), (1, 0), (1, 1), (0, 0)]),
+        ("P2", "many", [(0, 0), (1, 0), (1, 1), (0, 0)]),
+        ("P3", "3", [(0, 0), (1, 1), (1, 0), (0, 1), (0, 0)]),
+        ("P4", None, [(0, 0), (1, 0), (1, 1), (0, 0)]),
+    ]
+    with fiona.open(path, "w", driver="GPKG", schema=schema, crs="EPSG:4326") as collection:
+        collection.writerecords(
+            {
+                "type": "Feature",
+                "properties": {"parcel_id": parcel_id, "lots": lots, "zone": "R1"},
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+            }
+            for parcel_id, lots, ring in records
+        )
+
+    yield path
+
+
+def parcels_target(columns=None, geometry_type="POLYGON", srid=4326, force_srid=None, geometry_dimensions=None):
+    columns = columns or ["parcel_id", "lots", "geometry"]
+    table = PgTable("public", "parcels", columns, geometry_type)
+    column_types = {"parcel_id": "text", "lots": "integer", "area": "double precision", "geometry": None}
+    return ValidationTarget(table, column_types, srid, force_srid, geometry_dimensions)
+
+
+@pytest.mark.parametrize(
+    "value, data_type, expected_result",
+    [
+        pytest.param(None, "integer", None, id="null"),
+        pytest.param("12", "integer", None, id="integer_text"),
+        pytest.param(1.0, "integer", "isn't integer", id="integer_float"),
+        pytest.param(2**31, "integer", "is out of range for integer", id="integer_range"),
+        pytest.param(2**31, "bigint", None, id="bigint"),
+        pytest.param("1.5e3", "double precision", None, id="float_text"),
+        pytest.param("n/a", "numeric", "isn't numeric", id="numeric"),
+        pytest.param("yes", "boolean", None, id="boolean"),
+        pytest.param(1, "boolean", None, id="boolean_integer"),
+        pytest.param(2, "boolean", "isn't boolean", id="boolean_integer_range"),
+        pytest.param("2024-03-01T10:30:00", "date", None, id="date_with_time"),
+        pytest.param("01/03/2024", "date", "isn't an ISO 8601 date", id="date"),
+        pytest.param("10:30", "time without time zone", None, id="time"),
+        pytest.param({"a": 1}, "jsonb", None, id="json_object"),
+        pytest.param("{a: 1}", "jsonb", "isn't valid jsonb", id="json_text"),
+        pytest.param("not-a-uuid", "uuid", "isn't a uuid", id="uuid"),
+        pytest.param("a\x00b", "text", "contains a NUL character", id="nul"),
+        pytest.param(b"\x00", "bytea", None, id="bytea"),
+        pytest.param("anything", "character varying", None, id="unchecked"),
+    ],
+)
+def test_check_value(value, data_type, expected_result):
+    assert check_value(value, data_type) == expected_result
+
+
+@pytest.mark.parametrize(
+    "value, length, precision, expected_result",
+    [
+        pytest.param("abcd", 4, None, None, id="length"),
+        pytest.param("abcde", 4, None, "is longer than 4 characters", id="too_long"),
+        pytest.param("abcd  ", 4, None, None, id="trailing_spaces"),
+        pytest.param(12345, 4, None, "is longer than 4 characters", id="too_long_number"),
+        pytest.param("999.99", None, (5, 2), None, id="precision"),
+        pytest.param(1000, None, (5, 2), "is out of range for numeric(5,2)", id="too_many_digits"),
+        pytest.param(999.995, None, (5, 2), "is out of range for numeric(5,2)", id="rounded_up"),
+        pytest.param("0.0001", None, (5, 2), None, id="rounded_down"),
+        pytest.param("NaN", None, (5, 2), None, id="nan"),
+    ],
+)
+def test_check_value_limits(value, length, precision, expected_result):
+    data_type = "character varying" if length is not None else "numeric"
+    assert check_value(value, data_type, length, precision) == expected_result
+
+
+@pytest.mark.parametrize(
+    "geometry_type, table_geometry_type, expected_result",
+    [
+        pytest.param("Polygon", None, True, id="untyped"),
+        pytest.param("Polygon", "GEOMETRY", True, id="geometry"),
+        pytest.param("Polygon", "POLYGON", True, id="same"),
+        pytest.param("Polygon", "MULTIPOLYGON", True, id="promoted"),
+        pytest.param("MultiPolygon", "POLYGON", False, id="multi_to_single"),
+        pytest.param("Point", "POLYGONZ", False, id="different"),
+    ],
+)
+def test_check_geometry_type(geometry_type, table_geometry_type, expected_result):
+    assert check_geometry_type(geometry_type, table_geometry_type) == expected_result
+
+
+@pytest.mark.parametrize(
+    "has_z, table_dimensions, expected_result",
+    [
+        pytest.param(False, None, True, id="unconstrained"),
+        pytest.param(False, "", True, id="2d"),
+        pytest.param(True, "Z", True, id="3d"),
+        pytest.param(True, "", False, id="3d_to_2d"),
+        pytest.param(False, "Z", False, id="2d_to_3d"),
+        pytest.param(False, "M", False, id="measured"),
+    ],
+)
+def test_check_geometry_dimensions(has_z, table_dimensions, expected_result):
+    assert check_geometry_dimensions(has_z, table_dimensions) == expected_result
+
+
+def test_validation_target_from_columns():
+    table = PgTable("public", "parcels", ["parcel_id", "geometry"], "POLYGON")
+    columns = [
+        CatalogColumn("id", "bigint", None, None, None, True),
+        CatalogColumn("parcel_id", "character varying", None, None, None, False, length=8),
+        CatalogColumn("area", "numeric", None, None, None, False, precision=10, scale=2),
+        CatalogColumn("geometry", None, "POLYGON", 4326, "Z", False),
+    ]
+
+    target = ValidationTarget.from_columns(table, columns)
+    assert (target.srid, target.geometry_dimensions) == (4326, "Z")
+    assert target.column_types == {
+        "id": "bigint",
+        "parcel_id": "character varying",
+        "area": "numeric",
+        "geometry": None,
+    }
+    assert (target.column_lengths, target.column_precisions) == ({"parcel_id": 8}, {"area": (10, 2)})
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validate_file(parcels_file, workers):
+    report = validate_file(parcels_file, parcels_target(), workers)
+
+    assert report.features == 4
+    assert report.errors == 1
+    assert report.warnings == 2
+    issues = {(x.check, x.column, x.problem): (x.count, x.examples, x.error) for x in report.issues.values()}
+    assert issues == {
+        ("type", "lots", "isn't integer"): (1, [1], True),
+        ("column", "zone", "is in the file but not the table, so won't be loaded"): (1, [], False),
+        ("geometry", "geometry", "is invalid: Self-intersection"): (1, [2], False),
+    }
+
+
+def test_validate_file_missing_column(parcels_file):
+    report = validate_file(parcels_file, parcels_target(["parcel_id", "area", "geometry"]))
+    assert ("column", "area", "is in the table but not the file") in report.issues
+
+
+def test_validate_file_geometry_type(parcels_file):
+    report = validate_file(parcels_file, parcels_target(geometry_type="POINT"))
+    assert report.issues[("geometry", "geometry", "Polygon doesn't fit POINT")].count == 4
+
+
+def test_validate_file_geometry_dimensions(parcels_file):
+    report = validate_file(parcels_file, parcels_target(geometry_dimensions="Z"))
+    assert report.issues[("geometry", "geometry", "XY coordinates don't fit POLYGONZ")].count == 4
+
+
+@pytest.mark.parametrize(
+    "srid, force_srid, expected_errors",
+    [
+        pytest.param(4326, None, 0, id="same"),
+        pytest.param(0, None, 0, id="unconstrained"),
+        pytest.param(3857, None, 1, id="different"),
+        pytest.param(3857, 3857, 0, id="forced"),
+    ],
+)
+def test_validate_file_srid(parcels_file, srid, force_srid, expected_errors):
+    report = validate_file(parcels_file, parcels_target(srid=srid, force_srid=force_srid))
+    assert sum(x.check == "srid" for x in report.issues.values()) == expected_errors
+
+
+def test_validate_file_unreadable_crs(parcels_file, monkeypatch):
+    def read_collection_srid(collection):
+        raise CRSError("unreadable")
+
+    monkeypatch.setattr("sherpa.validate.read_collection_srid", read_collection_srid)
+    report = validate_file(parcels_file, parcels_target())
+    assert report.issues[("srid", "geometry", "file CRS can't be read: unreadable")].count == 1
+    assert report.features == 4
+
+
+def test_validate_file_column_length(parcels_file):
+    target = parcels_target(columns=["parcel_id", "geometry"])
+    target.column_lengths = {"parcel_id": 1}
+    report = validate_file(parcels_file, target)
+    assert report.issues[("type", "parcel_id", "is longer than 1 characters")].count == 4